@@ -301,5 +301,5 @@ class StoreLogoutCommand(AppCommand):
 
     @overrides
     def run(self, parsed_args):
-        store.StoreClientCLI().store_client.logout()
+        store.StoreClientCLI().logout()
         emit.message("Credentials cleared")
@@ -253,6 +253,16 @@ class PackCommand(_LifecycleCommand):
             type=str,
             help="Path to the resulting snap",
         )
+        parser.add_argument(
+            "--pipelined",
+            action="store_true",
+            help="Create the snap while linting it, cancelling on linter errors",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Reuse the last created snap if the primed contents did not change",
+        )
 
     @overrides
     def run(self, parsed_args):
@@ -291,6 +301,16 @@ class SnapCommand(_LifecycleCommand):
             type=str,
             help="Path to the resulting snap",
         )
+        parser.add_argument(
+            "--pipelined",
+            action="store_true",
+            help="Create the snap while linting it, cancelling on linter errors",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Reuse the last created snap if the primed contents did not change",
+        )
 
 
 class CleanCommand(_LifecycleStepCommand):
@@ -15,7 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """Snapcraft Store Account management commands."""
-import itertools
+import concurrent.futures
 import operator
 import textwrap
 from collections import OrderedDict
@@ -33,6 +33,8 @@ from snapcraft.store.channel_map import ChannelMap, MappedChannel, Revision, Sna
 if TYPE_CHECKING:
     import argparse
 
+_MAX_CONCURRENT_REQUESTS = 8
+
 
 class StoreStatusCommand(AppCommand):
     """Check the status of a snap in the Snap Store."""
@@ -43,7 +45,10 @@ class StoreStatusCommand(AppCommand):
         """
         Show the status of a snap in the Snap Store.
         The name must be accessible from the requesting account by being
-        the owner or a collaborator of the snap."""
+        the owner or a collaborator of the snap.
+
+        When more than one name is given, the status of the snaps is
+        requested concurrently and shown one after the other."""
     )
 
     @overrides
@@ -51,6 +56,7 @@ class StoreStatusCommand(AppCommand):
         parser.add_argument(
             "name",
             type=str,
+            nargs="+",
             help="Get the status on a snap from the Snap Store",
         )
         parser.add_argument(
@@ -72,14 +78,28 @@ class StoreStatusCommand(AppCommand):
 
     @overrides
     def run(self, parsed_args):
-        snap_channel_map = store.StoreClientCLI().get_channel_map(
-            snap_name=parsed_args.name
-        )
+        snap_names = list(dict.fromkeys(parsed_args.name))
+        snap_channel_maps = _get_channel_maps(store.StoreClientCLI(), snap_names)
+
+        if len(snap_names) == 1:
+            status = self._get_status(snap_channel_maps[0], parsed_args)
+            if status:
+                emit.message(status)
+            return
 
+        statuses = []
+        for snap_name, snap_channel_map in zip(snap_names, snap_channel_maps):
+            status = self._get_status(snap_channel_map, parsed_args)
+            if status:
+                statuses.append(f"{snap_name}\n{status}")
+        emit.message("\n\n".join(statuses))
+
+    def _get_status(
+        self, snap_channel_map: ChannelMap, parsed_args: "argparse.Namespace"
+    ) -> Optional[str]:
         existing_architectures = snap_channel_map.get_existing_architectures()
         if not snap_channel_map.channel_map:
-            emit.message("This snap has no released revisions")
-            return
+            return "This snap has no released revisions"
 
         architectures = existing_architectures
         if parsed_args.arch:
@@ -92,7 +112,7 @@ class StoreStatusCommand(AppCommand):
             # If we have no revisions for any of the architectures requested, there's
             # nothing to do here.
             if not architectures:
-                return
+                return None
 
         tracks: List[str] = []
         if parsed_args.track:
@@ -107,17 +127,36 @@ class StoreStatusCommand(AppCommand):
             # If we have no revisions in any of the tracks requested, there's
             # nothing to do here.
             if not tracks:
-                return
+                return None
 
-        emit.message(
-            get_tabulated_channel_map(
-                snap_channel_map,
-                architectures=list(architectures),
-                tracks=tracks,
-            )
+        return get_tabulated_channel_map(
+            snap_channel_map,
+            architectures=list(architectures),
+            tracks=tracks,
         )
 
 
+def _get_channel_maps(
+    client: store.StoreClientCLI, snap_names: Sequence[str]
+) -> List[ChannelMap]:
+    """Return the channel maps for snap_names, requested concurrently."""
+    if len(snap_names) == 1:
+        return [client.get_channel_map(snap_name=snap_names[0])]
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(len(snap_names), _MAX_CONCURRENT_REQUESTS)
+    ) as executor:
+        futures = [
+            executor.submit(client.get_channel_map, snap_name=snap_name)
+            for snap_name in snap_names
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
 class _HINTS:
     CLOSED: Final[str] = "-"
     FOLLOWING: Final[str] = "↑"
@@ -284,25 +323,14 @@ def _get_channel_lines_for_channel(  # noqa: C901 (complex-structure)
 
 
 def _has_channels_for_architecture(
-    snap_channel_map, architecture: str, channels: List[str]
+    snap_channel_map: ChannelMap, architecture: str, channels: List[str]
 ) -> bool:
-    progressive = (False, True)
-    # channel_query = (channel_name, progressive)
-    for channel_query in itertools.product(channels, progressive):
-        try:
-            snap_channel_map.get_mapped_channel(
-                channel_name=channel_query[0],
-                architecture=architecture,
-                progressive=channel_query[1],
-            )
-            found_architecture = True
-            break
-        except ValueError:
-            continue
-    else:
-        found_architecture = False
-
-    return found_architecture
+    return any(
+        snap_channel_map.has_mapped_channels(
+            channel_name=channel_name, architecture=architecture
+        )
+        for channel_name in channels
+    )
 
 
 def get_tabulated_channel_map(  # noqa: C901 (complex-structure)
@@ -314,6 +342,9 @@ def get_tabulated_channel_map(  # noqa: C901 (complex-structure)
     """Return a tabulated channel map."""
     channel_order = _get_channel_order(snap_channel_map.snap.channels, tracks)
 
+    expires_column = 6
+    has_expiration_dates = False
+
     channel_lines = []
     for track_name in channel_order:
         track_mentioned = False
@@ -341,16 +372,15 @@ def get_tabulated_channel_map(  # noqa: C901 (complex-structure)
                     snap_channel_map, channel_name, architecture, next_tick
                 )
                 for channel_line in parsed_channels:
-                    channel_lines.append(
-                        [track_string, architecture_string] + channel_line
-                    )
+                    line = [track_string, architecture_string] + channel_line
+                    has_expiration_dates |= line[expires_column] != ""
+                    channel_lines.append(line)
                     track_string = ""
                     architecture_string = ""
 
     headers = ["Track", "Arch", "Channel", "Version", "Revision", "Progress"]
-    expires_column = 6
 
-    if any(line[expires_column] != "" for line in channel_lines):
+    if has_expiration_dates:
         headers.append("Expires at")
         for index, _ in enumerate(channel_lines):
             if not channel_lines[index][expires_column]:
@@ -16,10 +16,13 @@
 
 """Snapcraft Store uploading related commands."""
 
+import concurrent.futures
 import pathlib
 import textwrap
+import threading
+import time
 from collections import abc
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Callable, List, Optional
 
 from craft_application.commands import AppCommand
 from craft_cli import emit
@@ -34,6 +37,9 @@ from snapcraft_legacy._store import get_data_from_snap_file
 if TYPE_CHECKING:
     import argparse
 
+# The store client session pools up to 10 connections per host.
+_MAX_CONCURRENT_UPLOADS = 4
+
 
 class ComponentOption:
     """Argparse helper to validate and convert a 'component' option.
@@ -67,6 +73,9 @@ class StoreUploadCommand(AppCommand):
         be released to the selected channels if the store review passes for this
         <snap-file>.
 
+        Several snaps can be uploaded at once by passing more than one <snap-file>.
+        The snap and its components, or all the snaps, are uploaded concurrently.
+
         This operation blocks until the store finishes processing the <snap-file>.
 
         If --release is used, the channel map will be displayed after the operation
@@ -80,7 +89,8 @@ class StoreUploadCommand(AppCommand):
             "snap_file",
             metavar="snap-file",
             type=str,
-            help="Snap to upload",
+            nargs="+",
+            help="Snap(s) to upload",
         )
         parser.add_argument(
             "--release",
@@ -103,9 +113,16 @@ class StoreUploadCommand(AppCommand):
 
     @overrides
     def run(self, parsed_args):
-        snap_file = pathlib.Path(parsed_args.snap_file)
-        if not snap_file.exists() or not snap_file.is_file():
-            raise ArgumentParsingError(f"{str(snap_file)!r} is not a valid file")
+        snap_files = [pathlib.Path(snap_file) for snap_file in parsed_args.snap_file]
+        for snap_file in snap_files:
+            if not snap_file.exists() or not snap_file.is_file():
+                raise ArgumentParsingError(f"{str(snap_file)!r} is not a valid file")
+
+        components = parsed_args.component
+        if components and len(snap_files) > 1:
+            raise ArgumentParsingError(
+                "`--component` cannot be used when uploading more than one snap"
+            )
 
         channels: Optional[List[str]] = None
         if parsed_args.channels:
@@ -113,44 +130,54 @@ class StoreUploadCommand(AppCommand):
 
         client = store.StoreClientCLI()
 
-        snap_yaml, manifest_yaml = get_data_from_snap_file(snap_file)
-        snap_metadata = SnapMetadata.unmarshal(snap_yaml)
-        snap_name = snap_metadata.name
-        built_at = None
-        if manifest_yaml:
-            built_at = manifest_yaml.get("snapcraft-started-at")
+        uploads: list[tuple[pathlib.Path, str, Optional[str]]] = []
+        for snap_file in snap_files:
+            snap_yaml, manifest_yaml = get_data_from_snap_file(snap_file)
+            snap_metadata = SnapMetadata.unmarshal(snap_yaml)
+            built_at = None
+            if manifest_yaml:
+                built_at = manifest_yaml.get("snapcraft-started-at")
 
-        components = parsed_args.component
-        _validate_components(components, snap_metadata)
+            _validate_components(components, snap_metadata)
 
-        client.verify_upload(snap_name=snap_name)
+            client.verify_upload(snap_name=snap_metadata.name)
+            uploads.append((snap_file, snap_metadata.name, built_at))
 
-        snap_upload_id = client.store_client.upload_file(
-            filepath=snap_file, monitor_callback=create_callback
+        upload_ids = _upload_files(
+            client,
+            snap_files + [pathlib.Path(component.path) for component in components],
         )
-
-        component_upload_ids: dict[str, str] = {}
-        for component in components:
-            emit.debug(f"Uploading component {component.name!r}")
-            upload_id = client.store_client.upload_file(
-                filepath=pathlib.Path(component.path),
-                monitor_callback=create_callback,
+        snap_upload_ids = upload_ids[: len(snap_files)]
+        component_upload_ids = {
+            component.name: upload_id
+            for component, upload_id in zip(components, upload_ids[len(snap_files) :])
+        }
+
+        def _notify_upload(
+            upload: tuple[pathlib.Path, str, Optional[str]], upload_id: str
+        ) -> int:
+            snap_file, snap_name, built_at = upload
+            return client.notify_upload(
+                snap_name=snap_name,
+                upload_id=upload_id,
+                built_at=built_at,
+                channels=channels,
+                snap_file_size=snap_file.stat().st_size,
+                components=component_upload_ids or None,
             )
-            component_upload_ids[component.name] = upload_id
-
-        revision = client.notify_upload(
-            snap_name=snap_name,
-            upload_id=snap_upload_id,
-            built_at=built_at,
-            channels=channels,
-            snap_file_size=snap_file.stat().st_size,
-            components=component_upload_ids or None,
+
+        revisions = _run_concurrently(
+            [
+                (_notify_upload, (upload, upload_id))
+                for upload, upload_id in zip(uploads, snap_upload_ids)
+            ]
         )
 
-        message = f"Revision {revision!r} created for {snap_name!r}"
-        if channels:
-            message += f" and released to {utils.humanize_list(channels, 'and')}"
-        emit.message(message)
+        for (_, snap_name, _), revision in zip(uploads, revisions):
+            message = f"Revision {revision!r} created for {snap_name!r}"
+            if channels:
+                message += f" and released to {utils.humanize_list(channels, 'and')}"
+            emit.message(message)
 
 
 def _validate_components(
@@ -211,6 +238,104 @@ def create_callback(encoder: MultipartEncoder):
         return progress_callback
 
 
+class _UploadProgress:
+    """Report the progress of concurrent uploads in a single progress bar."""
+
+    def __init__(self, filepaths: abc.Sequence[pathlib.Path]) -> None:
+        self._sizes = {filepath: filepath.stat().st_size for filepath in filepaths}
+        self._sent = {filepath: 0 for filepath in filepaths}
+        self._lock = threading.Lock()
+        self._progress = emit.progress_bar(
+            "Uploading...", sum(self._sizes.values()), delta=True
+        )
+
+    def __enter__(self) -> "_UploadProgress":
+        self._progress.__enter__()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._progress.__exit__(*exc_info)
+
+    def get_callback(self, filepath: pathlib.Path) -> Callable:
+        """Get a callback suitable for upload_file to upload filepath."""
+        size = self._sizes[filepath]
+
+        def create_callback(encoder: MultipartEncoder):
+            def progress_callback(monitor: MultipartEncoderMonitor):
+                # The multipart encoding adds a few bytes to the file size,
+                # and an upload that is retried starts over.
+                bytes_read = min(monitor.bytes_read, size)
+                with self._lock:
+                    if bytes_read > self._sent[filepath]:
+                        self._progress.advance(bytes_read - self._sent[filepath])
+                        self._sent[filepath] = bytes_read
+
+            return progress_callback
+
+        return create_callback
+
+
+def _upload_files(
+    client: store.StoreClientCLI, filepaths: list[pathlib.Path]
+) -> list[str]:
+    """Upload files to the store, concurrently if there are several.
+
+    :returns: the upload ids, in the same order as filepaths.
+    """
+    if len(filepaths) == 1:
+        results = [_upload_file(client, filepaths[0], create_callback)]
+    else:
+        with _UploadProgress(filepaths) as progress:
+            results = _run_concurrently(
+                [
+                    (_upload_file, (client, filepath, progress.get_callback(filepath)))
+                    for filepath in filepaths
+                ]
+            )
+
+    for filepath, (_, elapsed) in zip(filepaths, results):
+        size = filepath.stat().st_size / 1e6
+        rate = f"{size / elapsed:.2f} MB/s" if elapsed > 0 else "n/a"
+        emit.progress(
+            f"Uploaded {filepath.name!r}: {size:.2f} MB in {elapsed:.1f}s ({rate})",
+            permanent=True,
+        )
+
+    return [upload_id for upload_id, _ in results]
+
+
+def _upload_file(
+    client: store.StoreClientCLI,
+    filepath: pathlib.Path,
+    monitor_callback: Callable,
+) -> tuple[str, float]:
+    """Upload a file to the store.
+
+    :returns: the upload id and the time it took to upload the file.
+    """
+    emit.debug(f"Uploading {str(filepath)!r}")
+    start = time.monotonic()
+    upload_id = client.upload_file(filepath=filepath, monitor_callback=monitor_callback)
+    return upload_id, time.monotonic() - start
+
+
+def _run_concurrently(jobs: list[tuple[Callable, tuple]]) -> list:
+    """Run the jobs in a thread pool, returning their results in order."""
+    if len(jobs) == 1:
+        function, args = jobs[0]
+        return [function(*args)]
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(len(jobs), _MAX_CONCURRENT_UPLOADS)
+    ) as executor:
+        futures = [executor.submit(function, *args) for function, args in jobs]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
 class StoreLegacyPushCommand(StoreUploadCommand):
     """Legacy command to upload a snap to the Snap Store."""
 
@@ -16,10 +16,12 @@
 
 """ELF file handling."""
 
+from ._elf_cache import ElfCache
 from ._elf_file import ElfFile, SonameCache
 from ._patcher import Patcher
 
 __all__ = [
+    "ElfCache",
     "ElfFile",
     "SonameCache",
     "Patcher",
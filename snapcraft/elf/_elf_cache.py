@@ -0,0 +1,190 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent cache of parsed ELF file attributes."""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from craft_cli import emit
+
+# Bump when the layout of cached attributes changes.
+_CACHE_FORMAT = 3
+
+# Default maximum size of the cache directory in bytes.
+_DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class ElfCache:
+    """A disk-backed cache of ELF file attributes.
+
+    Entries are addressed by the device, inode, size, and modification and
+    change times of the parsed file, so unchanged files (and hard links to
+    them) are looked up without opening the file. As with git, the change
+    time catches files edited in place with their size and modification time
+    kept. Each entry is stored as a small JSON document and
+    the least recently used entries are evicted when the cache grows beyond
+    its size limit.
+
+    :param cache_dir: The directory to store cache entries in.
+    :param max_size: The maximum size of the cache in bytes.
+    """
+
+    def __init__(self, cache_dir: Path, *, max_size: int = _DEFAULT_MAX_SIZE) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._stored = 0
+
+    def __eq__(self, other: object) -> bool:
+        """Compare caches by directory and size limit."""
+        if not isinstance(other, ElfCache):
+            return NotImplemented
+        return (self.cache_dir, self.max_size) == (other.cache_dir, other.max_size)
+
+    def __hash__(self) -> int:
+        """Hash the cache directory and size limit."""
+        return hash((self.cache_dir, self.max_size))
+
+    def _get_entry_path(self, path: Path) -> Optional[Path]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+
+        key = ":".join(
+            str(field)
+            for field in (
+                _CACHE_FORMAT,
+                stat.st_dev,
+                stat.st_ino,
+                stat.st_size,
+                stat.st_mtime_ns,
+                stat.st_ctime_ns,
+            )
+        )
+        digest = hashlib.sha1(key.encode()).hexdigest()  # noqa: S324 not security
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Obtain the cached attributes for the ELF file at path.
+
+        :param path: The path to the ELF file.
+
+        :returns: The cached attributes, or None if not cached.
+        """
+        entry_path = self._get_entry_path(path)
+        if entry_path is None:
+            self.misses += 1
+            return None
+
+        try:
+            with entry_path.open() as entry_file:
+                attributes = json.load(entry_file)
+            # Refresh the modification time so eviction is least recently used.
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return attributes
+
+    def put(self, path: Path, attributes: Dict[str, Any]) -> None:
+        """Store the attributes for the ELF file at path.
+
+        :param path: The path to the ELF file.
+        :param attributes: The attributes to cache, serializable as JSON.
+        """
+        entry_path = self._get_entry_path(path)
+        if entry_path is None:
+            return
+
+        # Write to a temporary file and rename it into place so that
+        # concurrent readers never see a partial entry.
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd, temp_name = tempfile.mkstemp(dir=entry_path.parent)
+        except OSError as error:
+            emit.debug(f"Cannot store ELF cache entry for {str(path)!r}: {error}")
+            return
+
+        try:
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(attributes, temp_file)
+            os.replace(temp_name, entry_path)
+        except OSError as error:
+            emit.debug(f"Cannot store ELF cache entry for {str(path)!r}: {error}")
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            return
+
+        self._stored += 1
+
+    def merge(self, other: "ElfCache") -> None:
+        """Accumulate the counters of another instance of this cache.
+
+        This is used to account for lookups done in worker processes.
+
+        :param other: The cache instance used by the worker.
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        self._stored += other._stored
+
+    def prune(self) -> int:
+        """Evict the least recently used entries until within the size limit.
+
+        The cache directory is only scanned if entries were stored since the
+        last time it was pruned.
+
+        :returns: The number of evicted entries.
+        """
+        if not self._stored:
+            return 0
+        self._stored = 0
+
+        entries: List[Tuple[float, int, str]] = []
+        total_size = 0
+        with contextlib.suppress(FileNotFoundError):
+            for subdir in os.scandir(self.cache_dir):
+                if not subdir.is_dir():
+                    continue
+                for entry in os.scandir(subdir.path):
+                    with contextlib.suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                        total_size += stat.st_size
+
+        evicted = 0
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(entry_path)
+                evicted += 1
+            total_size -= size
+
+        if evicted:
+            emit.debug(f"Evicted {evicted} entries from the ELF cache")
+
+        return evicted
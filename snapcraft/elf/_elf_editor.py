@@ -0,0 +1,291 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Edit the interpreter and rpath of ELF files in place."""
+
+import contextlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+from craft_cli import emit
+from elftools.common.exceptions import ELFError
+from elftools.construct import ConstructError
+from elftools.elf import elffile, gnuversions, sections
+
+_DT_NULL = 0
+_DT_NEEDED = 1
+_DT_STRTAB = 5
+_DT_STRSZ = 10
+_DT_SONAME = 14
+_DT_RPATH = 15
+_DT_RUNPATH = 29
+_DT_FLAGS_1 = 0x6FFFFFFB
+_DT_AUXILIARY = 0x7FFFFFFD
+_DT_FILTER = 0x7FFFFFFF
+
+_DF_1_NODEFLIB = 0x800
+
+# Dynamic entries whose value is an offset into the dynamic string table.
+_STRING_TAGS = {
+    _DT_NEEDED,
+    _DT_SONAME,
+    _DT_RPATH,
+    _DT_RUNPATH,
+    _DT_AUXILIARY,
+    _DT_FILTER,
+}
+
+# A list of (file offset, data) to write.
+_Edits = List[Tuple[int, bytes]]
+
+# A list of (file offset of the entry, tag, value).
+_DynamicEntries = List[Tuple[int, int, int]]
+
+
+def edit_elf_file(
+    path: Path,
+    *,
+    interpreter: Optional[str] = None,
+    rpath: Optional[str] = None,
+    no_default_lib: bool = False,
+) -> bool:
+    """Set the interpreter, rpath and DF_1_NODEFLIB flag of an ELF file in place.
+
+    The file is only modified if all the changes fit in the existing file
+    layout: the interpreter must fit in PT_INTERP, the rpath must fit in the
+    string of an existing DT_RPATH or DT_RUNPATH entry that is not shared with
+    other strings, and DT_FLAGS_1 must exist to set DF_1_NODEFLIB. As with
+    ``patchelf --force-rpath``, a DT_RUNPATH entry is turned into DT_RPATH.
+
+    If the file has other hard links, the changes are done on a copy that
+    replaces it, breaking the link.
+
+    :param path: The path to the ELF file.
+    :param interpreter: The interpreter to set, if any.
+    :param rpath: The rpath to set, if any.
+    :param no_default_lib: Whether to set DF_1_NODEFLIB.
+
+    :returns: True if the file was edited, False if it requires growing
+        the file, in which case it is left untouched.
+    """
+    try:
+        with path.open("rb") as file:
+            edits = _get_edits(
+                file,
+                interpreter=interpreter,
+                rpath=rpath,
+                no_default_lib=no_default_lib,
+            )
+    except (ELFError, ConstructError, struct.error) as error:
+        emit.debug(f"Cannot edit {str(path)!r} in place: {error}")
+        return False
+
+    if edits is None:
+        return False
+
+    if path.stat().st_nlink > 1:
+        # Edit a private copy next to the file and move it into place,
+        # which breaks the hard link without a round trip through /tmp.
+        temp_fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        os.close(temp_fd)
+        try:
+            shutil.copy2(path, temp_name)
+            _write_edits(Path(temp_name), edits)
+            os.replace(temp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            raise
+    else:
+        _write_edits(path, edits)
+
+    return True
+
+
+def _write_edits(path: Path, edits: _Edits) -> None:
+    if not edits:
+        return
+
+    with path.open("r+b") as file, mmap.mmap(file.fileno(), 0) as mapped:
+        for offset, data in edits:
+            mapped[offset : offset + len(data)] = data
+        mapped.flush()
+
+
+def _get_edits(
+    file: BinaryIO,
+    *,
+    interpreter: Optional[str],
+    rpath: Optional[str],
+    no_default_lib: bool,
+) -> Optional[_Edits]:
+    elf_file = elffile.ELFFile(file)
+    edits: _Edits = []
+
+    if interpreter is not None:
+        interp_edit = _get_interpreter_edit(elf_file, interpreter)
+        if interp_edit is None:
+            return None
+        edits.append(interp_edit)
+
+    if rpath is None and not no_default_lib:
+        return edits
+
+    entry_format = "<" if elf_file.little_endian else ">"
+    entry_format += "qQ" if elf_file.elfclass == 64 else "iI"
+    entries = _get_dynamic_entries(elf_file, entry_format)
+    if entries is None:
+        return None
+
+    if rpath is not None:
+        rpath_edits = _get_rpath_edits(elf_file, entries, entry_format, rpath)
+        if rpath_edits is None:
+            return None
+        edits.extend(rpath_edits)
+
+    if no_default_lib:
+        flags_entries = [e for e in entries if e[1] == _DT_FLAGS_1]
+        if len(flags_entries) != 1:
+            return None
+        entry_offset, tag, value = flags_entries[0]
+        if not value & _DF_1_NODEFLIB:
+            edits.append(
+                (entry_offset, struct.pack(entry_format, tag, value | _DF_1_NODEFLIB))
+            )
+
+    return edits
+
+
+def _get_interpreter_edit(
+    elf_file: elffile.ELFFile, interpreter: str
+) -> Optional[Tuple[int, bytes]]:
+    for segment in elf_file.iter_segments():
+        if segment["p_type"] == "PT_INTERP":
+            size = segment["p_filesz"]
+            data = interpreter.encode() + b"\0"
+            if len(data) > size:
+                return None
+            return segment["p_offset"], data.ljust(size, b"\0")
+
+    return None
+
+
+def _get_dynamic_entries(
+    elf_file: elffile.ELFFile, entry_format: str
+) -> Optional[_DynamicEntries]:
+    for segment in elf_file.iter_segments():
+        if segment["p_type"] == "PT_DYNAMIC":
+            break
+    else:
+        return None
+
+    entry_size = struct.calcsize(entry_format)
+    elf_file.stream.seek(segment["p_offset"])
+    data = elf_file.stream.read(segment["p_filesz"])
+
+    entries: _DynamicEntries = []
+    for index in range(len(data) // entry_size):
+        tag, value = struct.unpack_from(entry_format, data, index * entry_size)
+        if tag == _DT_NULL:
+            break
+        entries.append((segment["p_offset"] + index * entry_size, tag, value))
+
+    return entries
+
+
+def _get_rpath_edits(  # noqa: PLR0911 (too-many-return-statements)
+    elf_file: elffile.ELFFile,
+    entries: _DynamicEntries,
+    entry_format: str,
+    rpath: str,
+) -> Optional[_Edits]:
+    rpath_entries = [e for e in entries if e[1] in (_DT_RPATH, _DT_RUNPATH)]
+    tags = {tag: value for _, tag, value in entries}
+    if len(rpath_entries) != 1 or _DT_STRTAB not in tags or _DT_STRSZ not in tags:
+        return None
+
+    strtab_offset = _get_file_offset(elf_file, tags[_DT_STRTAB])
+    if strtab_offset is None:
+        return None
+
+    entry_offset, tag, string_offset = rpath_entries[0]
+    strtab_size = tags[_DT_STRSZ]
+    if string_offset >= strtab_size:
+        return None
+
+    elf_file.stream.seek(strtab_offset + string_offset)
+    current = elf_file.stream.read(strtab_size - string_offset).split(b"\0", 1)[0]
+    new = rpath.encode()
+    if len(new) > len(current):
+        return None
+
+    # Linkers may merge strings sharing a suffix, so the string can only be
+    # overwritten if nothing else points into it.
+    references = _get_string_references(elf_file, entries)
+    if references is None:
+        return None
+    references.remove(string_offset)
+    if any(string_offset <= r <= string_offset + len(current) for r in references):
+        return None
+
+    edits = [(strtab_offset + string_offset, new.ljust(len(current), b"\0"))]
+    if tag == _DT_RUNPATH:
+        edits.append(
+            (entry_offset, struct.pack(entry_format, _DT_RPATH, string_offset))
+        )
+
+    return edits
+
+
+def _get_file_offset(elf_file: elffile.ELFFile, address: int) -> Optional[int]:
+    for segment in elf_file.iter_segments():
+        if segment["p_type"] != "PT_LOAD":
+            continue
+        start = segment["p_vaddr"]
+        if start <= address < start + segment["p_filesz"]:
+            return segment["p_offset"] + address - start
+
+    return None
+
+
+def _get_string_references(
+    elf_file: elffile.ELFFile, entries: _DynamicEntries
+) -> Optional[List[int]]:
+    """Obtain every reference to the dynamic string table of the ELF file."""
+    # Without section headers the symbol and version tables cannot be found.
+    if not elf_file.num_sections():
+        return None
+
+    references = [value for _, tag, value in entries if tag in _STRING_TAGS]
+    for section in elf_file.iter_sections():
+        if isinstance(section, sections.SymbolTableSection):
+            if section["sh_type"] != "SHT_DYNSYM":
+                continue
+            references.extend(s.entry["st_name"] for s in section.iter_symbols())
+        elif isinstance(section, gnuversions.GNUVerNeedSection):
+            for verneed, vernaux_iter in section.iter_versions():
+                references.append(verneed.entry["vn_file"])
+                references.extend(aux.entry["vna_name"] for aux in vernaux_iter)
+        elif isinstance(section, gnuversions.GNUVerDefSection):
+            for _, verdaux_iter in section.iter_versions():
+                references.extend(aux.entry["vda_name"] for aux in verdaux_iter)
+
+    return references
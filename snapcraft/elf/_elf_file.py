@@ -16,21 +16,39 @@
 
 """Helpers to parse and handle ELF binary files."""
 
+import collections
 import contextlib
+import functools
+import glob
+import hashlib
+import json
 import os
 import re
 import subprocess
+import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, cast
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, cast
 
 from craft_cli import emit
+from elftools.common.exceptions import ELFError
 from elftools.construct import ConstructError
-from elftools.elf import constants, dynamic, elffile, gnuversions, sections, segments
+from elftools.elf import (
+    constants,
+    dynamic,
+    elffile,
+    enums,
+    gnuversions,
+    sections,
+    segments,
+)
 from packaging.version import parse as parse_version
 
 from snapcraft import utils
 
 from . import errors
+from ._elf_cache import ElfCache
 
 _ElfArchitectureTuple = Tuple[str, str, str]
 _SonameCacheDict = Dict[Tuple[_ElfArchitectureTuple, str], Path]
@@ -41,6 +59,20 @@ _GNU_VERSION_D = ".gnu.version_d"
 _GNU_VERSION_R = ".gnu.version_r"
 _INTERP = ".interp"
 
+_LD_SO_CONF = Path("/etc/ld.so.conf")
+
+# Sonames of the dynamic linker, which ldd does not list as a dependency.
+_DYNAMIC_LINKER_SONAME = re.compile(r"^ld(-linux.*|64)\.so\.\d+$")
+
+# Bump when the layout of persisted soname indexes changes.
+_SONAME_INDEX_FORMAT = 1
+
+# Substring of the file names kept in soname indexes.
+_SONAME_INDEX_PATTERN = ".so"
+
+# Dynamic string tokens other than $ORIGIN are not expanded in-process.
+_UNSUPPORTED_DST = re.compile(r"\$(\{)?(LIB|PLATFORM)\b")
+
 
 class _NeededLibrary:
     """Represents an ELF library version."""
@@ -55,10 +87,21 @@ class _NeededLibrary:
 
 
 class SonameCache:
-    """A cache for sonames."""
+    """A cache for sonames.
 
-    def __init__(self):
+    Besides the resolved sonames, the cache keeps an index of the library
+    file names found under each search path so that lookups do not need
+    to walk the tree again. If index_dir is set, the indexes are persisted
+    there and reused while the modification times of the indexed
+    directories do not change.
+
+    :param index_dir: The directory to persist soname indexes in.
+    """
+
+    def __init__(self, *, index_dir: Optional[Path] = None) -> None:
         self._soname_paths: _SonameCacheDict = {}
+        self._index_dir = index_dir
+        self._indexes: Dict[Path, Dict[str, List[Path]]] = {}
 
     def __getitem__(self, key):
         """Obtain cached item."""
@@ -95,6 +138,120 @@ class SonameCache:
 
         self._soname_paths = new_soname_paths
 
+    def find(self, search_path: Path, soname: str) -> List[Path]:
+        """Obtain the files named soname under search_path.
+
+        :param search_path: The directory to search in, recursively.
+        :param soname: The file name to search for.
+
+        :returns: The matching paths, in directory walk order.
+        """
+        # Only library-like names are indexed.
+        if _SONAME_INDEX_PATTERN not in soname:
+            return [
+                Path(root, soname)
+                for root, _, files in os.walk(search_path)
+                if soname in files
+            ]
+
+        index = self._indexes.get(search_path)
+        if index is None:
+            index = self._load_index(search_path)
+            if index is None:
+                index = self._build_index(search_path)
+            self._indexes[search_path] = index
+
+        return index.get(soname, [])
+
+    def _get_index_path(self, search_path: Path) -> Optional[Path]:
+        if self._index_dir is None:
+            return None
+
+        digest = hashlib.sha1(  # noqa: S324 not security
+            str(search_path).encode()
+        ).hexdigest()
+        return self._index_dir / f"{digest}.json"
+
+    def _load_index(self, search_path: Path) -> Optional[Dict[str, List[Path]]]:
+        index_path = self._get_index_path(search_path)
+        if index_path is None:
+            return None
+
+        try:
+            with index_path.open() as index_file:
+                data = json.load(index_file)
+            if data["format"] != _SONAME_INDEX_FORMAT or data["root"] != str(
+                search_path
+            ):
+                return None
+            for directory, mtime_ns in data["directories"]:
+                if os.stat(search_path / directory).st_mtime_ns != mtime_ns:
+                    emit.debug(f"Soname index for {str(search_path)!r} is outdated")
+                    return None
+            index = {
+                soname: [search_path / directory / soname for directory in directories]
+                for soname, directories in data["sonames"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        emit.debug(f"Loaded soname index for {str(search_path)!r}")
+        return index
+
+    def _build_index(self, search_path: Path) -> Dict[str, List[Path]]:
+        emit.debug(f"Indexing sonames in {str(search_path)!r}")
+        start_time_ns = time.time_ns()
+
+        directories: List[Tuple[str, int]] = []
+        sonames: Dict[str, List[str]] = collections.defaultdict(list)
+        for root, _, files in os.walk(search_path):
+            directory = os.path.relpath(root, search_path)
+            with contextlib.suppress(OSError):
+                directories.append((directory, os.stat(root).st_mtime_ns))
+            for name in files:
+                if _SONAME_INDEX_PATTERN in name:
+                    sonames[name].append(directory)
+
+        index_path = self._get_index_path(search_path)
+        # Directories modified while indexing may change again within the
+        # timestamp granularity, so the index can only be reused when all
+        # of them are older than the walk.
+        if index_path is not None and all(
+            mtime_ns < start_time_ns - 1_000_000_000 for _, mtime_ns in directories
+        ):
+            self._save_index(
+                index_path,
+                {
+                    "format": _SONAME_INDEX_FORMAT,
+                    "root": str(search_path),
+                    "directories": directories,
+                    "sonames": sonames,
+                },
+            )
+
+        return {
+            soname: [search_path / directory / soname for directory in dirs]
+            for soname, dirs in sonames.items()
+        }
+
+    @staticmethod
+    def _save_index(index_path: Path, data: Dict[str, Any]) -> None:
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd, temp_name = tempfile.mkstemp(dir=index_path.parent)
+        except OSError as error:
+            emit.debug(f"Cannot store soname index: {error}")
+            return
+
+        try:
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(data, temp_file)
+            os.replace(temp_name, index_path)
+        except OSError as error:
+            emit.debug(f"Cannot store soname index: {error}")
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+
 
 class _Library:
     """Represents the soname and path to the library.
@@ -172,11 +329,7 @@ class _Library:
             return self.soname_path
 
         for path in valid_search_paths:
-            for root, _, files in os.walk(path):
-                if self.soname not in files:
-                    continue
-
-                file_path = Path(root, self.soname.lstrip("/"))
+            for file_path in self.soname_cache.find(path, self.soname):
                 if self._is_valid_elf(file_path):
                     self._update_soname_cache(file_path)
                     return file_path
@@ -189,10 +342,11 @@ class _Library:
 class ElfFile:
     """ElfFile represents and elf file on a path and its attributes."""
 
-    def __init__(self, *, path: Path) -> None:
+    def __init__(self, *, path: Path, elf_cache: Optional[ElfCache] = None) -> None:
         """Initialize an ElfFile instance.
 
         :param str path: path to an elf_file within a snapcraft project.
+        :param elf_cache: a persistent cache of previously parsed attributes.
         """
         self.path = path
         self.dependencies: Set[_Library] = set()
@@ -202,6 +356,9 @@ class ElfFile:
         self.soname = ""
         self.versions: Set[str] = set()
         self.needed: Dict[str, _NeededLibrary] = {}
+        self.rpath = ""
+        self.runpath = ""
+        self.no_default_lib = False
         self.execstack_set = False
         self.is_dynamic = True
         self.build_id = ""
@@ -212,6 +369,13 @@ class ElfFile:
         # String of elf enum type, e.g. "ET_DYN", "ET_EXEC", etc.
         self.elf_type: str = "ET_NONE"
 
+        self._elf_cache = elf_cache
+
+        if elf_cache is not None:
+            attributes = elf_cache.get(path)
+            if attributes is not None and self._load_attributes(attributes):
+                return
+
         try:
             emit.debug(f"Extracting ELF attributes: {str(path)!r}")
             self._extract_attributes()
@@ -219,6 +383,9 @@ class ElfFile:
             emit.debug(f"Extracting ELF attributes exception: {str(exception)}")
             raise errors.CorruptedElfFile(path, exception)
 
+        if elf_cache is not None:
+            elf_cache.put(path, self._dump_attributes())
+
     @classmethod
     def is_elf(cls, path: Path) -> bool:
         """Determine whether the given file is an ELF file.
@@ -259,15 +426,7 @@ class ElfFile:
                 self.is_dynamic = True
 
                 for tag in section.iter_tags():
-                    if tag.entry.d_tag == "DT_NEEDED":
-                        needed = (
-                            tag.needed  # pyright: ignore[reportAttributeAccessIssue]
-                        )
-                        self.needed[needed] = _NeededLibrary(name=needed)
-                    elif tag.entry.d_tag == "DT_SONAME":
-                        self.soname = (
-                            tag.soname  # pyright: ignore[reportAttributeAccessIssue]
-                        )
+                    self._extract_dynamic_tag(tag)
 
             for segment in elf_file.iter_segments():
                 if segment["p_type"] == "PT_GNU_STACK":
@@ -318,6 +477,78 @@ class ElfFile:
 
             self.elf_type = elf_file.header["e_type"]
 
+    def _extract_dynamic_tag(self, tag: dynamic.DynamicTag) -> None:
+        if tag.entry.d_tag == "DT_NEEDED":
+            needed = tag.needed  # pyright: ignore[reportAttributeAccessIssue]
+            self.needed[needed] = _NeededLibrary(name=needed)
+        elif tag.entry.d_tag == "DT_SONAME":
+            self.soname = tag.soname  # pyright: ignore[reportAttributeAccessIssue]
+        elif tag.entry.d_tag == "DT_RPATH":
+            self.rpath = tag.rpath  # pyright: ignore[reportAttributeAccessIssue]
+        elif tag.entry.d_tag == "DT_RUNPATH":
+            self.runpath = tag.runpath  # pyright: ignore[reportAttributeAccessIssue]
+        elif tag.entry.d_tag == "DT_FLAGS_1":
+            self.no_default_lib = bool(
+                tag.entry.d_val & enums.ENUM_DT_FLAGS_1["DF_1_NODEFLIB"]
+            )
+
+    def _dump_attributes(self) -> Dict[str, Any]:
+        """Return the extracted attributes in a JSON serializable form."""
+        return {
+            "arch_tuple": self.arch_tuple,
+            "interp": self.interp,
+            "soname": self.soname,
+            "versions": sorted(self.versions),
+            "needed": {
+                name: sorted(library.versions) for name, library in self.needed.items()
+            },
+            "rpath": self.rpath,
+            "runpath": self.runpath,
+            "no_default_lib": self.no_default_lib,
+            "execstack_set": self.execstack_set,
+            "is_dynamic": self.is_dynamic,
+            "build_id": self.build_id,
+            "has_debug_info": self.has_debug_info,
+            "elf_type": self.elf_type,
+        }
+
+    def _load_attributes(self, attributes: Dict[str, Any]) -> bool:
+        """Restore attributes previously obtained with _dump_attributes.
+
+        :returns: True if the attributes were restored, False if they are invalid.
+        """
+        try:
+            arch_tuple = attributes["arch_tuple"]
+            needed: Dict[str, _NeededLibrary] = {}
+            for name, versions in attributes["needed"].items():
+                library = _NeededLibrary(name=name)
+                library.versions = set(versions)
+                needed[name] = library
+
+            values = {
+                "arch_tuple": tuple(arch_tuple[:3]) if arch_tuple else None,
+                "interp": attributes["interp"],
+                "soname": attributes["soname"],
+                "versions": set(attributes["versions"]),
+                "needed": needed,
+                "rpath": attributes["rpath"],
+                "runpath": attributes["runpath"],
+                "no_default_lib": attributes["no_default_lib"],
+                "execstack_set": attributes["execstack_set"],
+                "is_dynamic": attributes["is_dynamic"],
+                "build_id": attributes["build_id"],
+                "has_debug_info": attributes["has_debug_info"],
+                "elf_type": attributes["elf_type"],
+            }
+        except (KeyError, TypeError, AttributeError):
+            emit.debug(f"Ignoring invalid cached ELF attributes for {str(self.path)!r}")
+            return False
+
+        for name, value in values.items():
+            setattr(self, name, value)
+
+        return True
+
     def is_linker_compatible(self, *, linker_version: str) -> bool:
         """Determine if the linker will work given the required glibc version."""
         version_required = self.get_required_glibc()
@@ -386,7 +617,10 @@ class ElfFile:
             )
 
         libraries = _determine_libraries(
-            path=self.path, ld_library_paths=ld_library_paths, arch_triplet=arch_triplet
+            path=self.path,
+            ld_library_paths=ld_library_paths,
+            arch_triplet=arch_triplet,
+            elf_file=self,
         )
         for soname, soname_path in libraries.items():
             if self.arch_tuple is None:
@@ -416,8 +650,20 @@ def _get_host_libc_path(arch_triplet) -> Path:
 
 
 def _determine_libraries(
-    *, path: Path, ld_library_paths: List[str], arch_triplet: str
+    *,
+    path: Path,
+    ld_library_paths: List[str],
+    arch_triplet: str,
+    elf_file: Optional[ElfFile] = None,
 ) -> Dict[str, str]:
+    # Resolve dependencies in-process from the parsed dynamic sections.
+    if elf_file is not None:
+        libraries = _resolve_libraries(
+            elf_file, ld_library_paths=ld_library_paths, arch_triplet=arch_triplet
+        )
+        if libraries is not None:
+            return libraries
+
     # Try the usual method with ldd.
     with contextlib.suppress(subprocess.CalledProcessError):
         return _ldd(path, ld_library_paths)
@@ -441,6 +687,209 @@ def _determine_libraries(
     return {}
 
 
+def _resolve_libraries(
+    elf_file: ElfFile, *, ld_library_paths: List[str], arch_triplet: str
+) -> Optional[Dict[str, str]]:
+    """Resolve library dependencies without running the dynamic linker.
+
+    Dependencies are loaded breadth-first following the search order of the
+    glibc dynamic linker: DT_RPATH of the loading objects, LD_LIBRARY_PATH,
+    DT_RUNPATH, the paths configured in ld.so.conf and the system library
+    paths. Libraries that cannot be found map to their soname, as in the
+    output of ldd.
+
+    :returns: Dictionary of dependencies, mapping library name to path, or
+        None if they must be determined by running ldd.
+    """
+    if elf_file.arch_tuple is None or elf_file.arch_tuple != _get_host_arch_tuple():
+        return None
+
+    libraries: Dict[str, str] = {}
+    # Each entry holds a loaded object, its $ORIGIN, and the chain of
+    # objects (with their origins) that caused it to be loaded.
+    queue: Deque[Tuple[ElfFile, str, Tuple[Tuple[ElfFile, str], ...]]] = (
+        collections.deque()
+    )
+    queue.append((elf_file, os.path.dirname(os.path.realpath(elf_file.path)), ()))
+
+    while queue:
+        loading_file, origin, loaders = queue.popleft()
+        search_paths = _get_library_search_paths(
+            (loading_file, origin),
+            loaders=loaders,
+            ld_library_paths=ld_library_paths,
+            arch_triplet=arch_triplet,
+        )
+        if search_paths is None:
+            return None
+
+        for soname in loading_file.needed:
+            if (
+                soname in libraries
+                or "/" in soname
+                or _DYNAMIC_LINKER_SONAME.match(soname)
+            ):
+                continue
+
+            for search_path in search_paths:
+                soname_path = os.path.abspath(os.path.join(search_path, soname))
+                library = _load_library(
+                    soname_path, elf_file.arch_tuple, elf_file._elf_cache
+                )
+                if library is not None:
+                    libraries[soname] = soname_path
+                    queue.append(
+                        (
+                            library,
+                            os.path.dirname(soname_path),
+                            ((loading_file, origin), *loaders),
+                        )
+                    )
+                    break
+            else:
+                libraries[soname] = soname
+
+    return libraries
+
+
+def _get_library_search_paths(
+    loading_file: Tuple[ElfFile, str],
+    *,
+    loaders: Tuple[Tuple[ElfFile, str], ...],
+    ld_library_paths: List[str],
+    arch_triplet: str,
+) -> Optional[List[str]]:
+    """Return the paths searched for dependencies of an object, in order.
+
+    :param loading_file: the object loading dependencies and its $ORIGIN.
+    :param loaders: the chain of objects that caused it to be loaded, with
+        their $ORIGIN, ending with the object being resolved.
+
+    :returns: the list of paths, or None if they cannot be determined.
+    """
+    elf_file, origin = loading_file
+    paths: List[str] = []
+
+    # DT_RPATH is ignored if the loading object has DT_RUNPATH.
+    if not elf_file.runpath:
+        for loader, loader_origin in (loading_file, *loaders):
+            if loader.rpath and not loader.runpath:
+                rpaths = _expand_search_path(loader.rpath, origin=loader_origin)
+                if rpaths is None:
+                    return None
+                paths.extend(rpaths)
+
+    paths.extend(ld_library_paths)
+
+    if elf_file.runpath:
+        runpaths = _expand_search_path(elf_file.runpath, origin=origin)
+        if runpaths is None:
+            return None
+        paths.extend(runpaths)
+
+    system_paths = [
+        f"/lib/{arch_triplet}",
+        f"/usr/lib/{arch_triplet}",
+        "/lib",
+        "/usr/lib",
+    ]
+    paths.extend(p for p in _get_ld_so_conf_paths(_LD_SO_CONF) if p not in system_paths)
+    if not elf_file.no_default_lib:
+        paths.extend(system_paths)
+
+    return paths
+
+
+def _expand_search_path(search_path: str, *, origin: str) -> Optional[List[str]]:
+    """Split a DT_RPATH or DT_RUNPATH value and expand $ORIGIN in its entries.
+
+    :returns: the list of paths, or None if it uses unsupported tokens.
+    """
+    if _UNSUPPORTED_DST.search(search_path):
+        return None
+
+    return [
+        re.sub(r"\$(ORIGIN\b|\{ORIGIN\})", lambda _: origin, path)
+        for path in search_path.split(":")
+        if path
+    ]
+
+
+def _load_library(
+    path: str,
+    arch_tuple: _ElfArchitectureTuple,
+    elf_cache: Optional[ElfCache],
+) -> Optional[ElfFile]:
+    """Load the library in path if it is compatible with arch_tuple."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    library = _parse_library(path, stat.st_mtime_ns, stat.st_size, elf_cache)
+    if library is None or library.arch_tuple != arch_tuple:
+        return None
+
+    return library
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_library(
+    path: str, mtime_ns: int, size: int, elf_cache: Optional[ElfCache]
+) -> Optional[ElfFile]:
+    """Parse a library, memoized by path and modification time."""
+    if not ElfFile.is_elf(Path(path)):
+        return None
+
+    try:
+        return ElfFile(path=Path(path), elf_cache=elf_cache)
+    except (errors.CorruptedElfFile, ELFError):
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_host_arch_tuple() -> Optional[_ElfArchitectureTuple]:
+    """Return the architecture tuple of the running interpreter."""
+    try:
+        return ElfFile(path=Path(os.path.realpath(sys.executable))).arch_tuple
+    except (errors.CorruptedElfFile, ELFError, OSError):
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_ld_so_conf_paths(conf_path: Path) -> List[str]:
+    """Return the library paths configured in ld.so.conf and its includes."""
+    paths: List[str] = []
+    _read_ld_so_conf(conf_path, paths=paths, seen=set())
+    return paths
+
+
+def _read_ld_so_conf(conf_path: Path, *, paths: List[str], seen: Set[Path]) -> None:
+    if conf_path in seen:
+        return
+    seen.add(conf_path)
+
+    try:
+        lines = conf_path.read_text().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return
+
+    for line in lines:
+        line = line.split("#", 1)[0].strip()  # noqa: PLW2901
+        if not line or line.startswith("hwcap"):
+            continue
+
+        if line.startswith("include") and line[7:8].isspace():
+            pattern = os.path.join(conf_path.parent, line[8:].strip())
+            for included_path in sorted(glob.glob(pattern)):
+                _read_ld_so_conf(Path(included_path), paths=paths, seen=seen)
+            continue
+
+        for path in re.split(r"[\s:,]+", line):
+            if path and path not in paths:
+                paths.append(path)
+
+
 def _ldd(
     path: Path, ld_library_paths: List[str], *, ld_preload: Optional[str] = None
 ) -> Dict[str, str]:
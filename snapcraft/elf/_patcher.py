@@ -16,18 +16,21 @@
 
 """Use patchelf to patch ELF files."""
 
+import concurrent.futures
+import contextlib
 import functools
 import os
 import shutil
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import List, Set
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from craft_cli import emit
 
 from snapcraft import utils
 
+from . import _elf_editor
 from ._elf_file import ElfFile
 from .errors import PatcherError
 
@@ -61,6 +64,79 @@ class Patcher:
 
         :raises PatcherError: if the ELF file cannot be patched.
         """
+        patch_plan = self.get_patch_plan(
+            elf_file=elf_file, use_system_libs=use_system_libs
+        )
+
+        # an empty plan means there is nothing to do.
+        if not patch_plan:
+            return
+
+        self._patch_file(patch_plan=patch_plan, elf_file_path=elf_file.path)
+
+    def patch_files(
+        self,
+        *,
+        elf_files: Iterable[ElfFile],
+        use_system_libs: bool = True,
+        workers: int = 1,
+    ) -> None:
+        """Patch a list of ELF files, running patchelf concurrently.
+
+        Patch plans are computed in order before any file is modified, and
+        files that are already up to date are skipped.
+
+        :param elf_files: the ELF files to patch.
+        :param use_system_libs: If true, search for dependencies in the default
+            library search paths.
+        :param workers: the maximum number of files to patch concurrently.
+
+        :raises PatcherError: if an ELF file cannot be patched.
+        """
+        patch_plans: List[Tuple[Path, List[List[str]]]] = []
+        for elf_file in elf_files:
+            relative_path = elf_file.path
+            with contextlib.suppress(ValueError):
+                relative_path = elf_file.path.relative_to(self._root_path)
+            emit.progress(f"Patch ELF file: {str(relative_path)!r}")
+
+            patch_plan = self.get_patch_plan(
+                elf_file=elf_file, use_system_libs=use_system_libs
+            )
+            if patch_plan:
+                patch_plans.append((elf_file.path, patch_plan))
+
+        if not patch_plans:
+            return
+
+        emit.debug(f"Patching {len(patch_plans)} ELF files with {workers} workers")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self._patch_file, patch_plan=patch_plan, elf_file_path=path
+                )
+                for path, patch_plan in patch_plans
+            ]
+            try:
+                # Report the first failure in file order.
+                for future in futures:
+                    future.result()
+            except PatcherError:
+                executor.shutdown(cancel_futures=True)
+                raise
+
+    def get_patch_plan(
+        self, *, elf_file: ElfFile, use_system_libs: bool = True
+    ) -> List[List[str]]:
+        """Obtain the patchelf invocations needed to patch elf_file.
+
+        :param elf_file: a data object representing an elf file and its attributes.
+        :param use_system_libs: If true, search for dependencies in the default
+            library search paths.
+
+        :returns: a list of patchelf arguments, one entry per invocation, or an
+            empty list if the file does not need to be patched.
+        """
         patchelf_args = []
         if elf_file.interp and elf_file.interp != self._dynamic_linker:
             patchelf_args.extend(["--set-interpreter", self._dynamic_linker])
@@ -89,19 +165,35 @@ class Patcher:
 
         # no patchelf_args means there is nothing to do.
         if not patchelf_args:
-            return
+            return []
 
-        self._run_patchelf(patchelf_args=patchelf_args, elf_file_path=elf_file.path)
+        patch_plan = [patchelf_args]
 
         # `patchelf --no-default-libs` must be run after setting the rpath, see:
         # https://github.com/NixOS/patchelf/issues/223
         if elf_file.dependencies and not use_system_libs:
-            self._run_patchelf(
-                patchelf_args=["--no-default-lib"],
-                elf_file_path=elf_file.path,
-            )
+            patch_plan.append(["--no-default-lib"])
+
+        return patch_plan
+
+    def _patch_file(self, *, patch_plan: List[List[str]], elf_file_path: Path) -> None:
+        """Apply patch_plan to elf_file_path.
+
+        The file is edited in place when the changes fit in its current layout,
+        patchelf is used when the dynamic section or interpreter must grow.
+        """
+        edit_args = _get_edit_args(patch_plan)
+        if edit_args is not None and _elf_editor.edit_elf_file(
+            elf_file_path, **edit_args
+        ):
+            emit.debug(f"Edited {str(elf_file_path)!r} in place")
+            return
+
+        self._run_patchelf(patch_plan=patch_plan, elf_file_path=elf_file_path)
 
-    def _run_patchelf(self, *, patchelf_args: List[str], elf_file_path: Path) -> None:
+    def _run_patchelf(
+        self, *, patch_plan: List[List[str]], elf_file_path: Path
+    ) -> None:
         # Run patchelf on a copy of the primed file and replace it
         # after it is successful. This allows us to break the potential
         # hard link created when migrating the file across the steps of
@@ -109,29 +201,30 @@ class Patcher:
         with tempfile.NamedTemporaryFile() as temp_file:
             shutil.copy2(elf_file_path, temp_file.name)
 
-            cmd = [self._patchelf_cmd] + patchelf_args + [temp_file.name]
-            try:
-                emit.debug(f"executing: {' '.join(cmd)}")
-                subprocess.check_call(cmd)
-            # There is no need to catch FileNotFoundError as patchelf should be
-            # bundled with snapcraft which means its lack of existence is a
-            # "packager" error.
-            except subprocess.CalledProcessError as call_error:
-                raise PatcherError(
-                    elf_file_path, cmd=call_error.cmd, code=call_error.returncode
-                ) from call_error
+            for patchelf_args in patch_plan:
+                cmd = [self._patchelf_cmd] + patchelf_args + [temp_file.name]
+                try:
+                    emit.debug(f"executing: {' '.join(cmd)}")
+                    subprocess.check_call(cmd)
+                # There is no need to catch FileNotFoundError as patchelf should be
+                # bundled with snapcraft which means its lack of existence is a
+                # "packager" error.
+                except subprocess.CalledProcessError as call_error:
+                    raise PatcherError(
+                        elf_file_path, cmd=call_error.cmd, code=call_error.returncode
+                    ) from call_error
 
             # We unlink to break the potential hard link
             os.unlink(elf_file_path)
             shutil.copy2(temp_file.name, elf_file_path)
 
-    @functools.lru_cache(maxsize=1024)  # noqa: B019 Possible memory leaks in lru_cache
     def get_current_rpath(self, elf_file: ElfFile) -> List[str]:
-        """Obtain the current rpath from the ELF file dynamic section."""
-        output = subprocess.check_output(
-            [self._patchelf_cmd, "--print-rpath", str(elf_file.path)]
-        )
-        return [x for x in output.decode().strip().split(":") if x]
+        """Obtain the current rpath from the ELF file dynamic section.
+
+        As with ``patchelf --print-rpath``, DT_RUNPATH is preferred over DT_RPATH.
+        """
+        rpath = elf_file.runpath or elf_file.rpath
+        return [x for x in rpath.split(":") if x]
 
     @functools.lru_cache(maxsize=1024)  # noqa: B019 Possible memory leaks in lru_cache
     def get_proposed_rpath(self, elf_file: ElfFile) -> List[str]:
@@ -164,3 +257,28 @@ class Patcher:
         base_rpath_list = sorted(base_rpaths)
 
         return origin_rpath_list + base_rpath_list
+
+
+def _get_edit_args(patch_plan: List[List[str]]) -> Optional[Dict[str, Any]]:
+    """Translate patch_plan into arguments for an in place edit.
+
+    :returns: the arguments for ``edit_elf_file``, or None if the plan uses
+        patchelf options that cannot be applied in place.
+    """
+    args = [arg for patchelf_args in patch_plan for arg in patchelf_args]
+    # Only --force-rpath semantics (DT_RPATH) are implemented.
+    force_rpath = "--force-rpath" in args
+
+    edit_args: Dict[str, Any] = {}
+    while args:
+        arg = args.pop(0)
+        if arg == "--set-interpreter" and args:
+            edit_args["interpreter"] = args.pop(0)
+        elif arg == "--set-rpath" and args and force_rpath:
+            edit_args["rpath"] = args.pop(0)
+        elif arg == "--no-default-lib":
+            edit_args["no_default_lib"] = True
+        elif arg != "--force-rpath":
+            return None
+
+    return edit_args
@@ -16,49 +16,92 @@
 
 """Helpers to handle ELF files."""
 
+import concurrent.futures
 import functools
+import multiprocessing
+import multiprocessing.util
 import os
 import platform
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, List, Optional, Set
+from typing import Iterable, List, Optional, Tuple
 
-from craft_cli import emit
+from craft_cli import EmitterMode, emit
 from elftools.common.exceptions import ELFError
+from xdg import BaseDirectory
 
-from . import ElfFile, errors
+from . import ElfCache, ElfFile, SonameCache, errors
+
+# The minimum number of files to parse in worker processes.
+_PARALLEL_THRESHOLD = 256
+
+# The number of files handed to a worker process at a time.
+_PARALLEL_CHUNK_SIZE = 64
+
+
+def get_elf_cache() -> ElfCache:
+    """Obtain the persistent cache of ELF file attributes for this user."""
+    return ElfCache(Path(BaseDirectory.save_cache_path("snapcraft", "elf")))
+
+
+def get_soname_cache() -> SonameCache:
+    """Obtain a soname cache backed by the persistent soname indexes for this user."""
+    return SonameCache(
+        index_dir=Path(BaseDirectory.save_cache_path("snapcraft", "soname-index"))
+    )
 
 
 @functools.lru_cache(maxsize=1)
-def get_elf_files(root_path: Path) -> List[ElfFile]:
+def get_elf_files(
+    root_path: Path, *, elf_cache: Optional[ElfCache] = None, workers: int = 1
+) -> List[ElfFile]:
     """Obtain a set of all ELF files in a subtree.
 
     :param root_path: The root of the subtree to list ELF files from.
+    :param elf_cache: A persistent cache of ELF file attributes.
+    :param workers: The maximum number of processes used to parse files.
     :return: A set of ELF files found in the given subtree.
     """
     file_list: List[str] = []
-    for root, _, files in os.walk(str(root_path)):
-        for file_name in files:
-            # Filter out object files
-            if file_name.endswith(".o"):
-                continue
-
-            file_path = os.path.join(root, file_name)
-            if not os.path.islink(file_path):
-                file_list.append(file_path)
-
-    return get_elf_files_from_list(root_path, file_list)
-
-
-def get_elf_files_from_list(root: Path, file_list: Iterable[str]) -> List[ElfFile]:
+    directories = [str(root_path)]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                # No need to crawl links-- the original should be here, too.
+                if entry.is_symlink():
+                    continue
+
+                if entry.is_dir():
+                    directories.append(entry.path)
+                # Filter out object files
+                elif not entry.name.endswith(".o"):
+                    file_list.append(entry.path)
+
+    return get_elf_files_from_list(
+        root_path, file_list, elf_cache=elf_cache, workers=workers
+    )
+
+
+def get_elf_files_from_list(
+    root: Path,
+    file_list: Iterable[str],
+    *,
+    elf_cache: Optional[ElfCache] = None,
+    workers: int = 1,
+) -> List[ElfFile]:
     """Return a list of ELF files from file_list prepended with root.
 
+    Files are parsed in up to ``workers`` processes if the list is large
+    enough to make it worthwhile.
+
     :param str root: the root directory from where the file_list is generated.
     :param file_list: a list of file in root.
-    :returns: a list of ElfFile objects.
+    :param elf_cache: a persistent cache of ELF file attributes.
+    :param workers: the maximum number of processes used to parse files.
+    :returns: a list of ELF files sorted by path.
     """
-    elf_files: Set[ElfFile] = set()
-
+    paths: List[Path] = []
     for part_file in file_list:
         # Filter out object (*.o) files-- we only care about binaries.
         if part_file.endswith(".o"):
@@ -70,25 +113,104 @@ def get_elf_files_from_list(root: Path, file_list: Iterable[str]) -> List[ElfFil
             emit.debug(f"Skipped link {path!r} while finding dependencies")
             continue
 
+        paths.append(path)
+
+    if workers > 1 and len(paths) >= _PARALLEL_THRESHOLD:
+        elf_files = _load_elf_files_parallel(
+            paths, elf_cache=elf_cache, workers=workers
+        )
+    else:
+        elf_files, messages = _load_elf_files(paths, elf_cache=elf_cache)
+        for message in messages:
+            emit.message(message)
+
+    if elf_cache is not None:
+        emit.debug(f"ELF cache: {elf_cache.hits} hits, {elf_cache.misses} misses")
+        elf_cache.prune()
+
+    return sorted(elf_files, key=lambda x: x.path)
+
+
+def _load_elf_files(
+    paths: List[Path], *, elf_cache: Optional[ElfCache]
+) -> Tuple[List[ElfFile], List[str]]:
+    """Parse the ELF files in paths that have dynamic dependencies.
+
+    :returns: a tuple with the list of ELF files and a list of messages
+        about corrupted files.
+    """
+    elf_files: List[ElfFile] = []
+    messages: List[str] = []
+
+    for path in paths:
         # Ignore if file does not have ELF header.
         if not ElfFile.is_elf(path):
             continue
 
         try:
-            elf_file = ElfFile(path=path)
+            elf_file = ElfFile(path=path, elf_cache=elf_cache)
         except ELFError:
             # Ignore invalid ELF files.
             continue
         except errors.CorruptedElfFile as exception:
             # Log if the ELF file seems corrupted
-            emit.message(str(exception))
+            messages.append(str(exception))
             continue
 
         # If ELF has dynamic symbols, add it.
         if elf_file.needed:
-            elf_files.add(elf_file)
+            elf_files.append(elf_file)
+
+    return elf_files, messages
+
+
+def _load_elf_files_parallel(
+    paths: List[Path], *, elf_cache: Optional[ElfCache], workers: int
+) -> List[ElfFile]:
+    """Parse ELF files in a pool of worker processes."""
+    chunks = [
+        paths[i : i + _PARALLEL_CHUNK_SIZE]
+        for i in range(0, len(paths), _PARALLEL_CHUNK_SIZE)
+    ]
+    emit.debug(f"Parsing {len(paths)} files with {workers} processes")
+
+    elf_files: List[ElfFile] = []
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as executor:
+        results = executor.map(_load_elf_files_worker, chunks, repeat(elf_cache))
+        for chunk_elf_files, messages, worker_cache in results:
+            elf_files.extend(chunk_elf_files)
+            for message in messages:
+                emit.message(message)
+            if elf_cache is not None and worker_cache is not None:
+                elf_cache.merge(worker_cache)
+
+    return elf_files
+
+
+def _init_worker() -> None:
+    """Set up the emitter in a worker process.
+
+    Messages from workers are not shown; the emitter is ended when the
+    worker exits so that it does not keep the process alive.
+    """
+    emit.init(EmitterMode.QUIET, "snapcraft", "", log_filepath=Path(os.devnull))
+    multiprocessing.util.Finalize(None, emit.ended_ok, exitpriority=0)
 
-    return sorted(elf_files, key=lambda x: x.path)
+
+def _load_elf_files_worker(
+    paths: List[Path], elf_cache: Optional[ElfCache]
+) -> Tuple[List[ElfFile], List[str], Optional[ElfCache]]:
+    # Use a fresh instance so that only the lookups done for this chunk are
+    # accounted for when merged back into the caller's cache.
+    if elf_cache is not None:
+        elf_cache = ElfCache(elf_cache.cache_dir, max_size=elf_cache.max_size)
+
+    elf_files, messages = _load_elf_files(paths, elf_cache=elf_cache)
+    return elf_files, messages, elf_cache
 
 
 @dataclass(frozen=True)
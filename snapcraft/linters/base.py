@@ -19,13 +19,15 @@
 import abc
 import enum
 import fnmatch
+import threading
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Literal, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Set, Union
 
 import pydantic
 from craft_cli import emit
 
-from snapcraft import elf, models
+from snapcraft import elf, models, utils
+from snapcraft.elf import elf_utils
 
 if TYPE_CHECKING:
     from snapcraft.meta.snap_yaml import SnapMetadata
@@ -80,10 +82,72 @@ class LinterIssue(pydantic.BaseModel):
         alias_generator = lambda s: s.replace("_", "-")  # noqa: E731
 
 
+class LinterPayload:
+    """The contents of the snap payload, shared by the linters.
+
+    Linters run in the root of the payload. ELF files are scanned once, on
+    first use, and their dependencies are loaded once no matter how many
+    linters ask for them. This object may be used from several threads.
+
+    :param snap_metadata: The snap metadata read from the payload.
+    """
+
+    def __init__(self, *, snap_metadata: "SnapMetadata") -> None:
+        self.snap_metadata = snap_metadata
+        self._lock = threading.Lock()
+        self._elf_files: Optional[List[elf.ElfFile]] = None
+        self._soname_cache: Optional[elf.SonameCache] = None
+        self._dependency_locks: Dict[Path, threading.Lock] = {}
+        self._dependencies: Dict[Path, Set[Path]] = {}
+
+    def get_elf_files(self) -> List[elf.ElfFile]:
+        """Obtain the ELF files in the payload."""
+        with self._lock:
+            if self._elf_files is None:
+                self._elf_files = elf_utils.get_elf_files(
+                    Path(),
+                    elf_cache=elf_utils.get_elf_cache(),
+                    workers=utils.get_parallel_build_count(),
+                )
+            return self._elf_files
+
+    def load_dependencies(self, elf_file: elf.ElfFile) -> Set[Path]:
+        """Load the dependencies of an ELF file in the payload.
+
+        Dependencies are searched in the payload, the content directories
+        and the installed base snap.
+
+        :param elf_file: The ELF file to load dependencies for.
+
+        :returns: The paths to the dependencies not in the base snap.
+        """
+        with self._lock:
+            lock = self._dependency_locks.setdefault(elf_file.path, threading.Lock())
+            if self._soname_cache is None:
+                self._soname_cache = elf_utils.get_soname_cache()
+
+        with lock:
+            if elf_file.path not in self._dependencies:
+                base = self.snap_metadata.base
+                self._dependencies[elf_file.path] = elf_file.load_dependencies(
+                    root_path=Path().absolute(),
+                    base_path=(
+                        Path(f"/snap/{base}/current")
+                        if base and base != "bare"
+                        else None
+                    ),
+                    content_dirs=self.snap_metadata.get_provider_content_directories(),
+                    arch_triplet=elf_utils.get_arch_triplet(),
+                    soname_cache=self._soname_cache,
+                )
+            return self._dependencies[elf_file.path]
+
+
 class Linter(abc.ABC):
     """Base class for linters.
 
     :param project: The snap project information.
+    :param payload: The snap payload shared with other linters.
     """
 
     def __init__(
@@ -91,10 +155,17 @@ class Linter(abc.ABC):
         name: str,
         snap_metadata: "SnapMetadata",
         lint: Optional[models.Lint],
+        payload: Optional[LinterPayload] = None,
     ):
         self._name = name
         self._snap_metadata = snap_metadata
         self._lint = lint or models.Lint(ignore=[])
+        self._payload = payload or LinterPayload(snap_metadata=snap_metadata)
+
+    @property
+    def name(self) -> str:
+        """The name of the linter."""
+        return self._name
 
     @abc.abstractmethod
     def run(self) -> List[LinterIssue]:
@@ -21,7 +21,7 @@ from typing import List
 
 from overrides import overrides
 
-from snapcraft.elf import ElfFile, Patcher, SonameCache, elf_utils, errors
+from snapcraft.elf import ElfFile, Patcher, elf_utils, errors
 
 from .base import Linter, LinterIssue, LinterResult
 
@@ -73,23 +73,15 @@ class ClassicLinter(Linter):
             return []
 
         issues = [issue]
-        elf_files = elf_utils.get_elf_files(current_path)
+        elf_files = self._payload.get_elf_files()
         patcher = Patcher(dynamic_linker=linker, root_path=current_path.absolute())
-        soname_cache = SonameCache()
-        arch_triplet = elf_utils.get_arch_triplet()
 
         for elf_file in elf_files:
             # Skip linting files listed in the ignore list.
             if self._is_file_ignored(elf_file):
                 continue
 
-            elf_file.load_dependencies(
-                root_path=current_path.absolute(),
-                base_path=installed_base_path,
-                content_dirs=self._snap_metadata.get_provider_content_directories(),
-                arch_triplet=arch_triplet,
-                soname_cache=soname_cache,
-            )
+            self._payload.load_dependencies(elf_file)
 
             self._check_elf_interpreter(elf_file, linker=linker, issues=issues)
             self._check_elf_rpath(elf_file, patcher=patcher, issues=issues)
@@ -15,19 +15,22 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """Library linter implementation."""
+import functools
 import re
 import subprocess
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, List, Set
 
 from craft_cli import emit
 from overrides import overrides
 
-from snapcraft.elf import ElfFile, SonameCache, elf_utils
+from snapcraft.elf import ElfFile, elf_utils
 from snapcraft.elf import errors as elf_errors
 
 from .base import Linter, LinterIssue, LinterResult, Optional
 
+_DPKG_INFO_DIR = Path("/var/lib/dpkg/info")
+
 
 class LibraryLinter(Linter):
     """Linter for dynamic library availability in snap."""
@@ -53,8 +56,7 @@ class LibraryLinter(Linter):
             installed_base_path = None
 
         issues: List[LinterIssue] = []
-        elf_files = elf_utils.get_elf_files(current_path)
-        soname_cache = SonameCache()
+        elf_files = self._payload.get_elf_files()
         all_libraries: Set[Path] = set()
         used_libraries: Set[Path] = set()
 
@@ -66,7 +68,6 @@ class LibraryLinter(Linter):
             if self._is_file_ignored(elf_file):
                 continue
 
-            arch_triplet = elf_utils.get_arch_triplet()
             content_dirs = self._snap_metadata.get_provider_content_directories()
 
             # if the elf file is a library, add it to the list of all libraries
@@ -74,13 +75,7 @@ class LibraryLinter(Linter):
                 # resolve symlinks to libraries
                 all_libraries.add(elf_file.path.resolve())
 
-            dependencies = elf_file.load_dependencies(
-                root_path=current_path.absolute(),
-                base_path=installed_base_path,
-                content_dirs=content_dirs,
-                arch_triplet=arch_triplet,
-                soname_cache=soname_cache,
-            )
+            dependencies = self._payload.load_dependencies(elf_file)
 
             # collect paths to local libraries used by the elf file
             for dependency in dependencies:
@@ -111,24 +106,7 @@ class LibraryLinter(Linter):
 
     def _generate_ld_config_cache(self) -> None:
         """Generate a cache of ldconfig output that maps library names to paths."""
-        # Match lines like:
-        # libcurl.so.4 (libc6,x86-64) => /lib/x86_64-linux-gnu/libcurl.so.4
-        # Ignored any architecture in it, may be a problem in the future?
-        ld_regex = re.compile(r"^\s*(\S+)\s+\(.*\)\s+=>\s+(\S+)$")
-
-        try:
-            output = subprocess.run(
-                ["ldconfig", "-N", "-p"],
-                check=True,
-                stdout=subprocess.PIPE,
-            )
-        except subprocess.CalledProcessError:
-            return
-
-        for line in output.stdout.decode("UTF-8").splitlines():
-            match = ld_regex.match(line)
-            if match:
-                self._ld_config_cache[match.group(1)] = Path(match.group(2))
+        self._ld_config_cache = _get_ld_config_cache()
 
     def _find_deb_package(self, library_name: str) -> Optional[str]:
         """Find the deb package that provides a library.
@@ -138,23 +116,19 @@ class LibraryLinter(Linter):
         :returns: the corresponding deb package name, or None if the library
         is not provided by any system package.
         """
-        if library_name in self._ld_config_cache:
-            # Must be resolved to an absolute path for dpkg to find it
-            library_absolute_path = self._ld_config_cache[library_name].resolve()
-            try:
-                output = subprocess.run(
-                    ["dpkg", "-S", library_absolute_path.as_posix()],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                )
-            except subprocess.CalledProcessError:
-                # If the specified file doesn't belong to any package, the
-                # call will trigger an exception.
-                return None
-            except FileNotFoundError:
-                # In case that dpkg isn't available
-                return None
-            return output.stdout.decode("UTF-8").split(":", maxsplit=1)[0]
+        if library_name not in self._ld_config_cache:
+            return None
+
+        library_path = self._ld_config_cache[library_name]
+        file_owners = _get_deb_file_owners()
+
+        # Packages may list the library through a usrmerge symlink, so try
+        # the resolved path first and then the path known to ldconfig.
+        for path in (library_path.resolve(), library_path):
+            deb_package = file_owners.get(path.as_posix())
+            if deb_package:
+                return deb_package
+
         return None
 
     def _check_dependencies_satisfied(
@@ -273,3 +247,60 @@ class LibraryLinter(Linter):
                 return True
 
         return False
+
+
+@functools.lru_cache(maxsize=1)
+def _get_ld_config_cache() -> Dict[str, Path]:
+    """Map the library names known to ldconfig to their paths.
+
+    The result is computed once per process.
+    """
+    # Match lines like:
+    # libcurl.so.4 (libc6,x86-64) => /lib/x86_64-linux-gnu/libcurl.so.4
+    # Ignored any architecture in it, may be a problem in the future?
+    ld_regex = re.compile(r"^\s*(\S+)\s+\(.*\)\s+=>\s+(\S+)$")
+    ld_config_cache: Dict[str, Path] = {}
+
+    try:
+        output = subprocess.run(
+            ["ldconfig", "-N", "-p"],
+            check=True,
+            stdout=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError:
+        return ld_config_cache
+
+    for line in output.stdout.decode("UTF-8").splitlines():
+        match = ld_regex.match(line)
+        if match:
+            ld_config_cache[match.group(1)] = Path(match.group(2))
+
+    return ld_config_cache
+
+
+@functools.lru_cache(maxsize=1)
+def _get_deb_file_owners() -> Dict[str, str]:
+    """Map the files installed by deb packages to the package that owns them.
+
+    The dpkg database file lists are read once per process, instead of
+    running ``dpkg -S`` for each library.
+    """
+    file_owners: Dict[str, str] = {}
+
+    try:
+        list_paths = sorted(_DPKG_INFO_DIR.glob("*.list"))
+    except OSError:
+        return file_owners
+
+    emit.debug(f"Loading {len(list_paths)} deb package file lists")
+    for list_path in list_paths:
+        # Multi-arch packages are listed as <package>:<arch>.list
+        deb_package = list_path.stem.split(":", maxsplit=1)[0]
+        try:
+            with list_path.open(encoding="utf-8", errors="surrogateescape") as file:
+                for line in file:
+                    file_owners.setdefault(line.rstrip("\n"), deb_package)
+        except OSError as error:
+            emit.debug(f"Cannot read {str(list_path)!r}: {error}")
+
+    return file_owners
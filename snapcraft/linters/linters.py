@@ -16,10 +16,12 @@
 
 """Snapcraft linting execution and reporting."""
 
+import concurrent.futures
 import enum
 import fnmatch
 import json
 import os
+import time
 from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional, Type
@@ -29,7 +31,7 @@ from craft_cli import emit
 from snapcraft import models
 from snapcraft.meta import snap_yaml
 
-from .base import Linter, LinterIssue, LinterResult
+from .base import Linter, LinterIssue, LinterPayload, LinterResult
 from .classic_linter import ClassicLinter
 from .library_linter import LibraryLinter
 
@@ -125,8 +127,10 @@ def run_linters(location: Path, *, lint: Optional[models.Lint]) -> List[LinterIs
 
         emit.progress("Reading snap metadata...")
         snap_metadata = snap_yaml.read(Path())
+        payload = LinterPayload(snap_metadata=snap_metadata)
 
         emit.progress("Running linters...")
+        enabled_linters: List[Linter] = []
         for name, linter_class in LINTERS.items():
             if lint and lint.all_ignored(name):
                 continue
@@ -136,10 +140,23 @@ def run_linters(location: Path, *, lint: Optional[models.Lint]) -> List[LinterIs
             if lint and categories and all(lint.all_ignored(c) for c in categories):
                 continue
 
-            linter = linter_class(name=name, lint=lint, snap_metadata=snap_metadata)
-            emit.progress(f"Running linter: {name}")
-            issues = linter.run()
-            all_issues += issues
+            enabled_linters.append(
+                linter_class(
+                    name=name, lint=lint, snap_metadata=snap_metadata, payload=payload
+                )
+            )
+
+        if enabled_linters:
+            # Linters share the payload, so the ELF files are scanned once and
+            # the linters run concurrently. Issues are kept in linter order.
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(enabled_linters)
+            ) as executor:
+                futures = [
+                    executor.submit(_run_linter, linter) for linter in enabled_linters
+                ]
+                for future in futures:
+                    all_issues += future.result()
     finally:
         os.chdir(previous_dir)
 
@@ -148,6 +165,17 @@ def run_linters(location: Path, *, lint: Optional[models.Lint]) -> List[LinterIs
     return all_issues
 
 
+def _run_linter(linter: Linter) -> List[LinterIssue]:
+    """Run a linter and report how long it took."""
+    emit.progress(f"Running linter: {linter.name}")
+    start_time = time.monotonic()
+    issues = linter.run()
+    emit.debug(
+        f"Linter {linter.name!r} finished in {time.monotonic() - start_time:.3f}s"
+    )
+    return issues
+
+
 def _ignore_matching_filenames(
     issues: List[LinterIssue], *, lint: Optional[models.Lint]
 ) -> None:
@@ -16,14 +16,38 @@
 
 """Snap file packing."""
 
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import stat
 import subprocess
+import tempfile
+import threading
 from functools import wraps
 from pathlib import Path
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import yaml
 from craft_cli import emit
 
-from snapcraft import errors
+from snapcraft import errors, utils
+
+# Validation rules used by snapd for snap.yaml.
+_SNAP_NAME_REGEX = re.compile(r"^(?:[a-z0-9]+-?)*[a-z](?:-?[a-z0-9])*$")
+_VERSION_REGEX = re.compile(r"^[a-zA-Z0-9](?:[a-zA-Z0-9:.+~-]{0,30}[a-zA-Z0-9+~])?$")
+_APP_NAME_REGEX = re.compile(r"^[a-zA-Z0-9](?:-?[a-zA-Z0-9])*$")
+_HOOK_NAME_REGEX = re.compile(r"^[a-z](?:-?[a-z0-9])*$")
+
+# Components packed concurrently must not refresh snapd at the same time.
+_SNAPD_REFRESH_LOCK = threading.Lock()
+
+_PACK_CACHE_FORMAT = 2
+_PACK_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+_READ_SIZE = 1024 * 1024
 
 
 def _verify_snap(directory: Path) -> None:
@@ -45,6 +69,77 @@ def _verify_snap(directory: Path) -> None:
         raise errors.SnapcraftError(msg, details=f"{err!s}") from err
 
 
+def _validate_snap_yaml(snap_yaml: Dict[str, Any]) -> None:
+    name = snap_yaml.get("name")
+    if not isinstance(name, str) or not 2 <= len(name) <= 40:
+        raise ValueError(f"invalid snap name: {name!r}")
+    if not _SNAP_NAME_REGEX.match(name):
+        raise ValueError(f"invalid snap name: {name!r}")
+
+    version = snap_yaml.get("version")
+    if version is None or version == "":
+        raise ValueError("snap version cannot be empty")
+    if not isinstance(version, str) or not _VERSION_REGEX.match(version):
+        raise ValueError(f"invalid snap version: {version!r}")
+
+    for section, regex in (("apps", _APP_NAME_REGEX), ("hooks", _HOOK_NAME_REGEX)):
+        entries = snap_yaml.get(section) or {}
+        if not isinstance(entries, dict):
+            raise ValueError(f"{section!r} must be a mapping")
+        for entry_name in entries:
+            if not isinstance(entry_name, str) or not regex.match(entry_name):
+                raise ValueError(f"invalid {section[:-1]} name: {entry_name!r}")
+
+
+def verify_snap_yaml(directory: Path) -> Dict[str, Any]:
+    """Validate the names and version in meta/snap.yaml without `snap pack`.
+
+    Only the snap name, version, app names and hook names are checked, a
+    subset of `snap pack --check-skeleton`. The remaining checks are done
+    by `snap pack` itself when the snap is packed.
+
+    :param directory: Directory to pack.
+
+    :returns: The snap metadata.
+
+    :raises SnapcraftError: If the snap metadata is invalid.
+    """
+    emit.debug("pack_snap: verify snap.yaml")
+    snap_yaml_path = Path(directory, "meta", "snap.yaml")
+    try:
+        with snap_yaml_path.open(encoding="utf-8") as snap_yaml_file:
+            snap_yaml = yaml.safe_load(snap_yaml_file)
+    except OSError as err:
+        raise errors.SnapcraftError(
+            f"Cannot pack snap: cannot read {str(snap_yaml_path)!r}: {err.strerror}"
+        ) from err
+    except yaml.YAMLError as err:
+        raise errors.SnapcraftError(
+            f"Cannot pack snap: invalid {str(snap_yaml_path)!r}", details=str(err)
+        ) from err
+
+    try:
+        if not isinstance(snap_yaml, dict):
+            raise ValueError("snap.yaml must be a mapping")
+        _validate_snap_yaml(snap_yaml)
+    except ValueError as err:
+        raise errors.SnapcraftError(f"Cannot pack snap: {err!s}") from err
+
+    return snap_yaml
+
+
+def _get_default_filename(snap_yaml: Dict[str, Any]) -> str:
+    """Get the filename `snap pack` uses when none is given.
+
+    :param snap_yaml: The snap metadata.
+
+    :return: The filename, <name>_<version>_<architecture>.snap.
+    """
+    architectures = snap_yaml.get("architectures") or ["all"]
+    architecture = architectures[0] if len(architectures) == 1 else "multi"
+    return f"{snap_yaml['name']}_{snap_yaml['version']}_{architecture}.snap"
+
+
 def _get_directory(output: Optional[str]) -> Path:
     """Get directory to output the snap file to.
 
@@ -91,6 +186,23 @@ def _get_filename(
     return None
 
 
+def _get_pack_command(
+    directory: Path,
+    output_dir: Path,
+    output_file: Optional[str],
+    compression: Optional[str],
+) -> List[Union[str, Path]]:
+    command: List[Union[str, Path]] = ["snap", "pack"]
+
+    if output_file:
+        command.extend(["--filename", output_file])
+    if compression:
+        command.extend(["--compression", compression])
+    command.extend([directory, output_dir])
+
+    return command
+
+
 def _pack(
     directory: Path,
     output_dir: Path,
@@ -108,13 +220,7 @@ def _pack(
 
     :raises SnapcraftError: If the directory cannot be packed.
     """
-    command: List[Union[str, Path]] = ["snap", "pack"]
-
-    if output_file:
-        command.extend(["--filename", output_file])
-    if compression:
-        command.extend(["--compression", compression])
-    command.extend([directory, output_dir])
+    command = _get_pack_command(directory, output_dir, output_file, compression)
 
     emit.debug(f"Pack command: {command}")
     try:
@@ -131,6 +237,216 @@ def _pack(
     return Path(str(proc.stdout).partition(":")[2].strip()).name
 
 
+def _calculate_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with path.open("rb") as file:
+        for block in iter(lambda: file.read(_READ_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _copy_file(source: Path, destination: Path) -> None:
+    """Copy source to destination, replacing it atomically."""
+    temp_fd, temp_name = tempfile.mkstemp(dir=destination.parent)
+    os.close(temp_fd)
+    try:
+        shutil.copyfile(source, temp_name)
+        os.replace(temp_name, destination)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+class PackCache:
+    """The last packed snap and the digests of the files it was packed from.
+
+    A snap is reused instead of being packed again if the directory to pack
+    has the same contents. Files are only hashed again if their size or
+    modification time changed since the last pack; their inode is ignored,
+    as re-priming recreates the files but keeps their modification time.
+
+    The cache root holds the last snap packed from every directory. When a
+    snap is saved, the entries of the other directories are removed, least
+    recently used first, until the cache root is within max_size. The entry
+    being saved is always kept.
+
+    :param cache_root: The directory holding the cached snaps.
+    :param directory: The directory the snaps are packed from.
+    :param max_size: The maximum size of the cache root in bytes.
+    """
+
+    def __init__(
+        self,
+        cache_root: Path,
+        directory: Path,
+        *,
+        max_size: int = _PACK_CACHE_MAX_SIZE,
+    ) -> None:
+        directory_id = hashlib.sha256(str(directory.resolve()).encode()).hexdigest()
+        self.cache_root = cache_root
+        self.path = cache_root / directory_id
+        self.max_size = max_size
+        self._state = self._load()
+        self._files: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def _state_path(self) -> Path:
+        return self.path / "state.json"
+
+    @property
+    def _image_path(self) -> Path:
+        return self.path / "last.snap"
+
+    def reuse(
+        self,
+        directory: Path,
+        *,
+        output_dir: Path,
+        output_file: Optional[str],
+        compression: Optional[str],
+    ) -> Optional[str]:
+        """Copy the cached snap to the output if directory is unchanged.
+
+        :param directory: Directory to pack.
+        :param output_dir: Directory to output the snap to.
+        :param output_file: Name of the snap.
+        :param compression: Compression type to use, None for defaults.
+
+        :returns: The filename of the reused snap, or None if the directory
+            needs to be packed.
+        """
+        previous_files = self._state.get("files", {})
+        self._files = self._get_files(directory, previous_files)
+
+        changed = [
+            name
+            for name in self._files.keys() | previous_files.keys()
+            if self._get_contents(self._files.get(name))
+            != self._get_contents(previous_files.get(name))
+        ]
+        emit.debug(
+            f"pack cache: {len(changed)} of {len(self._files)} files changed "
+            "since the last pack"
+        )
+        if changed or self._state.get("compression") != compression:
+            return None
+
+        filename = output_file or self._state["filename"]
+        try:
+            if self._image_path.stat().st_size != self._state["size"]:
+                return None
+            _copy_file(self._image_path, output_dir / filename)
+            # Mark the entry as recently used.
+            os.utime(self._state_path)
+        except OSError as error:
+            emit.debug(f"Cannot reuse cached snap {str(self._image_path)!r}: {error}")
+            return None
+        return filename
+
+    def save(self, snap_path: Path, *, compression: Optional[str]) -> None:
+        """Keep snap_path as the snap packed from the directory last checked.
+
+        :param snap_path: The packed snap.
+        :param compression: The compression type the snap was packed with.
+        """
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with contextlib.suppress(FileNotFoundError):
+                self._state_path.unlink()
+            _copy_file(snap_path, self._image_path)
+            state = {
+                "format": _PACK_CACHE_FORMAT,
+                "compression": compression,
+                "filename": snap_path.name,
+                "size": self._image_path.stat().st_size,
+                "files": self._files,
+            }
+            temp_fd, temp_name = tempfile.mkstemp(dir=self.path)
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(state, temp_file)
+            os.replace(temp_name, self._state_path)
+        except OSError as error:
+            emit.debug(f"Cannot write pack cache {str(self.path)!r}: {error}")
+            return
+        self._state = state
+        self._prune()
+
+    def _prune(self) -> None:
+        """Remove the least recently used entries of other directories."""
+        entries: List[Tuple[float, int, str]] = []
+        total_size = 0
+        with contextlib.suppress(FileNotFoundError):
+            for entry in os.scandir(self.cache_root):
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                size, last_used = _get_pack_cache_usage(Path(entry.path))
+                total_size += size
+                if entry.path != str(self.path):
+                    entries.append((last_used, size, entry.path))
+
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            emit.debug(f"Removing pack cache {entry_path!r}")
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with self._state_path.open() as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(state, dict) or state.get("format") != _PACK_CACHE_FORMAT:
+            return {}
+        return state
+
+    @staticmethod
+    def _get_contents(entry: Optional[Dict[str, Any]]) -> Optional[Tuple[int, str]]:
+        if entry is None:
+            return None
+        return entry["mode"], entry["digest"]
+
+    @staticmethod
+    def _get_files(
+        directory: Path, previous_files: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        files: Dict[str, Dict[str, Any]] = {}
+        for root, dirnames, filenames in os.walk(directory):
+            for name in dirnames + filenames:
+                path = Path(root, name)
+                relpath = str(path.relative_to(directory))
+                info = path.lstat()
+                entry: Dict[str, Any] = {"mode": info.st_mode, "digest": ""}
+                if stat.S_ISLNK(info.st_mode):
+                    entry["digest"] = os.readlink(path)
+                elif stat.S_ISREG(info.st_mode):
+                    entry["stat"] = [info.st_size, info.st_mtime_ns]
+                    previous = previous_files.get(relpath)
+                    if previous and previous.get("stat") == entry["stat"]:
+                        entry["digest"] = previous["digest"]
+                    else:
+                        entry["digest"] = _calculate_sha256(path)
+                files[relpath] = entry
+        return files
+
+
+def _get_pack_cache_usage(path: Path) -> Tuple[int, float]:
+    """Get the size and last use time of a pack cache entry."""
+    size = 0
+    last_used = 0.0
+    with contextlib.suppress(FileNotFoundError):
+        for entry in os.scandir(path):
+            with contextlib.suppress(FileNotFoundError):
+                info = entry.stat(follow_symlinks=False)
+                size += info.st_size
+                if entry.name == "state.json":
+                    last_used = info.st_mtime
+    return size, last_used
+
+
 def _retry_with_newer_snapd(func):
 
     @wraps(func)
@@ -141,9 +457,12 @@ def _retry_with_newer_snapd(func):
             return func(directory, output_dir, compression)
         except errors.SnapcraftError:
             try:
-                with emit.open_stream(
-                    "Refreshing snapd to support components"
-                ) as stream:
+                with (
+                    _SNAPD_REFRESH_LOCK,
+                    emit.open_stream(
+                        "Refreshing snapd to support components"
+                    ) as stream,
+                ):
                     subprocess.run(
                         ["snap", "refresh", "--edge", "snapd"],
                         check=True,
@@ -195,7 +514,60 @@ def pack_component(
         raise
 
 
-def pack_snap(
+def pack_components(
+    components: Dict[str, Path],
+    *,
+    output_dir: Path,
+    compression: Optional[str] = None,
+    max_workers: int = 1,
+) -> List[str]:
+    """Pack component directories concurrently.
+
+    :param components: A mapping of component names to the directory to pack.
+    :param output_dir: Directory to output components to.
+    :param compression: Compression type to use, None for default.
+    :param max_workers: The maximum number of components packed at once.
+
+    :returns: The filenames of the packed components, in the order of
+        components.
+
+    :raises SnapcraftError: If any component cannot be packed, after all
+        components were attempted.
+    """
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(len(components), max_workers))
+    ) as executor:
+        futures = {
+            name: executor.submit(
+                pack_component,
+                directory=directory,
+                compression=compression,
+                output_dir=output_dir,
+            )
+            for name, directory in components.items()
+        }
+        concurrent.futures.wait(futures.values())
+
+    failed: Dict[str, BaseException] = {}
+    for name, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            failed[name] = error
+
+    if len(failed) == 1:
+        (error,) = failed.values()
+        raise error
+    if failed:
+        raise errors.SnapcraftError(
+            f"Cannot pack components {utils.humanize_list(failed, 'and')}",
+            details="\n".join(f"{name}: {error!s}" for name, error in failed.items()),
+            resolution=getattr(next(iter(failed.values())), "resolution", None),
+        )
+
+    return [future.result() for future in futures.values()]
+
+
+def pack_snap(  # noqa: PLR0913 (too many arguments)
     directory: Path,
     *,
     output: Optional[str],
@@ -203,6 +575,7 @@ def pack_snap(
     name: Optional[str] = None,
     version: Optional[str] = None,
     target_arch: Optional[str] = None,
+    cache: Optional[PackCache] = None,
 ) -> str:
     """Pack snap contents with `snap pack`.
 
@@ -222,6 +595,8 @@ def pack_snap(
     :param name: Name of snap project.
     :param version: Version of snap project.
     :param target_arch: Target architecture the snap project is built to.
+    :param cache: The cache of the last packed snap, reused if the directory
+        is unchanged.
 
     :returns: The filename of the packed snap.
 
@@ -229,16 +604,124 @@ def pack_snap(
     """
     emit.debug(f"pack_snap: output={output!r}, compression={compression!r}")
 
-    # TODO remove workaround once LP: #1950465 is fixed
-    _verify_snap(directory)
-
     output_dir = _get_directory(output)
     output_file = _get_filename(output, name, version, target_arch)
 
+    if cache is not None:
+        snap_filename = cache.reuse(
+            directory,
+            output_dir=output_dir,
+            output_file=output_file,
+            compression=compression,
+        )
+        if snap_filename is not None:
+            emit.progress("Reusing the unchanged snap package")
+            return snap_filename
+
+    # TODO remove workaround once LP: #1950465 is fixed
+    _verify_snap(directory)
+
     emit.progress("Creating snap package...")
-    return _pack(
+    snap_filename = _pack(
         directory=directory,
         output_dir=output_dir,
         output_file=output_file,
         compression=compression,
     )
+
+    if cache is not None:
+        cache.save(output_dir / snap_filename, compression=compression)
+    return snap_filename
+
+
+class SnapPackProcess:
+    """A `snap pack` process running in the background.
+
+    :param command: The `snap pack` command to run.
+    :param output_path: The path to the snap being created.
+    """
+
+    def __init__(self, command: List[Union[str, Path]], output_path: Path) -> None:
+        emit.debug(f"Pack command: {command}")
+        self._command = command
+        self._output_path = output_path
+        self._process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+
+    def wait(self) -> str:
+        """Wait for the snap to be packed.
+
+        :returns: The filename of the packed snap.
+
+        :raises SnapcraftError: If the directory cannot be packed.
+        """
+        stdout, stderr = self._process.communicate()
+        if self._process.returncode != 0:
+            err = subprocess.CalledProcessError(
+                self._process.returncode, self._command, stdout, stderr
+            )
+            details = None
+            if err.stderr:
+                details = err.stderr.strip()
+            raise errors.SnapcraftError(str(err), details=details) from err
+
+        return Path(str(stdout).partition(":")[2].strip()).name
+
+    def cancel(self) -> None:
+        """Stop packing and remove the partially written snap."""
+        if self._process.poll() is None:
+            emit.debug("Cancelling snap pack")
+            self._process.terminate()
+        self._process.communicate()
+
+        with contextlib.suppress(FileNotFoundError):
+            self._output_path.unlink()
+
+
+def start_pack_snap(
+    directory: Path,
+    *,
+    output: Optional[str],
+    compression: Optional[str] = None,
+    name: Optional[str] = None,
+    version: Optional[str] = None,
+    target_arch: Optional[str] = None,
+) -> SnapPackProcess:
+    """Start packing snap contents with `snap pack` in the background.
+
+    Unlike :func:`pack_snap`, the snap metadata is verified in-process instead
+    of with `snap pack --check-skeleton`, and the caller can do other work
+    on the snap contents, as long as it does not modify them, while the
+    snap is packed.
+
+    :param directory: Directory to pack.
+    :param output: Snap file name or directory.
+    :param compression: Compression type to use, None for defaults.
+    :param name: Name of snap project.
+    :param version: Version of snap project.
+    :param target_arch: Target architecture the snap project is built to.
+
+    :returns: The running pack process.
+
+    :raises SnapcraftError: If the snap metadata is invalid.
+    """
+    emit.debug(f"start_pack_snap: output={output!r}, compression={compression!r}")
+
+    snap_yaml = verify_snap_yaml(directory)
+
+    output_dir = _get_directory(output)
+    # The filename is always passed to `snap pack`, so that the partially
+    # written snap can be removed if packing is cancelled.
+    output_file = _get_filename(
+        output, name, version, target_arch
+    ) or _get_default_filename(snap_yaml)
+
+    emit.progress("Creating snap package...")
+    return SnapPackProcess(
+        _get_pack_command(directory, output_dir, output_file, compression),
+        output_path=output_dir / output_file,
+    )
@@ -16,6 +16,7 @@
 
 """Parts lifecycle preparation and execution."""
 
+import concurrent.futures
 import copy
 import os
 import shutil
@@ -28,9 +29,10 @@ import craft_parts
 from craft_cli import emit
 from craft_parts import Features, ProjectInfo, Step, StepInfo, callbacks
 from craft_providers import Executor
+from xdg import BaseDirectory
 
 from snapcraft import errors, linters, models, pack, providers, ua_manager, utils
-from snapcraft.elf import Patcher, SonameCache, elf_utils
+from snapcraft.elf import Patcher, elf_utils
 from snapcraft.elf import errors as elf_errors
 from snapcraft.linters import LinterStatus
 from snapcraft.meta import component_yaml, manifest, snap_yaml
@@ -272,31 +274,72 @@ def _run_lifecycle_and_pack(  # noqa PLR0913
         )
 
     if command_name in ("pack", "snap"):
-        issues = linters.run_linters(lifecycle.prime_dir, lint=project.lint)
-        status = linters.report(issues, intermediate=True)
-
-        # In case of linter errors, stop execution and return the error code.
-        if status in (LinterStatus.ERRORS, LinterStatus.FATAL):
-            raise errors.LinterError("Linter errors found", exit_code=status)
-
-        snap_filename = pack.pack_snap(
-            lifecycle.prime_dir,
-            output=parsed_args.output,
-            compression=project.compression,
-            name=project.name,
-            version=process_version(project.version),
-            target_arch=project.get_build_for(),
-        )
-        emit.progress(f"Created snap package {snap_filename}", permanent=True)
+        pack_args: Dict[str, Any] = {
+            "output": parsed_args.output,
+            "compression": project.compression,
+            "name": project.name,
+            "version": process_version(project.version),
+            "target_arch": project.get_build_for(),
+        }
+
+        # When incremental, the last packed snap is reused if the prime
+        # directory did not change.
+        if getattr(parsed_args, "incremental", False):
+            pack_args["cache"] = _get_pack_cache(lifecycle.prime_dir)
 
-        if project.components:
-            _pack_components(lifecycle, project, parsed_args.output)
+        # When pipelined, the snap is packed while the linters run on the
+        # same (unmodified) prime directory.
+        pack_process: Optional[pack.SnapPackProcess] = None
+        if getattr(parsed_args, "pipelined", False) and "cache" not in pack_args:
+            pack_process = pack.start_pack_snap(lifecycle.prime_dir, **pack_args)
+
+        try:
+            issues = linters.run_linters(lifecycle.prime_dir, lint=project.lint)
+            status = linters.report(issues, intermediate=True)
+
+            # In case of linter errors, stop execution and return the error code.
+            if status in (LinterStatus.ERRORS, LinterStatus.FATAL):
+                raise errors.LinterError("Linter errors found", exit_code=status)
+        except BaseException:
+            if pack_process is not None:
+                pack_process.cancel()
+            raise
+
+        # Components are packed in the background while the snap is packed.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            components_future = None
+            if project.components:
+                components_future = executor.submit(
+                    _pack_components, lifecycle, project, parsed_args.output
+                )
+
+            if pack_process is not None:
+                snap_filename = pack_process.wait()
+            else:
+                snap_filename = pack.pack_snap(lifecycle.prime_dir, **pack_args)
+            emit.progress(f"Created snap package {snap_filename}", permanent=True)
+
+            if components_future is not None:
+                emit.progress("Creating component packages...")
+                component_filenames = components_future.result()
+                for component, filename in zip(
+                    project.get_component_names(), component_filenames
+                ):
+                    emit.verbose(f"Packed component {component!r} to {filename!r}.")
+                emit.progress("Created component packages", permanent=True)
+
+
+def _get_pack_cache(prime_dir: Path) -> pack.PackCache:
+    """Get the cache of the last snap packed from prime_dir."""
+    return pack.PackCache(
+        Path(BaseDirectory.save_cache_path("snapcraft", "pack")), prime_dir
+    )
 
 
 def _pack_components(
     lifecycle: PartsLifecycle, project: models.Project, output: Optional[str]
-) -> None:
-    """Pack components.
+) -> List[str]:
+    """Pack components concurrently.
 
     `--output` can be used to set the output directory, the name of the snap, or both.
 
@@ -307,9 +350,10 @@ def _pack_components(
     :param lifecycle: The part lifecycle.
     :param project: The snapcraft project.
     :param output: Output filepath of snap.
-    """
-    emit.progress("Creating component packages...")
 
+    :returns: The filenames of the packed components, in the order of the
+        project's components.
+    """
     if output:
         if Path(output).is_dir():
             output_dir = Path(output).resolve()
@@ -318,14 +362,15 @@ def _pack_components(
     else:
         output_dir = Path.cwd()
 
-    for component in project.get_component_names():
-        filename = pack.pack_component(
-            directory=lifecycle.get_prime_dir(component),
-            compression=project.compression,
-            output_dir=output_dir,
-        )
-        emit.verbose(f"Packed component {component!r} to {filename!r}.")
-    emit.progress("Created component packages", permanent=True)
+    return pack.pack_components(
+        {
+            component: lifecycle.get_prime_dir(component)
+            for component in project.get_component_names()
+        },
+        compression=project.compression,
+        output_dir=output_dir,
+        max_workers=utils.get_parallel_build_count(),
+    )
 
 
 def _generate_metadata(
@@ -464,6 +509,10 @@ def _run_in_provider(  # noqa PLR0915
         cmd.append("--shell")
     if getattr(parsed_args, "shell_after", False):
         cmd.append("--shell-after")
+    if getattr(parsed_args, "pipelined", False):
+        cmd.append("--pipelined")
+    if getattr(parsed_args, "incremental", False):
+        cmd.append("--incremental")
 
     if getattr(parsed_args, "enable_manifest", False):
         cmd.append("--enable-manifest")
@@ -700,8 +749,13 @@ def patch_elf(step_info: StepInfo, use_system_libs: bool = True) -> bool:
 
     migrated_files = step_info.state.files
     patcher = Patcher(dynamic_linker=linker, root_path=step_info.prime_dir)
-    elf_files = elf_utils.get_elf_files_from_list(step_info.prime_dir, migrated_files)
-    soname_cache = SonameCache()
+    elf_files = elf_utils.get_elf_files_from_list(
+        step_info.prime_dir,
+        migrated_files,
+        elf_cache=elf_utils.get_elf_cache(),
+        workers=utils.get_parallel_build_count(),
+    )
+    soname_cache = elf_utils.get_soname_cache()
     arch_triplet = elf_utils.get_arch_triplet()
 
     for elf_file in elf_files:
@@ -713,9 +767,11 @@ def patch_elf(step_info: StepInfo, use_system_libs: bool = True) -> bool:
             soname_cache=soname_cache,
         )
 
-        relative_path = elf_file.path.relative_to(step_info.prime_dir)
-        emit.progress(f"Patch ELF file: {str(relative_path)!r}")
-        patcher.patch(elf_file=elf_file, use_system_libs=use_system_libs)
+    patcher.patch_files(
+        elf_files=elf_files,
+        use_system_libs=use_system_libs,
+        workers=utils.get_parallel_build_count(),
+    )
 
     return True
 
@@ -18,6 +18,7 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import os
 import pathlib
 import shutil
@@ -35,7 +36,7 @@ from snapcraft.parts import extract_metadata as extract
 from snapcraft.parts import update_metadata as update
 from snapcraft.parts.setup_assets import setup_assets
 from snapcraft.services import Lifecycle
-from snapcraft.utils import process_version
+from snapcraft.utils import get_parallel_build_count, process_version
 
 if TYPE_CHECKING:
     from snapcraft.services import SnapcraftServiceFactory
@@ -81,16 +82,18 @@ class Package(PackageService):
         )
 
     def _pack_components(self, dest: pathlib.Path) -> list[pathlib.Path]:
-        component_files: list[pathlib.Path] = []
-        for component in self._project.get_component_names():
-            filename = pack.pack_component(
-                cast(Lifecycle, self._services.lifecycle).get_prime_dir(component),
-                compression=self._project.compression,
-                output_dir=dest,
-            )
-            component_files.append(pathlib.Path(filename))
+        lifecycle = cast(Lifecycle, self._services.lifecycle)
+        filenames = pack.pack_components(
+            {
+                component: lifecycle.get_prime_dir(component)
+                for component in self._project.get_component_names()
+            },
+            compression=self._project.compression,
+            output_dir=dest,
+            max_workers=get_parallel_build_count(),
+        )
 
-        return component_files
+        return [pathlib.Path(filename) for filename in filenames]
 
     @override
     def pack(self, prime_dir: pathlib.Path, dest: pathlib.Path) -> list[pathlib.Path]:
@@ -107,17 +110,22 @@ class Package(PackageService):
         if status in (LinterStatus.ERRORS, LinterStatus.FATAL):
             raise errors.LinterError("Linter errors found", exit_code=status)
 
-        snap_file = pathlib.Path(
-            pack.pack_snap(
-                prime_dir,
-                output=str(dest),
-                compression=self._project.compression,
-                name=self._project.name,
-                version=process_version(self._project.version),
-                target_arch=self._build_plan[0].build_for,
+        # Components are packed in the background while the snap is packed.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            components_future = None
+            if self._project.components:
+                components_future = executor.submit(self._pack_components, dest)
+            snap_file = pathlib.Path(
+                pack.pack_snap(
+                    prime_dir,
+                    output=str(dest),
+                    compression=self._project.compression,
+                    name=self._project.name,
+                    version=process_version(self._project.version),
+                    target_arch=self._build_plan[0].build_for,
+                )
             )
-        )
-        component_files = self._pack_components(dest)
+            component_files = components_future.result() if components_future else []
 
         return [snap_file] + component_files
 
@@ -0,0 +1,243 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Upload files to the Snap Store storage."""
+
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+import craft_store
+import requests
+from craft_cli import emit
+
+from snapcraft import errors
+
+_UPLOAD_ATTEMPTS = 4
+_RETRY_DELAY = 2
+
+# The storage only keeps uploaded files for a limited time until they
+# are notified to the store.
+_JOURNAL_TTL = 60 * 60
+_JOURNAL_FORMAT = 2
+
+
+def _get_stat_key(stat: os.stat_result) -> List[int]:
+    """Return the attributes of stat which change when a file is rewritten.
+
+    As with git, the change time catches files rewritten in place with
+    their size and modification time kept.
+    """
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino]
+
+
+class UploadJournal:
+    """An on-disk record of the files uploaded to the storage.
+
+    Files stay in the journal until their upload is notified to the store,
+    so that an upload interrupted afterwards can be retried without sending
+    the files again. Entries are only reused if the file is unchanged, which
+    is verified with its size, modification and change times and inode, so
+    that files are not read again to be checked.
+
+    :param path: The path to the journal file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, filepath: Path) -> Optional[str]:
+        """Obtain the upload id of a previous upload of filepath.
+
+        :param filepath: The file to upload.
+
+        :returns: The upload id, or None if the file needs to be uploaded.
+        """
+        with self._lock:
+            entry = self._load().get(str(filepath.resolve()))
+
+        if not entry or not self._is_current(entry, filepath):
+            return None
+        return entry["upload-id"]
+
+    def record(self, filepath: Path, *, upload_id: str, stat: os.stat_result) -> None:
+        """Record the upload of filepath.
+
+        :param filepath: The uploaded file.
+        :param upload_id: The upload id returned by the storage.
+        :param stat: The stat of filepath taken before it was uploaded.
+        """
+        with self._lock:
+            entries = self._load()
+            entries[str(filepath.resolve())] = {
+                "stat": _get_stat_key(stat),
+                "upload-id": upload_id,
+                "uploaded-at": time.time(),
+            }
+            self._save(entries)
+
+    def discard(self, upload_ids: Collection[str]) -> None:
+        """Remove the entries of notified uploads.
+
+        :param upload_ids: The upload ids notified to the store.
+        """
+        with self._lock:
+            entries = self._load()
+            kept = {
+                path: entry
+                for path, entry in entries.items()
+                if entry["upload-id"] not in upload_ids
+            }
+            if kept != entries:
+                self._save(kept)
+
+    @staticmethod
+    def _is_current(entry: Dict[str, Any], filepath: Path) -> bool:
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return False
+        return (
+            entry["stat"] == _get_stat_key(stat)
+            and time.time() - entry["uploaded-at"] < _JOURNAL_TTL
+        )
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with self.path.open() as journal_file:
+                journal = json.load(journal_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(journal, dict) or journal.get("format") != _JOURNAL_FORMAT:
+            return {}
+        return journal.get("uploads", {})
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        now = time.time()
+        journal = {
+            "format": _JOURNAL_FORMAT,
+            "uploads": {
+                path: entry
+                for path, entry in entries.items()
+                if now - entry["uploaded-at"] < _JOURNAL_TTL
+            },
+        }
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_fd, temp_name = tempfile.mkstemp(dir=self.path.parent)
+        except OSError as error:
+            emit.debug(f"Cannot write upload journal {str(self.path)!r}: {error}")
+            return
+
+        try:
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(journal, temp_file)
+            os.replace(temp_name, self.path)
+        except OSError as error:
+            emit.debug(f"Cannot write upload journal {str(self.path)!r}: {error}")
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+
+
+def _is_retriable(error: Exception) -> bool:
+    if isinstance(error, craft_store.errors.StoreServerError):
+        return error.response.status_code >= 500
+    return isinstance(
+        error,
+        (craft_store.errors.NetworkError, requests.exceptions.ChunkedEncodingError),
+    )
+
+
+def upload_file(
+    store_client: craft_store.BaseClient,
+    *,
+    filepath: Path,
+    monitor_callback: Optional[Callable] = None,
+    journal: Optional[UploadJournal] = None,
+) -> str:
+    """Upload filepath to the storage.
+
+    Interrupted uploads are retried, sending the whole file again, and a
+    file already uploaded according to the journal is not sent again.
+
+    :param store_client: The store client to upload with.
+    :param filepath: The file to upload.
+    :param monitor_callback: A callback to monitor progress, as used by
+        craft_store.BaseClient.upload_file.
+    :param journal: The journal recording uploaded files.
+
+    :returns: The upload id.
+    """
+    if journal is not None:
+        journaled_upload_id = journal.get(filepath)
+        if journaled_upload_id is not None:
+            emit.debug(f"Reusing upload {journaled_upload_id!r} of {str(filepath)!r}")
+            return journaled_upload_id
+
+    stat = filepath.stat()
+    delay = _RETRY_DELAY
+    for attempt in range(1, _UPLOAD_ATTEMPTS + 1):
+        try:
+            upload_id = _upload_file(
+                store_client,
+                filepath=filepath,
+                stat=stat,
+                monitor_callback=monitor_callback,
+            )
+            break
+        except (
+            craft_store.errors.CraftStoreError,
+            requests.exceptions.RequestException,
+        ) as error:
+            if attempt == _UPLOAD_ATTEMPTS or not _is_retriable(error):
+                raise
+            emit.debug(
+                f"Upload of {str(filepath)!r} failed ({error}), retrying in {delay}s"
+            )
+            time.sleep(delay)
+            delay *= 2
+
+    if journal is not None:
+        journal.record(filepath, upload_id=upload_id, stat=stat)
+    return upload_id
+
+
+def _upload_file(
+    store_client: craft_store.BaseClient,
+    *,
+    filepath: Path,
+    stat: os.stat_result,
+    monitor_callback: Optional[Callable],
+) -> str:
+    emit.debug(f"Uploading {str(filepath)!r} ({stat.st_size} bytes)")
+
+    upload_id = store_client.upload_file(
+        filepath=filepath, monitor_callback=monitor_callback
+    )
+
+    if _get_stat_key(filepath.stat()) != _get_stat_key(stat):
+        raise errors.SnapcraftError(f"{str(filepath)!r} changed while being uploaded")
+
+    emit.debug(f"Uploaded {str(filepath)!r} with id {upload_id!r}")
+    return upload_id
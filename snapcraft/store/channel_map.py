@@ -23,12 +23,58 @@ The full API is documented on
 https://dashboard.snapcraft.io/docs/v2/en/snaps.html#snap-channel-map
 """
 
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import jsonschema
 from craft_store.models import SnapListReleasesModel
 
 
+class _TrackedList(list):
+    """A list counting the changes made to it.
+
+    The lists of a ChannelMap are public and modified in place by callers,
+    the count of changes tells when the indexes of their entries are stale.
+    """
+
+    version = 0
+
+
+def _track_changes(name: str) -> None:
+    method = getattr(list, name)
+
+    def tracked(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    tracked.__name__ = name
+    tracked.__doc__ = method.__doc__
+    setattr(_TrackedList, name, tracked)
+
+
+for _name in (
+    "__setitem__",
+    "__delitem__",
+    "__iadd__",
+    "__imul__",
+    "append",
+    "extend",
+    "insert",
+    "pop",
+    "remove",
+    "clear",
+    "sort",
+    "reverse",
+):
+    _track_changes(_name)
+
+
+def _build_index(entries: Iterable[Any], key: Callable) -> Dict[Any, List[Any]]:
+    index: Dict[Any, List[Any]] = {}
+    for entry in entries:
+        index.setdefault(key(entry), []).append(entry)
+    return index
+
+
 class Progressive:
     """Represent Progressive information for a MappedChannel."""
 
@@ -290,7 +336,16 @@ class Snap:
     ) -> None:
         self.name = name
         self.channels = channels
-        self.tracks = tracks
+        self.tracks: List[SnapTrack] = tracks
+
+    @property
+    def channels(self) -> List[SnapChannel]:
+        """The channels of the snap."""
+        return self._channels
+
+    @channels.setter
+    def channels(self, channels: List[SnapChannel]) -> None:
+        self._channels = _TrackedList(channels)
 
 
 class ChannelMap:
@@ -334,51 +389,104 @@ class ChannelMap:
     def __init__(
         self, *, channel_map: List[MappedChannel], revisions: List[Revision], snap: Snap
     ) -> None:
+        self._indexes: Dict[str, Tuple[_TrackedList, int, Dict[Any, List[Any]]]] = {}
         self.channel_map = channel_map
         self.revisions = revisions
-        self.snap = snap
+        self.snap: Snap = snap
+        self._build_indexes()
+
+    @property
+    def channel_map(self) -> List[MappedChannel]:
+        """The channels mapped to revisions."""
+        return self._channel_map
+
+    @channel_map.setter
+    def channel_map(self, channel_map: List[MappedChannel]) -> None:
+        self._channel_map = _TrackedList(channel_map)
+
+    @property
+    def revisions(self) -> List[Revision]:
+        """The revisions of the mapped channels."""
+        return self._revisions
+
+    @revisions.setter
+    def revisions(self, revisions: List[Revision]) -> None:
+        self._revisions = _TrackedList(revisions)
+
+    def _get_index(
+        self, name: str, entries: _TrackedList, key: Callable
+    ) -> Dict[Any, List[Any]]:
+        """Return an index of entries, grouped by key.
+
+        The index is rebuilt if entries was replaced or changed since it was
+        built. The attributes used as keys must not be changed in place.
+        """
+        index_entry = self._indexes.get(name)
+        if (
+            index_entry is None
+            or index_entry[0] is not entries
+            or index_entry[1] != entries.version
+        ):
+            index_entry = (entries, entries.version, _build_index(entries, key))
+            self._indexes[name] = index_entry
+        return index_entry[2]
+
+    def _build_indexes(self) -> None:
+        self._get_channel_index()
+        self._get_revision_index()
+        self._get_channel_info_index()
+
+    def _get_channel_index(self) -> Dict[Tuple[str, str], List[MappedChannel]]:
+        return self._get_index(
+            "channel-map", self._channel_map, lambda c: (c.channel, c.architecture)
+        )
+
+    def _get_revision_index(self) -> Dict[int, List[Revision]]:
+        return self._get_index("revisions", self._revisions, lambda r: r.revision)
+
+    def _get_channel_info_index(self) -> Dict[str, List[SnapChannel]]:
+        return self._get_index("channel-info", self.snap._channels, lambda c: c.name)
 
     def get_mapped_channel(
         self, *, channel_name: str, architecture: str, progressive: bool
     ) -> MappedChannel:
         """Return the channel for the corresponding attributes."""
-        channels_with_name = (
-            cm for cm in self.channel_map if cm.channel == channel_name
-        )
-        channels_with_arch = (
-            cm for cm in channels_with_name if cm.architecture == architecture
+        channels_with_name_and_arch = self._get_channel_index().get(
+            (channel_name, architecture), []
         )
 
-        if progressive:
-            channels = [
-                cm for cm in channels_with_arch if cm.progressive.percentage is not None
-            ]
-        else:
-            channels = [
-                cm for cm in channels_with_arch if cm.progressive.percentage is None
-            ]
+        # Progressive percentages can change after indexing, so they are
+        # checked on lookup.
+        for mapped_channel in channels_with_name_and_arch:
+            if (mapped_channel.progressive.percentage is not None) == progressive:
+                return mapped_channel
 
-        try:
-            return channels[0]
-        except IndexError as index_error:
-            raise ValueError(
-                f"No channel mapped to {channel_name!r} for architecture {architecture!r} "
-                f"when progressive is {progressive!r}"
-            ) from index_error
+        raise ValueError(
+            f"No channel mapped to {channel_name!r} for architecture {architecture!r} "
+            f"when progressive is {progressive!r}"
+        )
+
+    def has_mapped_channels(self, *, channel_name: str, architecture: str) -> bool:
+        """Return True if channel_name is mapped for architecture."""
+        return (channel_name, architecture) in self._get_channel_index()
 
     def get_channel_info(self, channel_name: str) -> SnapChannel:
         """Return a SnapChannel for channel_name."""
-        for snap_channel in self.snap.channels:
-            if snap_channel.name == channel_name:
-                return snap_channel
-        raise ValueError(f"No channel information for {channel_name!r}")
+        try:
+            return self._get_channel_info_index()[channel_name][0]
+        except KeyError as key_error:
+            raise ValueError(
+                f"No channel information for {channel_name!r}"
+            ) from key_error
 
     def get_revision(self, revision_number: int) -> Revision:
         """Return a Revision for revision_number."""
-        for revision_item in self.revisions:
-            if revision_item.revision == revision_number:
-                return revision_item
-        raise ValueError(f"No revision information for {revision_number!r}")
+        try:
+            return self._get_revision_index()[revision_number][0]
+        except KeyError as key_error:
+            raise ValueError(
+                f"No revision information for {revision_number!r}"
+            ) from key_error
 
     def get_existing_architectures(self) -> Set[str]:
         """Return a list of the existing architectures for this map."""
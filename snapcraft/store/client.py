@@ -16,27 +16,36 @@
 
 """Snapcraft Store Client with CLI hooks."""
 
+import contextlib
+import hashlib
+import json
 import os
 import platform
+import shutil
+import tempfile
 import time
 from datetime import timedelta
-from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, cast
 
 import craft_store
 import requests
 from craft_cli import emit
 from overrides import overrides
+from xdg import BaseDirectory
 
 from snapcraft import __version__, errors, utils
 from snapcraft_legacy.storeapi.v2.releases import Releases as Revisions
 
-from . import channel_map, constants
+from . import _upload, channel_map, constants
 from ._legacy_account import LegacyUbuntuOne
 from .onprem_client import ON_PREM_ENDPOINTS, OnPremClient
 
 _TESTING_ENV_PREFIXES = ["TRAVIS", "AUTOPKGTEST_TMP"]
 
 _POLL_DELAY = 1
+_POLL_MAX_DELAY = 15
+_POLL_BACKOFF = 1.5
 _HUMAN_STATUS = {
     "being_processed": "processing",
     "ready_to_release": "ready to release!",
@@ -172,12 +181,142 @@ def get_client(ephemeral: bool) -> craft_store.BaseClient:
     return client
 
 
+class _PollBackoff:
+    """Wait between status polls, backing off while the status does not change."""
+
+    def __init__(self) -> None:
+        self._delay: float = _POLL_DELAY
+        self._status: Optional[str] = None
+
+    def wait(self, status: str) -> None:
+        """Wait before polling again.
+
+        :param status: the last status obtained, the delay is reset when it
+            changes as the upload is making progress.
+        """
+        if status != self._status:
+            self._status = status
+            self._delay = _POLL_DELAY
+        time.sleep(self._delay)
+        self._delay = min(self._delay * _POLL_BACKOFF, _POLL_MAX_DELAY)
+
+
+def _get_response_cache_ttl() -> float:
+    ttl = os.getenv(
+        constants.ENVIRONMENT_STORE_CACHE_TTL, str(constants.DEFAULT_STORE_CACHE_TTL)
+    )
+    try:
+        return max(0.0, float(ttl))
+    except ValueError as error:
+        raise errors.SnapcraftError(
+            f"Invalid value {ttl!r} for {constants.ENVIRONMENT_STORE_CACHE_TTL!r}.",
+            resolution="Set it to a number of seconds.",
+        ) from error
+
+
+def _get_credentials_fingerprint() -> str:
+    """Identify the credentials store queries are made with.
+
+    Credentials exported in the environment are identified by their value.
+    Stored credentials only change on login and logout, which clear the
+    response cache.
+    """
+    credentials = os.getenv(constants.ENVIRONMENT_STORE_CREDENTIALS)
+    source = "stored" if not credentials else f"environment:{credentials}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class _ResponseCache:
+    """An on-disk cache of JSON responses to store queries about a snap.
+
+    Responses are reused while younger than ttl and revalidated with their
+    ETag afterwards. Entries are stored per snap so that operations changing
+    a snap can invalidate everything known about it, and per credentials so
+    that responses are never shared between accounts.
+
+    :param path: The directory to store responses in.
+    :param ttl: The number of seconds a response is reused without asking the
+        store.
+    :param credentials: The fingerprint of the credentials queries are made
+        with.
+    """
+
+    def __init__(self, path: Path, *, ttl: float, credentials: str) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.credentials = credentials
+
+    def _get_entry_path(self, snap_name: str, url: str) -> Path:
+        url_hash = hashlib.sha256(f"{self.credentials}\0{url}".encode()).hexdigest()
+        return self._get_snap_path(snap_name) / f"{url_hash}.json"
+
+    def _get_snap_path(self, snap_name: str) -> Path:
+        # Hashed so that any name the user passes is a valid directory name.
+        return self.path / hashlib.sha256(snap_name.encode()).hexdigest()
+
+    def get(self, snap_name: str, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for url, if any.
+
+        :returns: A dictionary with the "body", "etag" and "fetched-at" of the
+            response.
+        """
+        try:
+            with self._get_entry_path(snap_name, url).open() as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Return True if entry can be used without revalidating it."""
+        return time.time() - entry["fetched-at"] < self.ttl
+
+    def put(self, snap_name: str, url: str, *, body: Any, etag: Optional[str]) -> None:
+        """Store the response body obtained for url."""
+        entry_path = self._get_entry_path(snap_name, url)
+        entry = {"url": url, "etag": etag, "fetched-at": time.time(), "body": body}
+
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            # mkstemp creates files only readable by the user, responses
+            # may not be public.
+            temp_fd, temp_name = tempfile.mkstemp(dir=entry_path.parent)
+        except OSError as error:
+            emit.debug(f"Cannot cache store response for {url!r}: {error}")
+            return
+
+        try:
+            with os.fdopen(temp_fd, "w") as temp_file:
+                json.dump(entry, temp_file)
+            os.replace(temp_name, entry_path)
+        except OSError as error:
+            emit.debug(f"Cannot cache store response for {url!r}: {error}")
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+
+    def invalidate(self, snap_name: Optional[str] = None) -> None:
+        """Remove the cached responses for snap_name, or all if None."""
+        path = self.path if snap_name is None else self._get_snap_path(snap_name)
+        shutil.rmtree(path, ignore_errors=True)
+
+
 class LegacyStoreClientCLI:
     """A BaseClient implementation considering command line prompts."""
 
     def __init__(self, ephemeral=False):
         self.store_client = get_client(ephemeral=ephemeral)
         self._base_url = get_store_url()
+        self._upload_journal = _upload.UploadJournal(
+            Path(BaseDirectory.xdg_cache_home, "snapcraft", "uploads.json")
+        )
+        self._response_cache = _ResponseCache(
+            Path(BaseDirectory.xdg_cache_home, "snapcraft", "store-responses"),
+            ttl=_get_response_cache_ttl(),
+            credentials=_get_credentials_fingerprint(),
+        )
 
     def login(
         self,
@@ -240,8 +379,15 @@ class LegacyStoreClientCLI:
                 **kwargs,
             )
 
+        # Cached responses may belong to a different account.
+        self._response_cache.invalidate()
         return credentials
 
+    def logout(self) -> None:
+        """Clear the stored credentials and the responses obtained with them."""
+        self.store_client.logout()
+        self._response_cache.invalidate()
+
     def request(self, *args, **kwargs) -> requests.Response:
         """Request using the BaseClient and wrap responses that require action.
 
@@ -259,7 +405,7 @@ class LegacyStoreClientCLI:
                             f"{constants.ENVIRONMENT_STORE_CREDENTIALS}."
                         ),
                     ) from store_error
-                self.store_client.logout()
+                self.logout()
                 # Make it a manual process to login again as these older credentials
                 # might be part of some CI/CD workflow.
                 if isinstance(self.store_client, LegacyUbuntuOne):
@@ -306,17 +452,45 @@ class LegacyStoreClientCLI:
             json=data,
         )
 
+    def _get_cached_json(self, snap_name: str, url: str, **kwargs) -> Any:
+        """Return the JSON response to a GET request about snap_name.
+
+        The response is served from the response cache while it is fresh, and
+        revalidated with its ETag once stale.
+        """
+        entry = self._response_cache.get(snap_name, url)
+        if entry is not None and self._response_cache.is_fresh(entry):
+            emit.debug(f"Using cached response for {url!r}")
+            return entry["body"]
+
+        if entry is not None and entry["etag"] is not None:
+            kwargs["headers"] = {
+                **kwargs.get("headers", {}),
+                "If-None-Match": entry["etag"],
+            }
+        response = self.request("GET", url, **kwargs)
+
+        if entry is not None and response.status_code == requests.codes.not_modified:
+            emit.debug(f"Cached response for {url!r} is still valid")
+            body = entry["body"]
+        else:
+            body = response.json()
+        self._response_cache.put(
+            snap_name, url, body=body, etag=response.headers.get("ETag")
+        )
+        return body
+
     def get_channel_map(self, *, snap_name: str) -> channel_map.ChannelMap:
         """Return the channel map for snap_name."""
-        response = self.request(
-            "GET",
+        response = self._get_cached_json(
+            snap_name,
             self._base_url + f"/api/v2/snaps/{snap_name}/channel-map",
             headers={
                 "Accept": "application/json",
             },
         )
 
-        return channel_map.ChannelMap.unmarshal(response.json())
+        return channel_map.ChannelMap.unmarshal(response)
 
     def get_account_info(
         self,
@@ -363,6 +537,7 @@ class LegacyStoreClientCLI:
         :param channels: the channels to release to
         :param progressive_percentage: enable progressive releases up to a given percentage
         """
+        self._response_cache.invalidate(snap_name)
         data: Dict[str, Any] = {
             "name": snap_name,
             "revision": str(revision),
@@ -385,6 +560,7 @@ class LegacyStoreClientCLI:
         :param snap_id: the id for the snap to close
         :param channel: the channel to close
         """
+        self._response_cache.invalidate(snap_name)
         # Account info request to retrieve the snap-id
         account_info = self.get_account_info()
         try:
@@ -403,6 +579,29 @@ class LegacyStoreClientCLI:
             json={"channels": [channel]},
         )
 
+    def upload_file(
+        self,
+        *,
+        filepath: Path,
+        monitor_callback: Optional[Callable] = None,
+    ) -> str:
+        """Upload a file to the Snap Store storage.
+
+        Interrupted uploads are retried, and files uploaded by a previous
+        attempt that was not notified to the Snap Store are not sent again.
+
+        :param filepath: the file to upload
+        :param monitor_callback: a callback to monitor progress, see
+            craft_store.BaseClient.upload_file
+        :returns: the upload id
+        """
+        return _upload.upload_file(
+            self.store_client,
+            filepath=filepath,
+            monitor_callback=monitor_callback,
+            journal=self._upload_journal,
+        )
+
     def verify_upload(
         self,
         *,
@@ -442,6 +641,7 @@ class LegacyStoreClientCLI:
         :param components: A dictionary of component names to component upload-ids.
         :returns: the snap's processed revision
         """
+        self._response_cache.invalidate(snap_name)
         data = {
             "name": snap_name,
             "series": constants.DEFAULT_SERIES,
@@ -466,6 +666,7 @@ class LegacyStoreClientCLI:
         )
 
         status_url = response.json()["status_details_url"]
+        backoff = _PollBackoff()
         while True:
             response = self.request("GET", status_url)
             status = response.json()
@@ -473,6 +674,7 @@ class LegacyStoreClientCLI:
             emit.progress(f"Status: {human_status}")
 
             if status.get("processed", False):
+                self._upload_journal.discard([upload_id, *(components or {}).values()])
                 if status.get("errors"):
                     error_messages = [
                         e["message"] for e in status["errors"] if "message" in e
@@ -483,7 +685,7 @@ class LegacyStoreClientCLI:
                     )
                 break
 
-            time.sleep(_POLL_DELAY)
+            backoff.wait(status["code"])
 
         return status["revision"]
 
@@ -492,8 +694,8 @@ class LegacyStoreClientCLI:
 
         :param snap_name: the name of the snap to query.
         """
-        response = self.request(
-            "GET",
+        response = self._get_cached_json(
+            snap_name,
             f"{self._base_url}/api/v2/snaps/{snap_name}/releases",
             headers={
                 "Content-Type": "application/json",
@@ -501,7 +703,7 @@ class LegacyStoreClientCLI:
             },
         )
 
-        return Revisions.unmarshal(response.json())
+        return Revisions.unmarshal(response)
 
 
 class OnPremStoreClientCLI(LegacyStoreClientCLI):
@@ -530,6 +732,7 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
         channels: Optional[Sequence[str]],
         components: Optional[Dict[str, str]],
     ) -> int:
+        self._response_cache.invalidate(snap_name)
         if channels:
             raise errors.SnapcraftError("Releasing during currently unsupported")
         if components:
@@ -552,6 +755,7 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
         )
 
         status_url = self._base_url + revision_response.status_url
+        backoff = _PollBackoff()
         while True:
             response = self.request("GET", status_url)
             # human_status = _HUMAN_STATUS.get(status["code"], status["code"])
@@ -560,6 +764,8 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
             (revision,) = response.json()["revisions"]
             status = revision["status"]
 
+            if status in ("approved", "rejected"):
+                self._upload_journal.discard([upload_id])
             if status == "approved":
                 return revision["revision"]
             if status == "rejected":
@@ -568,7 +774,7 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
                 raise errors.SnapcraftError(
                     f"Error uploading snap: {error['code']}", details=error["message"]
                 )
-            time.sleep(_POLL_DELAY)
+            backoff.wait(status)
 
     @overrides
     def release(
@@ -582,6 +788,7 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
         if progressive_percentage is not None:
             raise errors.SnapcraftError("Progressive percentage currently unsupported")
 
+        self._response_cache.invalidate(snap_name)
         payload = [{"revision": revision, "channel": channel} for channel in channels]
         self.request(
             "POST",
@@ -596,8 +803,8 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
 
     @overrides
     def get_channel_map(self, *, snap_name: str) -> channel_map.ChannelMap:
-        response = self.request(
-            "GET",
+        response = self._get_cached_json(
+            snap_name,
             self._base_url
             + self.store_client._endpoints.get_releases_endpoint(snap_name),
         )
@@ -605,14 +812,14 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
         return channel_map.ChannelMap.from_list_releases(
             cast(
                 craft_store.models.SnapListReleasesModel,
-                craft_store.models.SnapListReleasesModel.unmarshal(response.json()),
+                craft_store.models.SnapListReleasesModel.unmarshal(response),
             )
         )
 
     @overrides
     def list_revisions(self, snap_name: str) -> Revisions:
-        response = self.request(
-            "GET",
+        response = self._get_cached_json(
+            snap_name,
             f"{self._base_url}/v1/snap/{snap_name}/revisions",
             headers={
                 "Content-Type": "application/json",
@@ -620,7 +827,7 @@ class OnPremStoreClientCLI(LegacyStoreClientCLI):
             },
         )
 
-        return Revisions.unmarshal(response.json())
+        return Revisions.unmarshal(response)
 
 
 # We have two stores with a rather different implementation.
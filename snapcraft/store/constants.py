@@ -33,6 +33,13 @@ ENVIRONMENT_ADMIN_MACAROON: Final[str] = "SNAPCRAFT_ADMIN_MACAROON"
 
 This value holds a valid path to a file with the macaroon contents."""
 
+ENVIRONMENT_STORE_CACHE_TTL: Final[str] = "SNAPCRAFT_STORE_CACHE_TTL"
+"""Environment variable used to set how long store query responses are reused.
+
+The value is a number of seconds, responses older than this are revalidated
+with the Snap Store. Setting it to 0 revalidates every response.
+"""
+
 STORE_URL: Final[str] = "https://dashboard.snapcraft.io"
 """Default store backend URL."""
 
@@ -42,5 +49,12 @@ STORE_UPLOAD_URL: Final[str] = "https://storage.snapcraftcontent.com"
 UBUNTU_ONE_SSO_URL = "https://login.ubuntu.com"
 """Default Ubuntu One Login URL."""
 
+DEFAULT_STORE_CACHE_TTL = 0
+"""Default number of seconds store query responses are reused for.
+
+Responses are revalidated with their ETag on every query by default, so that
+changes made elsewhere (the dashboard, CI, another machine) are always seen.
+"""
+
 DEFAULT_SERIES = "16"
 """Legacy value for older generation Snap Store APIs."""
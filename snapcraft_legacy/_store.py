@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import contextlib
+import io
 import json
 import logging
 import os
@@ -36,6 +37,7 @@ from snapcraft_legacy import storeapi, yaml_utils
 # Ideally we would move stuff into more logical components
 from snapcraft_legacy.cli import echo
 from snapcraft_legacy.file_utils import get_host_tool_path, get_snap_tool_path
+from snapcraft_legacy.internal import squashfs
 from snapcraft_legacy.internal.errors import (
     SnapcraftEnvironmentError,
     SnapDataExtractionError,
@@ -51,6 +53,25 @@ logger = logging.getLogger(__name__)
 
 
 def get_data_from_snap_file(snap_path):
+    try:
+        with squashfs.SquashFsReader(snap_path) as snap_file:
+            snap_yaml = yaml_utils.load(snap_file.read_file("meta/snap.yaml").decode())
+            try:
+                manifest_yaml = yaml_utils.load(
+                    snap_file.read_file("snap/manifest.yaml").decode()
+                )
+            except FileNotFoundError:
+                manifest_yaml = None
+    except squashfs.UnsupportedSquashFsError as error:
+        logger.debug("Extracting data from snap with unsquashfs: %s", error)
+        return _get_data_from_snap_file_with_unsquashfs(snap_path)
+    except (squashfs.SquashFsError, OSError) as error:
+        raise SnapDataExtractionError(os.path.basename(snap_path)) from error
+
+    return snap_yaml, manifest_yaml
+
+
+def _get_data_from_snap_file_with_unsquashfs(snap_path):
     manifest_yaml = None
     with tempfile.TemporaryDirectory() as temp_dir:
         unsquashfs_path = get_snap_tool_path("unsquashfs")
@@ -83,6 +104,42 @@ def get_data_from_snap_file(snap_path):
 
 @contextlib.contextmanager
 def _get_icon_from_snap_file(snap_path):
+    try:
+        icon_file = _read_icon_from_snap_file(snap_path)
+    except squashfs.UnsupportedSquashFsError as error:
+        logger.debug("Extracting icon from snap with unsquashfs: %s", error)
+    else:
+        yield icon_file
+        return
+
+    with _get_icon_from_snap_file_with_unsquashfs(snap_path) as icon_file:
+        yield icon_file
+
+
+def _read_icon_from_snap_file(snap_path):
+    try:
+        with squashfs.SquashFsReader(snap_path) as snap_file:
+            try:
+                gui_names = snap_file.listdir("meta/gui")
+            except (FileNotFoundError, NotADirectoryError):
+                return None
+
+            for extension in ("png", "svg"):
+                icon_path = "meta/gui/icon.{}".format(extension)
+                if os.path.basename(icon_path) in gui_names:
+                    icon_file = io.BytesIO(snap_file.read_file(icon_path))
+                    icon_file.name = icon_path
+                    return icon_file
+    except squashfs.UnsupportedSquashFsError:
+        raise
+    except (squashfs.SquashFsError, OSError) as error:
+        raise SnapDataExtractionError(os.path.basename(snap_path)) from error
+
+    return None
+
+
+@contextlib.contextmanager
+def _get_icon_from_snap_file_with_unsquashfs(snap_path):
     icon_file = None
     with tempfile.TemporaryDirectory() as temp_dir:
         unsquashfs_path = get_snap_tool_path("unsquashfs")
@@ -0,0 +1,109 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import click
+from tabulate import tabulate
+
+from snapcraft_legacy.internal import cache as _cache
+
+
+def _format_size(size: float) -> str:
+    if size < 1024:
+        return "{:.0f} B".format(size)
+    for unit in ("KiB", "MiB", "GiB"):
+        size /= 1024
+        if size < 1024 or unit == "GiB":
+            break
+    return "{:.1f} {}".format(size, unit)
+
+
+def _get_total_size(index: _cache.CacheIndex) -> int:
+    return sum(s.size for s in index.get_stats().values())
+
+
+def _parse_size(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return _cache.parse_size(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
+@click.group()
+def cachecli(**kwargs):
+    pass
+
+
+@cachecli.group()
+def cache(**kwargs):
+    """Manage the snapcraft cache."""
+
+
+@cache.command()
+def stats(**kwargs):
+    """Show the number and size of cached files.
+
+    \b
+    Examples:
+        snapcraft cache stats
+    """
+    cache_stats = _cache.SnapcraftCache().index.get_stats()
+    rows = [[kind, s.files, _format_size(s.size)] for kind, s in cache_stats.items()]
+    rows.append(
+        [
+            "Total",
+            sum(s.files for s in cache_stats.values()),
+            _format_size(sum(s.size for s in cache_stats.values())),
+        ]
+    )
+    click.echo(
+        tabulate(
+            rows, numalign="left", headers=["Kind", "Files", "Size"], tablefmt="plain"
+        )
+    )
+    click.echo("Cache budget: {}".format(_format_size(_cache.get_max_size())))
+
+
+@cache.command()
+@click.option(
+    "--max-size",
+    callback=_parse_size,
+    help="Size to reduce the cache to, such as 512M or 2G, "
+    "instead of the cache budget.",
+)
+def gc(max_size, **kwargs):
+    """Evict the least recently used cached files over the cache budget.
+
+    The cache budget is set with the SNAPCRAFT_CACHE_MAX_SIZE environment
+    variable.
+
+    \b
+    Examples:
+        snapcraft cache gc
+        snapcraft cache gc --max-size 1G
+    """
+    if max_size is None:
+        max_size = _cache.get_max_size()
+
+    index = _cache.SnapcraftCache().index
+    size = _get_total_size(index)
+    evicted = index.evict(max_size=max_size)
+    freed = size - _get_total_size(index)
+
+    click.echo(
+        "Evicted {} cached files, freeing {}.".format(len(evicted), _format_size(freed))
+    )
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import errno
+import fcntl
 import hashlib
 import logging
 import os
@@ -31,6 +32,9 @@ from snapcraft_legacy.internal import common, errors
 
 logger = logging.getLogger(__name__)
 
+# The ioctl cloning a file as a copy-on-write reflink, from linux/fs.h.
+_FICLONE = 0x40049409
+
 
 def replace_in_file(
     directory: str, file_pattern: Pattern, search_pattern: Pattern, replacement: str
@@ -83,7 +87,7 @@ def search_and_replace_contents(
         )
 
 
-def link_or_copy(source: str, destination: str, follow_symlinks: bool = False) -> None:
+def link_or_copy(source: str, destination: str, follow_symlinks: bool = False) -> bool:
     """Hard-link source and destination files. Copy if it fails to link.
 
     Hard-linking may fail (e.g. a cross-device link, or permission denied), so
@@ -92,21 +96,72 @@ def link_or_copy(source: str, destination: str, follow_symlinks: bool = False) -
     :param str source: The source to which destination will be linked.
     :param str destination: The destination to be linked to source.
     :param bool follow_symlinks: Whether or not symlinks should be followed.
+    :returns: True if destination was hard-linked, False if it was copied.
     """
 
     try:
         if not follow_symlinks and os.path.islink(source):
             copy(source, destination)
+            return False
         else:
             link(source, destination, follow_symlinks=follow_symlinks)
+            return True
     except OSError as e:
         if e.errno == errno.EEXIST and not os.path.isdir(destination):
             # os.link will fail if the destination already exists, so let's
             # remove it and try again.
             os.remove(destination)
-            link_or_copy(source, destination, follow_symlinks)
+            return link_or_copy(source, destination, follow_symlinks)
         else:
             copy(source, destination, follow_symlinks=follow_symlinks)
+            return False
+
+
+def clone_link_or_copy(source: str, destination: str, *, allow_link=True) -> None:
+    """Create destination with the contents of source, sharing its data if possible.
+
+    A copy-on-write clone (reflink) is created if the filesystem supports
+    it. Otherwise source is hard-linked if allow_link is True, and copied
+    as a last resort. Hard-linked files share their data and metadata, so
+    neither file may then be modified in place.
+
+    :param str source: The file to materialize at destination.
+    :param str destination: The file to create, replaced if it exists.
+    :param bool allow_link: Whether destination may be a hard link to source.
+    """
+    with suppress(FileNotFoundError):
+        os.unlink(destination)
+
+    try:
+        clone(source, destination)
+        return
+    except OSError as error:
+        logger.debug("Unable to clone {!r}: {}".format(source, error))
+
+    if allow_link:
+        try:
+            os.link(source, destination)
+            return
+        except OSError as error:
+            logger.debug("Unable to link {!r}: {}".format(source, error))
+
+    shutil.copy2(source, destination)
+
+
+def clone(source: str, destination: str) -> None:
+    """Clone source to the new file destination as a copy-on-write reflink.
+
+    :raises OSError: if the filesystem does not support reflinks.
+    """
+    with open(source, "rb") as source_file:
+        try:
+            with open(destination, "xb") as destination_file:
+                fcntl.ioctl(destination_file.fileno(), _FICLONE, source_file.fileno())
+        except OSError:
+            with suppress(FileNotFoundError):
+                os.unlink(destination)
+            raise
+    shutil.copystat(source, destination)
 
 
 def link(source: str, destination: str, *, follow_symlinks: bool = False) -> None:
@@ -17,4 +17,5 @@
 from ._apt import AptStagePackageCache  # noqa
 from ._cache import SnapcraftCache  # noqa
 from ._file import FileCache  # noqa
+from ._index import CacheIndex, CacheStats, get_max_size, parse_size  # noqa
 from ._snap import SnapCache  # noqa
@@ -14,10 +14,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
 import os
+import sqlite3
+from typing import Optional
 
 from xdg import BaseDirectory
 
+from ._index import CacheIndex, get_max_size
+
+logger = logging.getLogger(__name__)
+
 
 class SnapcraftCache:
     """Generic cache base class.
@@ -27,6 +34,29 @@ class SnapcraftCache:
 
     def __init__(self):
         self.cache_root = os.path.join(BaseDirectory.xdg_cache_home, "snapcraft")
+        self.index = CacheIndex(cache_root=self.cache_root)
+
+    def _index_add(self, path: str, *, kind: str, created: Optional[float] = None):
+        """Record path in the index, evicting files over the cache budget."""
+        try:
+            self.index.add(path, kind=kind, created=created)
+            self.index.evict(max_size=get_max_size(), keep=path)
+        except (OSError, sqlite3.Error) as error:
+            logger.debug("Unable to update the cache index: {}".format(error))
+
+    def _index_touch(self, path: str):
+        """Record an access to path in the index."""
+        try:
+            self.index.touch(path)
+        except (OSError, sqlite3.Error) as error:
+            logger.debug("Unable to update the cache index: {}".format(error))
+
+    def _index_remove(self, path: str):
+        """Forget path in the index."""
+        try:
+            self.index.remove([path])
+        except (OSError, sqlite3.Error) as error:
+            logger.debug("Unable to update the cache index: {}".format(error))
 
 
 class SnapcraftProjectCache(SnapcraftCache):
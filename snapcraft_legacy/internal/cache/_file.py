@@ -16,6 +16,7 @@
 import logging
 import os
 import shutil
+import stat
 from typing import Optional
 
 from snapcraft_legacy.file_utils import calculate_hash
@@ -24,6 +25,8 @@ from ._cache import SnapcraftCache
 
 logger = logging.getLogger(__name__)
 
+_WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
 
 class FileCache(SnapcraftCache):
     """Generic file cache."""
@@ -35,18 +38,33 @@ class FileCache(SnapcraftCache):
                               (default: "files").
         """
         super().__init__()
+        self.namespace = namespace
         self.file_cache = os.path.join(self.cache_root, namespace)
 
-    def cache(self, *, filename: str, algorithm: str, hash: str) -> Optional[str]:
+    def cache(
+        self,
+        *,
+        filename: str,
+        algorithm: str,
+        hash: str,
+        calculated_hash: Optional[str] = None,
+    ) -> Optional[str]:
         """Cache a file revision with hash in XDG cache, unless it already exists.
+
+        Cached files are made read-only, as they may be hard-linked when
+        retrieved.
+
         :param str filename: path to the file to cache.
         :param str algorithm: algorithm used to calculate the hash as
                               understood by hashlib.
         :param str hash: hash for filename calculated with algorithm.
+        :param str calculated_hash: hash of filename, if already calculated
+                                    with algorithm.
         :returns: path to cached file.
         """
         # First we verify
-        calculated_hash = calculate_hash(filename, algorithm=algorithm)
+        if calculated_hash is None:
+            calculated_hash = calculate_hash(filename, algorithm=algorithm)
         if calculated_hash != hash:
             logger.warning(
                 "Skipping caching of {!r} as the expected "
@@ -62,22 +80,41 @@ class FileCache(SnapcraftCache):
                 # with changes should invalidate the cache, hence avoids
                 # using fileutils.link_or_copy.
                 shutil.copyfile(filename, cached_file_path)
+                mode = stat.S_IMODE(os.stat(cached_file_path).st_mode)
+                os.chmod(cached_file_path, mode & ~_WRITE_BITS)
         except OSError:
             logger.warning("Unable to cache file {}.".format(cached_file_path))
             return None
+        self._index_add(cached_file_path, kind=self.namespace)
         return cached_file_path
 
     def get(self, *, algorithm: str, hash: str):
         """Get the filepath which matches the hash calculated with algorithm.
 
+        Writable files, cached before entries were made read-only, are
+        verified and made read-only before being returned, as they may be
+        hard-linked.
+
         :param str algorithm: algorithm used to calculate the hash as
                               understood by hashlib.
         :param str hash: hash for filename calculated with algorithm.
         :returns: path to cached file.
         """
         cached_file_path = os.path.join(self.file_cache, algorithm, hash)
-        if os.path.exists(cached_file_path):
-            logger.debug("Cache hit for hash {!r}".format(hash))
-            return cached_file_path
-        else:
+        try:
+            mode = stat.S_IMODE(os.stat(cached_file_path).st_mode)
+            if mode & _WRITE_BITS:
+                if calculate_hash(cached_file_path, algorithm=algorithm) != hash:
+                    logger.warning(
+                        "Discarding cached file {!r} as its hash does not "
+                        "match".format(cached_file_path)
+                    )
+                    os.remove(cached_file_path)
+                    self._index_remove(cached_file_path)
+                    return None
+                os.chmod(cached_file_path, mode & ~_WRITE_BITS)
+        except OSError:
             return None
+        logger.debug("Cache hit for hash {!r}".format(hash))
+        self._index_touch(cached_file_path)
+        return cached_file_path
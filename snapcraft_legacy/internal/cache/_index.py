@@ -0,0 +1,224 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import contextlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# The byte budget of the cache can be set with this environment variable,
+# as a number of bytes with an optional K, M or G suffix.
+MAX_SIZE_ENVIRONMENT_VARIABLE = "SNAPCRAFT_CACHE_MAX_SIZE"
+DEFAULT_MAX_SIZE = 10 * 1024**3
+
+_SIZE_REGEX = re.compile(r"^\s*(\d+)\s*([KMG]?)i?B?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_group ON entries (grp, created);
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries (accessed);
+"""
+
+
+def parse_size(size: str) -> int:
+    """Parse a size such as 512M into a number of bytes.
+
+    :raises ValueError: if the size is invalid.
+    """
+    match = _SIZE_REGEX.match(size)
+    if match is None:
+        raise ValueError("invalid size {!r}".format(size))
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+
+def get_max_size() -> int:
+    """Get the byte budget of the cache from the environment."""
+    max_size = os.getenv(MAX_SIZE_ENVIRONMENT_VARIABLE)
+    if not max_size:
+        return DEFAULT_MAX_SIZE
+
+    try:
+        return parse_size(max_size)
+    except ValueError:
+        logger.warning(
+            "Ignoring invalid {} {!r}, using the default cache size.".format(
+                MAX_SIZE_ENVIRONMENT_VARIABLE, max_size
+            )
+        )
+        return DEFAULT_MAX_SIZE
+
+
+class CacheStats(NamedTuple):
+    """The number of files and bytes of a kind of cached files."""
+
+    files: int
+    size: int
+
+
+class CacheIndex:
+    """Index of the files in the snapcraft cache.
+
+    The index records the size and the last access time of every cached
+    file, so that the cache can be kept within a byte budget by evicting
+    the least recently used files, and so that the latest file of a group
+    can be found without listing and stat-ing its directory.
+
+    Cached files are grouped by the directory holding them.
+    """
+
+    def __init__(self, *, cache_root: str) -> None:
+        self.cache_root = cache_root
+        self.path = os.path.join(cache_root, "index.sqlite")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        os.makedirs(self.cache_root, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                connection.executescript(_SCHEMA)
+                yield connection
+        finally:
+            connection.close()
+
+    def _get_group(self, directory: str) -> str:
+        return os.path.relpath(directory, self.cache_root)
+
+    def add(self, path: str, *, kind: str, created: Optional[float] = None) -> None:
+        """Record a file added to the cache.
+
+        Adding a file already in the index only updates its access time.
+
+        :param str path: path to the cached file.
+        :param str kind: the kind of cached file, used for statistics.
+        :param float created: the time the file was added, now by default.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    path,
+                    kind,
+                    self._get_group(os.path.dirname(path)),
+                    os.path.getsize(path),
+                    now if created is None else created,
+                    now,
+                ),
+            )
+            connection.execute(
+                "UPDATE entries SET accessed = ? WHERE path = ?", (now, path)
+            )
+
+    def touch(self, path: str) -> None:
+        """Record an access to a cached file."""
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE entries SET accessed = ? WHERE path = ?", (time.time(), path)
+            )
+
+    def remove(self, paths: List[str]) -> None:
+        """Forget files removed from the cache."""
+        with self._connect() as connection:
+            connection.executemany(
+                "DELETE FROM entries WHERE path = ?", [(path,) for path in paths]
+            )
+
+    def has_group(self, directory: str) -> bool:
+        """Check if files of directory are in the index."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM entries WHERE grp = ? LIMIT 1",
+                (self._get_group(directory),),
+            ).fetchone()
+        return row is not None
+
+    def get_latest(self, directory: str) -> Optional[str]:
+        """Get the file of directory most recently added to the cache.
+
+        Files removed from the cache without updating the index are
+        forgotten.
+        """
+        group = self._get_group(directory)
+        with self._connect() as connection:
+            for (path,) in connection.execute(
+                "SELECT path FROM entries WHERE grp = ? "
+                "ORDER BY created DESC, rowid DESC",
+                (group,),
+            ).fetchall():
+                if os.path.isfile(path):
+                    return path
+                connection.execute("DELETE FROM entries WHERE path = ?", (path,))
+        return None
+
+    def get_stats(self) -> Dict[str, CacheStats]:
+        """Get the number of files and bytes cached by kind."""
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT kind, COUNT(*), SUM(size) FROM entries "
+                "GROUP BY kind ORDER BY kind"
+            ).fetchall()
+        return {kind: CacheStats(files, size) for kind, files, size in rows}
+
+    def evict(self, *, max_size: int, keep: Optional[str] = None) -> List[str]:
+        """Remove the least recently used files until the cache fits max_size.
+
+        :param int max_size: the byte budget of the cache.
+        :param str keep: a file which must not be evicted.
+        :returns: the evicted files paths list.
+        """
+        evicted: List[str] = []
+        with self._connect() as connection:
+            (total_size,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+            if total_size <= max_size:
+                return evicted
+
+            for path, size in connection.execute(
+                "SELECT path, size FROM entries ORDER BY accessed"
+            ).fetchall():
+                if total_size <= max_size:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logger.warning("Unable to evict cached file {}.".format(path))
+                    continue
+                connection.execute("DELETE FROM entries WHERE path = ?", (path,))
+                evicted.append(path)
+                total_size -= size
+
+        for path in evicted:
+            logger.debug("Evicted cached file {!r}".format(path))
+        return evicted
@@ -17,11 +17,13 @@
 import logging
 import os
 import shutil
+import sqlite3
 import subprocess
 import tempfile
 from pathlib import Path
 
 from snapcraft_legacy import file_utils, yaml_utils
+from snapcraft_legacy.internal import errors, squashfs
 
 from ._cache import SnapcraftProjectCache
 
@@ -41,6 +43,26 @@ class SnapCache(SnapcraftProjectCache):
         return snap_cache_root
 
     def _get_snap_deb_arch(self, snap_filename):
+        try:
+            with squashfs.SquashFsReader(snap_filename) as snap_file:
+                snap_yaml = yaml_utils.load(
+                    snap_file.read_file("meta/snap.yaml").decode()
+                )
+        except squashfs.UnsupportedSquashFsError as error:
+            logger.debug("Reading snap.yaml with unsquashfs: %s", error)
+            snap_yaml = self._get_snap_yaml_with_unsquashfs(snap_filename)
+        except squashfs.SquashFsError as error:
+            raise errors.SnapDataExtractionError(
+                os.path.basename(snap_filename)
+            ) from error
+
+        # XXX: add multiarch support later
+        try:
+            return snap_yaml["architectures"][0]
+        except KeyError:
+            return "all"
+
+    def _get_snap_yaml_with_unsquashfs(self, snap_filename):
         with tempfile.TemporaryDirectory() as temp_dir:
             unsquashfs_path = file_utils.get_snap_tool_path("unsquashfs")
             output = subprocess.check_output(
@@ -58,12 +80,7 @@ class SnapCache(SnapcraftProjectCache):
             with open(
                 os.path.join(temp_dir, "squashfs-root", "meta", "snap.yaml")
             ) as yaml_file:
-                snap_yaml = yaml_utils.load(yaml_file)
-        # XXX: add multiarch support later
-        try:
-            return snap_yaml["architectures"][0]
-        except KeyError:
-            return "all"
+                return yaml_utils.load(yaml_file)
 
     def _get_snap_cache_path(self, snap_filename):
         snap_hash = file_utils.calculate_sha3_384(snap_filename)
@@ -84,6 +101,8 @@ class SnapCache(SnapcraftProjectCache):
                 shutil.copyfile(snap_filename, cached_snap_path)
         except OSError:
             logger.warning("Unable to cache snap {}.".format(snap_filename))
+        else:
+            self._index_add(cached_snap_path, kind="snaps")
         return cached_snap_path
 
     def get(self, *, deb_arch, snap_hash=None):
@@ -98,17 +117,38 @@ class SnapCache(SnapcraftProjectCache):
         if not os.path.isdir(snap_cache_dir):
             return None
 
-        cached_hashes = os.listdir(snap_cache_dir)
-        if not cached_hashes:
-            return None
-
         if snap_hash:
-            for cached_hash in cached_hashes:
-                if cached_hash == snap_hash:
-                    return os.path.join(snap_cache_dir, cached_hash)
+            cached_snap = os.path.join(snap_cache_dir, snap_hash)
+            if not os.path.isfile(cached_snap):
+                return None
+        else:
+            cached_snap = self._get_latest(snap_cache_dir)
+            if cached_snap is None:
+                return None
+
+        self._index_touch(cached_snap)
+        return cached_snap
+
+    def _get_latest(self, snap_cache_dir):
+        try:
+            # Adopt snaps cached before the index existed.
+            if not self.index.has_group(snap_cache_dir):
+                for cached_hash in os.listdir(snap_cache_dir):
+                    cached_snap = os.path.join(snap_cache_dir, cached_hash)
+                    self.index.add(
+                        cached_snap,
+                        kind="snaps",
+                        created=os.path.getctime(cached_snap),
+                    )
+            return self.index.get_latest(snap_cache_dir)
+        except (OSError, sqlite3.Error) as error:
+            logger.debug("Unable to query the cache index: {}".format(error))
+
+        cached_snaps = [
+            os.path.join(snap_cache_dir, f) for f in os.listdir(snap_cache_dir)
+        ]
+        if not cached_snaps:
             return None
-
-        cached_snaps = [os.path.join(snap_cache_dir, f) for f in cached_hashes]
         return max(cached_snaps, key=os.path.getctime)
 
     def prune(self, *, deb_arch, keep_hash):
@@ -128,4 +168,9 @@ class SnapCache(SnapcraftProjectCache):
                     pruned_files_list.append(cached_snap)
                 except OSError:
                     logger.warning("Unable to prune snap {}.".format(cached_snap))
+
+        try:
+            self.index.remove(pruned_files_list)
+        except (OSError, sqlite3.Error) as error:
+            logger.debug("Unable to update the cache index: {}".format(error))
         return pruned_files_list
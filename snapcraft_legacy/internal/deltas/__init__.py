@@ -18,3 +18,4 @@
 from . import errors  # noqa
 from ._deltas import BaseDeltasGenerator  # noqa
 from ._xdelta3 import XDelta3Generator  # noqa
+from ._service import DeltaSourceCache, generate_deltas  # noqa
@@ -100,6 +100,27 @@ class BaseDeltasGenerator:
                 delta_min_percentage=100 - self.delta_size_min_pct
             )
 
+    def _check_predicted_delta_size_constraint(self) -> None:
+        """Ensure the delta can be sufficiently smaller than the target snap.
+
+        Snaps are compressed squashfs images, so the bytes a target adds on
+        top of its source can hardly be expressed as copies from the source.
+        That growth is a lower bound for the delta size, which allows
+        rejecting deltas that cannot meet `delta_size_min_pct` before
+        spending time generating them.
+        """
+        target_size = os.path.getsize(self.target_path)
+        source_size = os.path.getsize(self.source_path)
+        if target_size == 0:
+            return
+
+        min_delta_size = max(0, target_size - source_size)
+        ratio = int((min_delta_size / target_size) * 100)
+        if ratio >= self.delta_size_min_pct:
+            raise DeltaGenerationTooBigError(
+                delta_min_percentage=100 - self.delta_size_min_pct
+            )
+
     def find_unique_file_name(self, path_hint: str) -> str:
         """Return a path on disk similar to 'path_hint' that does not exist.
 
@@ -161,6 +182,8 @@ class BaseDeltasGenerator:
             "Generating delta for {!r}.".format(os.path.basename(self.target_path))
         )
 
+        self._check_predicted_delta_size_constraint()
+
         if output_dir is not None:
             # consider creating the delta file in the specified output_dir
             # with generated filename.
@@ -0,0 +1,204 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import concurrent.futures
+import contextlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Type
+
+from snapcraft_legacy import file_utils
+from snapcraft_legacy.internal.cache import SnapcraftCache
+from snapcraft_legacy.internal.deltas.errors import DeltaGenerationTooBigError
+
+from ._deltas import BaseDeltasGenerator
+from ._xdelta3 import XDelta3Generator
+
+logger = logging.getLogger(__name__)
+
+
+class DeltaSourceCache(SnapcraftCache):
+    """Content addressed cache of uploaded snaps to generate deltas from.
+
+    Snaps are stored once by their sha3-384 hash, and a reference per snap
+    name and architecture points to the last revision uploaded for it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.delta_source_cache_root = os.path.join(self.cache_root, "delta-sources")
+        self._objects_dir = os.path.join(self.delta_source_cache_root, "sha3_384")
+        self._refs_dir = os.path.join(self.delta_source_cache_root, "refs")
+
+    def _get_ref_path(self, *, snap_name: str, deb_arch: str) -> str:
+        return os.path.join(self._refs_dir, snap_name, deb_arch)
+
+    def add(self, *, snap_name: str, deb_arch: str, snap_path: str) -> str:
+        """Cache snap_path as the last revision of snap_name for deb_arch.
+
+        :returns: path to the cached snap.
+        """
+        snap_hash = file_utils.calculate_sha3_384(snap_path)
+        cached_snap_path = os.path.join(self._objects_dir, snap_hash)
+
+        if not os.path.isfile(cached_snap_path):
+            os.makedirs(self._objects_dir, exist_ok=True)
+            # Like SnapCache, copy instead of linking so that rebuilding the
+            # snap in place cannot alter the cached revision.
+            self._write_atomically(
+                cached_snap_path, lambda f: shutil.copyfile(snap_path, f)
+            )
+
+        ref_path = self._get_ref_path(snap_name=snap_name, deb_arch=deb_arch)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+
+        def _write_ref(path):
+            with open(path, "w") as ref_file:
+                ref_file.write(snap_hash)
+
+        self._write_atomically(ref_path, _write_ref)
+        return cached_snap_path
+
+    def get(self, *, snap_name: str, deb_arch: str) -> Optional[str]:
+        """Get the last cached revision of snap_name for deb_arch.
+
+        :returns: full path to the cached snap, or None if not cached.
+        """
+        ref_path = self._get_ref_path(snap_name=snap_name, deb_arch=deb_arch)
+        try:
+            with open(ref_path) as ref_file:
+                snap_hash = ref_file.read().strip()
+        except OSError:
+            return None
+
+        cached_snap_path = os.path.join(self._objects_dir, snap_hash)
+        if not snap_hash or not os.path.isfile(cached_snap_path):
+            return None
+        return cached_snap_path
+
+    def prune(self) -> List[str]:
+        """Remove the cached snaps no longer referenced.
+
+        :returns: pruned files paths list.
+        """
+        referenced = set()
+        for dirpath, _, filenames in os.walk(self._refs_dir):
+            for filename in filenames:
+                with contextlib.suppress(OSError):
+                    with open(os.path.join(dirpath, filename)) as ref_file:
+                        referenced.add(ref_file.read().strip())
+
+        pruned_files_list = []
+        if not os.path.isdir(self._objects_dir):
+            return pruned_files_list
+
+        for snap_hash in os.listdir(self._objects_dir):
+            if snap_hash in referenced:
+                continue
+            cached_snap = os.path.join(self._objects_dir, snap_hash)
+            try:
+                os.remove(cached_snap)
+                pruned_files_list.append(cached_snap)
+            except OSError:
+                logger.warning("Unable to prune snap {}.".format(cached_snap))
+        return pruned_files_list
+
+    @staticmethod
+    def _write_atomically(path, write) -> None:
+        temp_fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), prefix=".tmp-"
+        )
+        os.close(temp_fd)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+
+def generate_deltas(
+    *,
+    snap_name: str,
+    target_paths: Dict[str, str],
+    source_cache: DeltaSourceCache,
+    output_dir: str = None,
+    generator_class: Type[BaseDeltasGenerator] = XDelta3Generator,
+    max_workers: int = None
+) -> Dict[str, Optional[str]]:
+    """Generate deltas for the snaps of several architectures in parallel.
+
+    Each target is diffed against the last revision cached for its
+    architecture in source_cache. No delta is generated for targets without
+    a cached source, or whose delta would not save enough to be worth
+    uploading.
+
+    :param snap_name: the name of the snap.
+    :param target_paths: the snap file to generate a delta for, by deb arch.
+    :param source_cache: the cache of previously uploaded snaps.
+    :param output_dir: the directory to write the deltas to, defaults to
+                       the directory of each target.
+    :param generator_class: the delta generator to use.
+    :param max_workers: the number of deltas to generate at once, defaults
+                        to the number of CPUs.
+
+    :returns: the path to the delta, or None, by deb arch.
+    """
+    deltas = {deb_arch: None for deb_arch in target_paths}  # type: Dict[str, Optional[str]]
+    generators = dict()  # type: Dict[str, BaseDeltasGenerator]
+    for deb_arch, target_path in sorted(target_paths.items()):
+        source_path = source_cache.get(snap_name=snap_name, deb_arch=deb_arch)
+        if source_path is None:
+            logger.debug(
+                "No cached revision of {!r} for {!r} to generate a delta from.".format(
+                    snap_name, deb_arch
+                )
+            )
+            continue
+        generators[deb_arch] = generator_class(
+            source_path=source_path, target_path=target_path
+        )
+
+    if not generators:
+        return deltas
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(generators)))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            deb_arch: executor.submit(generator.make_delta, output_dir)
+            for deb_arch, generator in generators.items()
+        }
+        try:
+            for deb_arch, future in futures.items():
+                try:
+                    deltas[deb_arch] = future.result()
+                except DeltaGenerationTooBigError as error:
+                    logger.info(
+                        "Not using a delta for {!r}: {}".format(
+                            os.path.basename(target_paths[deb_arch]), error
+                        )
+                    )
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return deltas
@@ -41,8 +41,13 @@ def _init_progress_bar(total_length, destination, message=None):
     return ProgressBar(widgets=widgets, maxval=maxval)
 
 
-def download_requests_stream(request_stream, destination, message=None, total_read=0):
-    """This is a facility to download a request with nice progress bars."""
+def download_requests_stream(
+    request_stream, destination, message=None, total_read=0, hasher=None
+):
+    """This is a facility to download a request with nice progress bars.
+
+    If hasher is set, it is updated with the contents of destination.
+    """
 
     # Doing len(request_stream.content) may defeat the purpose of a
     # progress bar
@@ -60,11 +65,17 @@ def download_requests_stream(request_stream, destination, message=None, total_re
 
     if os.path.exists(destination):
         mode = "ab"
+        if hasher is not None:
+            with open(destination, "rb") as destination_file:
+                for buf in iter(lambda: destination_file.read(2**20), b""):
+                    hasher.update(buf)
     else:
         mode = "wb"
     with open(destination, mode) as destination_file:
         for buf in request_stream.iter_content(1024):
             destination_file.write(buf)
+            if hasher is not None:
+                hasher.update(buf)
             if not is_dumb_terminal():
                 total_read += len(buf)
                 progress_bar.update(total_read)
@@ -17,7 +17,6 @@
 import collections
 import contextlib
 import copy
-import filecmp
 import io
 import logging
 import os
@@ -29,7 +28,7 @@ from glob import iglob
 from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set, cast
 
 import snapcraft_legacy.extractors
-from snapcraft_legacy import file_utils, plugins, yaml_utils
+from snapcraft_legacy import file_utils, plugins
 from snapcraft_legacy.internal import (
     common,
     elf,
@@ -43,9 +42,12 @@ from snapcraft_legacy.internal import (
 from snapcraft_legacy.internal.mangling import clear_execstack
 
 from ._build_attributes import BuildAttributes
+from ._collisions import CollisionIndex
 from ._dependencies import MissingDependencyResolver
 from ._dirty_report import Dependency, DirtyReport  # noqa
+from ._fileset import get_migratable_filesets
 from ._metadata_extraction import extract_metadata
+from ._migration import migrate_files
 from ._outdated_report import OutdatedReport
 from ._part_environment import get_snapcraft_part_environment
 from ._patchelf import PartPatcher
@@ -428,8 +430,9 @@ class PluginHandler:
         if not state:
             state = {}
 
-        with open(states.get_step_state_file(self.part_state_dir, step), "w") as f:
-            f.write(yaml_utils.dump(state))
+        states.write_state(
+            states.get_step_state_file(self.part_state_dir, step), state
+        )
 
     def mark_cleaned(self, step):
         state_file = states.get_step_state_file(self.part_state_dir, step)
@@ -557,6 +560,11 @@ class PluginHandler:
             ),
         )
 
+        if self.source_handler:
+            self.source_handler.record(
+                states.get_step_state_file(self.part_state_dir, steps.PULL)
+            )
+
     def clean_pull(self):
         if self.is_clean(steps.PULL):
             return
@@ -574,6 +582,13 @@ class PluginHandler:
         if self.stage_packages_path.exists():
             shutil.rmtree(self.stage_packages_path)
 
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(
+                sources.get_digests_file(
+                    states.get_step_state_file(self.part_state_dir, steps.PULL)
+                )
+            )
+
         self.mark_cleaned(steps.PULL)
 
     def prepare_build(self, force=False):
@@ -836,20 +851,22 @@ class PluginHandler:
 
         def fixup_func(file_path):
             if os.path.islink(file_path):
-                return
+                return False
             if not file_path.endswith(".pc"):
-                return
+                return False
             repo.fix_pkg_config(
                 self._project.stage_dir, file_path, self.part_install_dir
             )
+            return True
 
-        _migrate_files(
+        counters = _migrate_files(
             snap_files,
             snap_dirs,
             self.part_install_dir,
             self._project.stage_dir,
             fixup_func=fixup_func,
         )
+        logger.debug("Staged {!r}: {}".format(self.name, counters))
         # TODO once `snappy try` is in place we will need to copy
         # dependencies here too
 
@@ -901,9 +918,10 @@ class PluginHandler:
 
     def _do_prime(self) -> None:
         snap_files, snap_dirs = self.migratable_fileset_for(steps.PRIME)
-        _migrate_files(
+        counters = _migrate_files(
             snap_files, snap_dirs, self._project.stage_dir, self._project.prime_dir
         )
+        logger.debug("Primed {!r}: {}".format(self.name, counters))
 
         if (
             self._project._snap_meta.type in ("app", None)
@@ -1191,47 +1209,7 @@ def _expand_part_properties(part_properties, part_schema):
 def _migratable_filesets(fileset, srcdir):
     includes, excludes = _get_file_list(fileset)
 
-    include_files = _generate_include_set(srcdir, includes)
-    exclude_files, exclude_dirs = _generate_exclude_set(srcdir, excludes)
-
-    # Chop files, including whole trees if any dirs are mentioned.
-    snap_files = include_files - exclude_files
-    for exclude_dir in exclude_dirs:
-        snap_files = set([x for x in snap_files if not x.startswith(exclude_dir + "/")])
-
-    # Separate dirs from files.
-    snap_dirs = set(
-        [
-            x
-            for x in snap_files
-            if os.path.isdir(os.path.join(srcdir, x))
-            and not os.path.islink(os.path.join(srcdir, x))
-        ]
-    )
-
-    # Remove snap_dirs from snap_files.
-    snap_files = snap_files - snap_dirs
-
-    # Include (resolved) parent directories for each selected file.
-    for snap_file in snap_files:
-        snap_file = file_utils.get_resolved_relative_path(snap_file, srcdir)
-        dirname = os.path.dirname(snap_file)
-        while dirname:
-            snap_dirs.add(dirname)
-            dirname = os.path.dirname(dirname)
-
-    # Resolve parent paths for dirs and files.
-    resolved_snap_dirs = set()
-    for snap_dir in snap_dirs:
-        snap_dir = file_utils.get_resolved_relative_path(snap_dir, srcdir)
-        resolved_snap_dirs.add(snap_dir)
-
-    resolved_snap_files = set()
-    for snap_file in snap_files:
-        snap_file = file_utils.get_resolved_relative_path(snap_file, srcdir)
-        resolved_snap_files.add(snap_file)
-
-    return resolved_snap_files, resolved_snap_dirs
+    return get_migratable_filesets(includes, excludes, srcdir)
 
 
 def _migrate_files(
@@ -1243,33 +1221,15 @@ def _migrate_files(
     follow_symlinks=False,
     fixup_func=lambda *args: None,
 ):
-    for snap_dir in sorted(snap_dirs):
-        src = os.path.join(srcdir, snap_dir)
-        dst = os.path.join(dstdir, snap_dir)
-
-        snapcraft_legacy.file_utils.create_similar_directory(src, dst)
-
-    for snap_file in sorted(snap_files):
-        src = os.path.join(srcdir, snap_file)
-        dst = os.path.join(dstdir, snap_file)
-
-        if missing_ok and not os.path.exists(src):
-            continue
-
-        # If the file is already here and it's a symlink, leave it alone.
-        if os.path.islink(dst):
-            continue
-
-        # Otherwise, remove and re-link it.
-        if os.path.exists(dst):
-            os.remove(dst)
-
-        if src.endswith(".pc"):
-            shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
-        else:
-            file_utils.link_or_copy(src, dst, follow_symlinks=follow_symlinks)
-
-        fixup_func(dst)
+    return migrate_files(
+        snap_files,
+        snap_dirs,
+        srcdir,
+        dstdir,
+        missing_ok=missing_ok,
+        follow_symlinks=follow_symlinks,
+        fixup_func=fixup_func,
+    )
 
 
 def _organize_filesets(part_name, fileset, base_dir, overwrite):
@@ -1370,141 +1330,27 @@ def _get_file_list(stage_set):
     return includes, excludes
 
 
-def _generate_include_set(directory, includes):
-    include_files = set()
-    for include in includes:
-        if "*" in include:
-            pattern = os.path.join(directory, include)
-            matches = iglob(pattern, recursive=True)
-            include_files |= set(matches)
-        else:
-            include_files |= set([os.path.join(directory, include)])
-
-    include_dirs = [
-        x for x in include_files if os.path.isdir(x) and not os.path.islink(x)
-    ]
-    include_files = set([os.path.relpath(x, directory) for x in include_files])
-
-    # Expand includeFiles, so that an exclude like '*/*.so' will still match
-    # files from an include like 'lib'
-    for include_dir in include_dirs:
-        for root, dirs, files in os.walk(include_dir):
-            include_files |= set(
-                [os.path.relpath(os.path.join(root, d), directory) for d in dirs]
-            )
-            include_files |= set(
-                [os.path.relpath(os.path.join(root, f), directory) for f in files]
-            )
-
-    return include_files
-
-
-def _generate_exclude_set(directory, excludes):
-    exclude_files = set()
-
-    for exclude in excludes:
-        pattern = os.path.join(directory, exclude)
-        matches = iglob(pattern, recursive=True)
-        exclude_files |= set(matches)
-
-    exclude_dirs = [
-        os.path.relpath(x, directory) for x in exclude_files if os.path.isdir(x)
-    ]
-    exclude_files = set([os.path.relpath(x, directory) for x in exclude_files])
-
-    return exclude_files, exclude_dirs
-
-
 def _validate_relative_paths(files):
     for d in files:
         if os.path.isabs(d):
             raise errors.PluginError('path "{}" must be relative'.format(d))
 
 
-def _file_collides(file_this, file_other):
-    if not file_this.endswith(".pc"):
-        return not filecmp.cmp(file_this, file_other, shallow=False)
-
-    pc_file_1 = open(file_this)
-    pc_file_2 = open(file_other)
-
-    try:
-        for lines in zip(pc_file_1, pc_file_2):
-            for line in zip(lines[0].split("\n"), lines[1].split("\n")):
-                if line[0].startswith("prefix="):
-                    continue
-                if line[0] != line[1]:
-                    return True
-    except Exception as e:
-        raise e from e
-    finally:
-        pc_file_1.close()
-        pc_file_2.close()
-    return False
-
-
 def check_for_collisions(parts):
     """Raises a SnapcraftPartConflictError if conflicts are found."""
-    parts_files = {}
+    index = CollisionIndex()
     for part in parts:
-        # Gather our own files up
         part_files, part_directories = part.migratable_fileset_for(steps.STAGE)
-        part_contents = part_files | part_directories
-
-        # Scan previous parts for collisions
-        for other_part_name in parts_files:
-            common = part_contents & parts_files[other_part_name]["files"]
-            conflict_files = []
-            for f in common:
-                this = os.path.join(part.part_install_dir, f)
-                other = os.path.join(parts_files[other_part_name]["installdir"], f)
-
-                if _paths_collide(this, other):
-                    conflict_files.append(f)
-
-            if conflict_files:
-                raise errors.SnapcraftPartConflictError(
-                    other_part_name=other_part_name,
-                    part_name=part.name,
-                    conflict_files=conflict_files,
-                )
-
-        # And add our files to the list
-        parts_files[part.name] = {
-            "files": part_contents,
-            "installdir": part.part_install_dir,
-        }
-
-
-def _paths_collide(path1: str, path2: str) -> bool:
-    if not (os.path.lexists(path1) and os.path.lexists(path2)):
-        return False
-
-    path1_is_dir = os.path.isdir(path1)
-    path2_is_dir = os.path.isdir(path2)
-    path1_is_link = os.path.islink(path1)
-    path2_is_link = os.path.islink(path2)
-
-    # Paths collide if they're both symlinks, but pointing to different places
-    if path1_is_link and path2_is_link:
-        return os.readlink(path1) != os.readlink(path2)
-
-    # Paths collide if one is a symlink, but not the other
-    elif path1_is_link or path2_is_link:
-        return True
-
-    # Paths collide if one is a directory, but not the other
-    elif path1_is_dir != path2_is_dir:
-        return True
-
-    # Paths collide if neither path is a directory, and the files have
-    # different contents
-    elif not (path1_is_dir and path2_is_dir) and _file_collides(path1, path2):
-        return True
-
-    # Otherwise, paths do not conflict
-    else:
-        return False
+        conflict = index.add(
+            part.name, part.part_install_dir, part_files | part_directories
+        )
+        if conflict is not None:
+            other_part_name, conflict_files = conflict
+            raise errors.SnapcraftPartConflictError(
+                other_part_name=other_part_name,
+                part_name=part.name,
+                conflict_files=conflict_files,
+            )
 
 
 def _get_includes(fileset):
@@ -0,0 +1,196 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Detection of parts staging different files at the same path."""
+
+import filecmp
+import hashlib
+import os
+import stat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_READ_SIZE = 1024 * 1024
+
+# Content digests keyed by device, inode, size and modification time.
+_Digests = Dict[Tuple[int, int, int, int], str]
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(_READ_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _get_digest(path: str, stat_result: os.stat_result, digests: _Digests) -> str:
+    key = (
+        stat_result.st_dev,
+        stat_result.st_ino,
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+    )
+    digest = digests.get(key)
+    if digest is None:
+        digest = digests[key] = _hash_file(path)
+    return digest
+
+
+class _Entry:
+    """A path of a part, stat-ed and hashed only when compared."""
+
+    __slots__ = ("path", "_digests", "_stat", "_stat_done", "_digest")
+
+    def __init__(self, path: str, digests: _Digests) -> None:
+        self.path = path
+        self._digests = digests
+        self._stat: Optional[os.stat_result] = None
+        self._stat_done = False
+        self._digest: Optional[str] = None
+
+    @property
+    def stat(self) -> Optional[os.stat_result]:
+        """The lstat of the path, or None if it does not exist."""
+        if not self._stat_done:
+            try:
+                self._stat = os.lstat(self.path)
+            except OSError:
+                self._stat = None
+            self._stat_done = True
+        return self._stat
+
+    @property
+    def digest(self) -> str:
+        """The sha256 digest of the contents of the file."""
+        if self._digest is None:
+            self._digest = _get_digest(self.path, self.stat, self._digests)
+        return self._digest
+
+
+def _is_same_file(this: _Entry, other: _Entry) -> bool:
+    return (this.stat.st_dev, this.stat.st_ino) == (
+        other.stat.st_dev,
+        other.stat.st_ino,
+    ) or this.digest == other.digest
+
+
+def _file_collides(file_this: str, file_other: str) -> bool:
+    """Compare the contents of two files, byte per byte.
+
+    The prefix of pkg-config files is ignored.
+    """
+    if not file_this.endswith(".pc"):
+        return not filecmp.cmp(file_this, file_other, shallow=False)
+
+    with open(file_this) as pc_file_1, open(file_other) as pc_file_2:
+        for lines in zip(pc_file_1, pc_file_2):
+            for line in zip(lines[0].split("\n"), lines[1].split("\n")):
+                if line[0].startswith("prefix="):
+                    continue
+                if line[0] != line[1]:
+                    return True
+    return False
+
+
+def _entries_collide(this: _Entry, other: _Entry) -> bool:
+    this_stat = this.stat
+    other_stat = other.stat
+    if this_stat is None or other_stat is None:
+        return False
+
+    this_is_link = stat.S_ISLNK(this_stat.st_mode)
+    other_is_link = stat.S_ISLNK(other_stat.st_mode)
+
+    # Paths collide if they're both symlinks, but pointing to different places
+    if this_is_link and other_is_link:
+        return os.readlink(this.path) != os.readlink(other.path)
+
+    # Paths collide if one is a symlink, but not the other
+    if this_is_link or other_is_link:
+        return True
+
+    this_is_dir = stat.S_ISDIR(this_stat.st_mode)
+    other_is_dir = stat.S_ISDIR(other_stat.st_mode)
+
+    # Paths collide if one is a directory, but not the other
+    if this_is_dir != other_is_dir:
+        return True
+
+    # Paths do not collide if both are directories
+    if this_is_dir:
+        return False
+
+    # Otherwise, compare the files contents
+    return _files_collide(this, other)
+
+
+def _files_collide(this: _Entry, other: _Entry) -> bool:
+    if not (stat.S_ISREG(this.stat.st_mode) and stat.S_ISREG(other.stat.st_mode)):
+        # As with filecmp, files which are not regular always differ.
+        return True
+    elif this.path.endswith(".pc"):
+        # Identical pkg-config files do not collide, others are compared
+        # ignoring their prefix.
+        if _is_same_file(this, other):
+            return False
+    elif this.stat.st_size != other.stat.st_size:
+        return True
+    elif _is_same_file(this, other):
+        return False
+
+    # Only compare the files byte per byte if their digests differ.
+    return _file_collides(this.path, other.path)
+
+
+class CollisionIndex:
+    """Index of the paths staged by parts, to find the files they share.
+
+    Every path maps to the parts staging it, so that the files of a part
+    are only compared with the files of the previous parts at the same
+    path. Files are compared by size and content digest, and digests are
+    computed at most once per file while the index is alive.
+    """
+
+    def __init__(self) -> None:
+        self._part_names: List[str] = []
+        self._entries: Dict[str, List[Tuple[str, _Entry]]] = {}
+        self._digests: _Digests = {}
+
+    def add(
+        self, part_name: str, install_dir: str, paths: Iterable[str]
+    ) -> Optional[Tuple[str, List[str]]]:
+        """Add the paths of a part, checking them for collisions.
+
+        :param str part_name: the name of the part.
+        :param str install_dir: the directory holding the files of the part.
+        :param paths: the paths of the part, relative to install_dir.
+        :returns: the name of the first part added before which has paths
+                  colliding with this part and the colliding paths, or None.
+        """
+        conflicts: Dict[str, List[str]] = {}
+        for path in paths:
+            entry = _Entry(os.path.join(install_dir, path), self._digests)
+            other_entries = self._entries.setdefault(path, [])
+            for other_part_name, other_entry in other_entries:
+                if _entries_collide(entry, other_entry):
+                    conflicts.setdefault(other_part_name, []).append(path)
+            other_entries.append((part_name, entry))
+        self._part_names.append(part_name)
+
+        for other_part_name in self._part_names:
+            if other_part_name in conflicts:
+                return other_part_name, conflicts[other_part_name]
+        return None
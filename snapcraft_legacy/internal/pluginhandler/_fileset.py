@@ -0,0 +1,315 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Matching of stage and prime filesets against the files of a part."""
+
+import fnmatch
+import functools
+import os
+import re
+from glob import iglob
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+_MAGIC_CHECK = re.compile("[*?[]")
+
+
+def _has_magic(pattern: str) -> bool:
+    return _MAGIC_CHECK.search(pattern) is not None
+
+
+def _is_hidden(name: str) -> bool:
+    return name[0] == "."
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str) -> Callable[[str], Optional[re.Match]]:
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+class _Listing(NamedTuple):
+    """The entries of a directory, as listed by os.scandir."""
+
+    names: List[str]
+    # Entries which are directories, following symlinks.
+    dirs: FrozenSet[str]
+    symlinks: FrozenSet[str]
+
+
+_EMPTY_LISTING = _Listing([], frozenset(), frozenset())
+
+
+class FilesetMatcher:
+    """Expand fileset patterns against the files of a directory.
+
+    Patterns are expanded as glob.iglob(pattern, recursive=True) and
+    directories as os.walk would, but every directory is only listed once
+    with os.scandir, however many patterns and expansions visit it.
+
+    :param str directory: the directory holding the files.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._listings: Dict[str, _Listing] = {}
+        self._walked: Set[str] = set()
+
+    def _listdir(self, path: str) -> _Listing:
+        path = path or os.curdir
+        listing = self._listings.get(path)
+        if listing is not None:
+            return listing
+
+        names = []
+        dirs = set()
+        symlinks = set()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    names.append(entry.name)
+                    try:
+                        if entry.is_dir():
+                            dirs.add(entry.name)
+                        if entry.is_symlink():
+                            symlinks.add(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            listing = _EMPTY_LISTING
+        else:
+            listing = _Listing(names, frozenset(dirs), frozenset(symlinks))
+
+        self._listings[path] = listing
+        return listing
+
+    def _lexists(self, dirname: str, basename: str) -> bool:
+        if basename not in (os.curdir, os.pardir) and os.sep not in basename:
+            listing = self._listdir(dirname)
+            if listing is not _EMPTY_LISTING:
+                return basename in listing.names
+        return os.path.lexists(os.path.join(dirname, basename))
+
+    def is_real_dir(self, path: str) -> bool:
+        """Check if path is a directory and not a symlink."""
+        dirname, basename = os.path.split(path)
+        if basename and basename not in (os.curdir, os.pardir):
+            listing = self._listdir(dirname)
+            if listing is not _EMPTY_LISTING:
+                return basename in listing.dirs and basename not in listing.symlinks
+        return os.path.isdir(path) and not os.path.islink(path)
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """Expand pattern relative to directory, as glob.iglob would."""
+        pathname = os.path.join(self.directory, pattern)
+        if _has_magic(self.directory):
+            yield from iglob(pathname, recursive=True)
+            return
+
+        matches = self._iglob(pathname, False)
+        if pathname[:2] == "**":
+            # Like glob, skip the empty match for the current directory.
+            first = next(matches, "")
+            if first:
+                yield first
+        yield from matches
+
+    def _iglob(self, pathname: str, dironly: bool) -> Iterator[str]:
+        dirname, basename = os.path.split(pathname)
+        if not _has_magic(pathname):
+            if basename:
+                if self._lexists(dirname, basename):
+                    yield pathname
+            elif os.path.isdir(dirname):
+                yield pathname
+            return
+
+        if dirname != pathname and _has_magic(dirname):
+            dirs: Iterable[str] = self._iglob(dirname, True)
+        else:
+            dirs = [dirname]
+
+        if basename == "**":
+            glob_in_dir = self._glob2
+        elif _has_magic(basename):
+            glob_in_dir = self._glob1
+        else:
+            glob_in_dir = self._glob0
+
+        for dirname in dirs:
+            for name in glob_in_dir(dirname, basename, dironly):
+                yield os.path.join(dirname, name)
+
+    def _glob0(self, dirname: str, basename: str, dironly: bool) -> List[str]:
+        if not basename:
+            if os.path.isdir(dirname):
+                return [basename]
+        elif self._lexists(dirname, basename):
+            return [basename]
+        return []
+
+    def _glob1(self, dirname: str, pattern: str, dironly: bool) -> Iterator[str]:
+        listing = self._listdir(dirname)
+        names: Iterable[str] = listing.names
+        if dironly:
+            names = (x for x in names if x in listing.dirs)
+        if not _is_hidden(pattern):
+            names = (x for x in names if not _is_hidden(x))
+        match = _compile(pattern)
+        return (x for x in names if match(x))
+
+    def _glob2(self, dirname: str, pattern: str, dironly: bool) -> Iterator[str]:
+        yield pattern[:0]
+        yield from self._rlistdir(dirname, dironly)
+
+    def _rlistdir(self, dirname: str, dironly: bool) -> Iterator[str]:
+        listing = self._listdir(dirname)
+        for name in listing.names:
+            if dironly and name not in listing.dirs:
+                continue
+            if _is_hidden(name):
+                continue
+            yield name
+            if name in listing.dirs:
+                path = os.path.join(dirname, name)
+                for child in self._rlistdir(path, dironly):
+                    yield os.path.join(name, child)
+
+    def walk(self, top: str) -> Iterator[str]:
+        """Get the paths below top relative to directory, as os.walk would.
+
+        Directories already walked are skipped, as their paths were
+        returned before.
+        """
+        relpath = os.path.relpath(top, self.directory)
+        if relpath in self._walked:
+            return
+        self._walked.add(relpath)
+
+        listing = self._listdir(top)
+        for name in listing.names:
+            yield name if relpath == os.curdir else os.path.join(relpath, name)
+        for name in listing.dirs - listing.symlinks:
+            yield from self.walk(os.path.join(top, name))
+
+
+def _is_excluded(path: str, exclude_dirs: Set[str]) -> bool:
+    index = path.find("/")
+    while index != -1:
+        if path[:index] in exclude_dirs:
+            return True
+        index = path.find("/", index + 1)
+    return False
+
+
+def get_migratable_filesets(
+    includes: List[str], excludes: List[str], srcdir: str
+) -> Tuple[Set[str], Set[str]]:
+    """Get the files and directories of srcdir selected by a fileset.
+
+    :param list includes: the patterns of the files to include.
+    :param list excludes: the patterns of the files to exclude.
+    :param str srcdir: the directory holding the files.
+    :returns: the resolved files and directories, relative to srcdir.
+    """
+    matcher = FilesetMatcher(srcdir)
+
+    include_files = set()
+    for include in includes:
+        if "*" in include:
+            matches = matcher.glob(include)
+        else:
+            matches = iter([os.path.join(srcdir, include)])
+        for match in matches:
+            include_files.add(os.path.relpath(match, srcdir))
+            # Expand directories, so that an exclude like '*/*.so' will
+            # still match files from an include like 'lib'.
+            if os.path.isdir(match) and not os.path.islink(match):
+                include_files.update(matcher.walk(match))
+
+    exclude_files = set()
+    exclude_dirs = set()
+    for exclude in excludes:
+        for match in matcher.glob(exclude):
+            relpath = os.path.relpath(match, srcdir)
+            exclude_files.add(relpath)
+            if os.path.isdir(match):
+                exclude_dirs.add(relpath)
+
+    # Chop files, including whole trees if any dirs are mentioned.
+    snap_files = set(
+        x
+        for x in include_files - exclude_files
+        if not _is_excluded(x, exclude_dirs)
+    )
+
+    # Separate dirs from files.
+    snap_dirs = set(
+        x for x in snap_files if matcher.is_real_dir(os.path.join(srcdir, x))
+    )
+    snap_files -= snap_dirs
+
+    resolve = _PathResolver(srcdir)
+
+    # Include (resolved) parent directories for each selected file.
+    resolved_snap_files = set()
+    parent_dirs: Set[str] = set()
+    for snap_file in snap_files:
+        snap_file = resolve(snap_file)
+        resolved_snap_files.add(snap_file)
+        dirname = os.path.dirname(snap_file)
+        # The parents of a directory added before were added with it.
+        while dirname and dirname not in parent_dirs:
+            parent_dirs.add(dirname)
+            dirname = os.path.dirname(dirname)
+    snap_dirs |= parent_dirs
+
+    # Resolve parent paths for dirs.
+    resolved_snap_dirs = set(resolve(snap_dir) for snap_dir in snap_dirs)
+
+    return resolved_snap_files, resolved_snap_dirs
+
+
+class _PathResolver:
+    """Resolve paths as file_utils.get_resolved_relative_path.
+
+    Parent directories are only resolved once.
+    """
+
+    def __init__(self, base_directory: str) -> None:
+        self._base_directory = base_directory
+        self._parents: Dict[str, str] = {}
+
+    def __call__(self, relative_path: str) -> str:
+        parent_relpath, filename = os.path.split(relative_path)
+        parent_abspath = self._parents.get(parent_relpath)
+        if parent_abspath is None:
+            parent_abspath = os.path.realpath(
+                os.path.join(self._base_directory, parent_relpath)
+            )
+            self._parents[parent_relpath] = parent_abspath
+
+        filename_abspath = os.path.join(parent_abspath, filename)
+        return os.path.relpath(filename_abspath, self._base_directory)
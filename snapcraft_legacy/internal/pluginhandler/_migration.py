@@ -0,0 +1,192 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Migration of the files of a part to the stage and prime directories."""
+
+import concurrent.futures
+import os
+import shutil
+import stat
+from typing import Callable, Iterable, List, Optional
+
+from snapcraft_legacy import file_utils
+
+# Files are linked by batches, to keep the overhead of the thread pool low
+# when migrating many small files.
+_BATCH_SIZE = 256
+
+_LINKED = "linked"
+_COPIED = "copied"
+_SKIPPED = "skipped"
+
+
+class MigrationCounters:
+    """The number of directories and files handled by a migration."""
+
+    def __init__(self) -> None:
+        self.directories = 0
+        self.linked = 0
+        self.copied = 0
+        self.skipped = 0
+        self.fixed = 0
+
+    def __str__(self) -> str:
+        return (
+            "{} directories, {} files linked, {} copied, {} skipped, "
+            "{} fixed".format(
+                self.directories, self.linked, self.copied, self.skipped, self.fixed
+            )
+        )
+
+
+def _migrate_file(
+    src: str, dst: str, *, missing_ok: bool, follow_symlinks: bool
+) -> str:
+    if missing_ok and not os.path.exists(src):
+        return _SKIPPED
+
+    try:
+        dst_mode: Optional[int] = os.lstat(dst).st_mode
+    except FileNotFoundError:
+        dst_mode = None
+
+    if dst_mode is not None:
+        # If the file is already here and it's a symlink, leave it alone.
+        if stat.S_ISLNK(dst_mode):
+            return _SKIPPED
+        # Otherwise, remove and re-link it.
+        os.remove(dst)
+
+    if src.endswith(".pc"):
+        # pkg-config files are fixed up in place, so they are never linked.
+        shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+        return _COPIED
+    if file_utils.link_or_copy(src, dst, follow_symlinks=follow_symlinks):
+        return _LINKED
+    return _COPIED
+
+
+def _migrate_batch(
+    batch: List[str],
+    srcdir: str,
+    dstdir: str,
+    *,
+    missing_ok: bool,
+    follow_symlinks: bool,
+) -> List[str]:
+    return [
+        _migrate_file(
+            os.path.join(srcdir, snap_file),
+            os.path.join(dstdir, snap_file),
+            missing_ok=missing_ok,
+            follow_symlinks=follow_symlinks,
+        )
+        for snap_file in batch
+    ]
+
+
+def _get_batches(snap_files: Iterable[str]) -> List[List[str]]:
+    sorted_files = sorted(snap_files)
+    return [
+        sorted_files[i : i + _BATCH_SIZE]
+        for i in range(0, len(sorted_files), _BATCH_SIZE)
+    ]
+
+
+def _count_results(
+    counters: MigrationCounters, batch: List[str], results: List[str]
+) -> List[str]:
+    """Count the results of a batch, returning the files it migrated."""
+    migrated_files = []
+    for snap_file, result in zip(batch, results):
+        if result == _LINKED:
+            counters.linked += 1
+        elif result == _COPIED:
+            counters.copied += 1
+        else:
+            counters.skipped += 1
+            continue
+        migrated_files.append(snap_file)
+    return migrated_files
+
+
+def migrate_files(  # noqa: PLR0913 (too many arguments)
+    snap_files: Iterable[str],
+    snap_dirs: Iterable[str],
+    srcdir: str,
+    dstdir: str,
+    *,
+    missing_ok: bool = False,
+    follow_symlinks: bool = False,
+    fixup_func: Callable[[str], Optional[bool]] = lambda *args: None,
+    max_workers: Optional[int] = None,
+) -> MigrationCounters:
+    """Hard-link or copy files and directories from srcdir to dstdir.
+
+    Directories are created first, then files are linked from a thread
+    pool. Files are only fixed up once all of them are migrated, one at a
+    time, as fixups may not be thread safe.
+
+    :param snap_files: the files to migrate, relative to srcdir.
+    :param snap_dirs: the directories to migrate, relative to srcdir.
+    :param str srcdir: the directory to migrate from.
+    :param str dstdir: the directory to migrate to.
+    :param bool missing_ok: whether missing files are skipped.
+    :param bool follow_symlinks: whether symlinks are followed.
+    :param fixup_func: called with each migrated file, returning True if
+                       the file was modified.
+    :param int max_workers: the number of files migrated at once, defaults
+                            to the number of CPUs.
+    :returns: the counters of the migration.
+    """
+    counters = MigrationCounters()
+
+    for snap_dir in sorted(snap_dirs):
+        file_utils.create_similar_directory(
+            os.path.join(srcdir, snap_dir), os.path.join(dstdir, snap_dir)
+        )
+        counters.directories += 1
+
+    batches = _get_batches(snap_files)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(batches)))
+
+    migrated_files: List[str] = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _migrate_batch,
+                batch,
+                srcdir,
+                dstdir,
+                missing_ok=missing_ok,
+                follow_symlinks=follow_symlinks,
+            )
+            for batch in batches
+        ]
+        try:
+            for batch, future in zip(batches, futures):
+                migrated_files.extend(_count_results(counters, batch, future.result()))
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+    for snap_file in migrated_files:
+        if fixup_func(os.path.join(dstdir, snap_file)):
+            counters.fixed += 1
+
+    return counters
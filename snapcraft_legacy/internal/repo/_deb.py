@@ -14,17 +14,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import concurrent.futures
 import fileinput
 import functools
 import logging
 import os
 import pathlib
 import re
+import shutil
 import subprocess
 import sys
+import tarfile
 import tempfile
 from typing import Dict, List, Optional, Sequence, Set, Tuple  # noqa: F401
 
+import debian.arfile
+import debian.deb822
 from xdg import BaseDirectory
 
 from snapcraft_legacy import file_utils
@@ -38,6 +43,13 @@ if sys.platform == "linux":
     # Ensure importing works on non-Linux.
     from .apt_cache import AptCache
 
+try:
+    # Decompress zstd compressed debs in-process if possible, dpkg-deb is
+    # used otherwise.
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 _DEB_CACHE_DIR: pathlib.Path = pathlib.Path(
@@ -511,20 +523,47 @@ class Ubuntu(BaseRepo):
     def unpack_stage_packages(
         cls, *, stage_packages_path: pathlib.Path, install_path: pathlib.Path
     ) -> None:
-        pkg_path = None
+        pkg_paths = sorted(stage_packages_path.glob("*.deb"))
+        if not pkg_paths:
+            return
+
+        max_workers = min(len(pkg_paths), os.cpu_count() or 1)
+        with (
+            tempfile.TemporaryDirectory(suffix="deb-extract") as extract_root,
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor,
+        ):
+            futures = [
+                executor.submit(
+                    cls._unpack_deb, pkg_path, os.path.join(extract_root, str(index))
+                )
+                for index, pkg_path in enumerate(pkg_paths)
+            ]
+            try:
+                # Stage files in package name order as extractions complete, so
+                # files shipped by several packages always come from the same one.
+                for future in futures:
+                    extract_dir = future.result()
+                    file_utils.link_or_copy_tree(extract_dir, install_path.as_posix())
+                    shutil.rmtree(extract_dir)
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+
+        cls.normalize(str(install_path))
 
-        for pkg_path in stage_packages_path.glob("*.deb"):
-            with tempfile.TemporaryDirectory(suffix="deb-extract") as extract_dir:
-                # Extract deb package.
-                cls._extract_deb(pkg_path, extract_dir)
-                # Mark source of files.
-                marked_name = cls._extract_deb_name_version(pkg_path)
-                cls._mark_origin_stage_package(extract_dir, marked_name)
-                # Stage files to install_dir.
-                file_utils.link_or_copy_tree(extract_dir, install_path.as_posix())
+    @classmethod
+    def _unpack_deb(cls, deb_path: pathlib.Path, extract_dir: str) -> str:
+        """Extract deb_path to extract_dir and mark the origin of its files."""
+        os.makedirs(extract_dir)
 
-        if pkg_path:
-            cls.normalize(str(install_path))
+        marked_name = _extract_deb_in_process(deb_path, extract_dir)
+        if marked_name is None:
+            # Use dpkg-deb for compression formats not supported in-process.
+            cls._extract_deb(deb_path, extract_dir)
+            marked_name = cls._extract_deb_name_version(deb_path)
+
+        cls._mark_origin_stage_package(extract_dir, marked_name)
+        return extract_dir
 
     @classmethod
     def build_package_is_valid(cls, package_name) -> bool:
@@ -562,3 +601,80 @@ class Ubuntu(BaseRepo):
             subprocess.check_call(["dpkg-deb", "--extract", deb_path, extract_dir])
         except subprocess.CalledProcessError:
             raise errors.UnpackError(deb_path)
+
+
+def _open_deb_tarball(
+    deb_ar: debian.arfile.ArFile, member_name: str
+) -> Optional[tarfile.TarFile]:
+    """Open member_name as a tarball for streamed reading, if supported."""
+    member = deb_ar.getmember(member_name)
+    extension = pathlib.PurePath(member_name).suffix
+    if extension in ("", ".tar", ".gz", ".xz", ".bz2"):
+        return tarfile.open(fileobj=member, mode="r|*")
+    if extension == ".zst" and zstandard is not None:
+        reader = zstandard.ZstdDecompressor().stream_reader(member)
+        return tarfile.open(fileobj=reader, mode="r|")
+    return None
+
+
+def _is_within_directory(directory: str, path: str) -> bool:
+    """Return True if path, relative to directory, resolves inside of it."""
+    directory = os.path.realpath(directory)
+    target = os.path.realpath(os.path.join(directory, path.lstrip("/")))
+    return os.path.commonpath([directory, target]) == directory
+
+
+def _extract_data_tarball(
+    data_tar: tarfile.TarFile, extract_dir: str, deb_path: pathlib.Path
+) -> None:
+    # Debs ship absolute symlinks, which the "data" filter (the default
+    # from Python 3.14) rejects, while the "tar" filter keeps them and
+    # still refuses members extracted outside of extract_dir.
+    if hasattr(tarfile, "tar_filter"):
+        data_tar.extractall(extract_dir, filter="tar")
+        return
+
+    for tar_info in data_tar:
+        if not _is_within_directory(extract_dir, tar_info.name):
+            raise errors.UnpackError(deb_path)
+        data_tar.extract(tar_info, extract_dir)
+
+
+def _extract_deb_in_process(deb_path: pathlib.Path, extract_dir: str) -> Optional[str]:
+    """Extract deb_path to extract_dir without running dpkg-deb.
+
+    :returns: `<package-name>=<version>`, or None if the deb uses a compression
+        format that cannot be read in-process, in which case nothing is extracted.
+    """
+    try:
+        # Importing DebFile causes LP: #1731478 when snapcraft is
+        # run as a snap.
+        deb_ar = debian.arfile.ArFile(str(deb_path))
+        names = deb_ar.getnames()
+        control_names = [n for n in names if n.startswith("control.tar")]
+        data_names = [n for n in names if n.startswith("data.tar")]
+        if len(control_names) != 1 or len(data_names) != 1:
+            raise errors.UnpackError(deb_path)
+
+        control_tar = _open_deb_tarball(deb_ar, control_names[0])
+        if control_tar is None:
+            return None
+        with control_tar:
+            control = None
+            for tar_info in control_tar:
+                if tar_info.isfile() and os.path.normpath(tar_info.name) == "control":
+                    control = debian.deb822.Deb822(control_tar.extractfile(tar_info))
+                    break
+        if control is None or "Package" not in control or "Version" not in control:
+            raise errors.UnpackError(deb_path)
+
+        data_tar = _open_deb_tarball(deb_ar, data_names[0])
+        if data_tar is None:
+            return None
+        with data_tar:
+            _extract_data_tarball(data_tar, extract_dir, deb_path)
+    except (debian.arfile.ArError, tarfile.TarError, OSError, EOFError) as error:
+        logger.debug(f"Cannot extract {str(deb_path)!r}: {error}")
+        raise errors.UnpackError(deb_path)
+
+    return f"{control['Package']}={control['Version']}"
@@ -13,6 +13,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import hashlib
 import os
 import shutil
 import subprocess
@@ -21,6 +22,7 @@ import sys
 import requests
 
 import snapcraft_legacy.internal.common
+from snapcraft_legacy import file_utils
 from snapcraft_legacy.internal.cache import FileCache
 from snapcraft_legacy.internal.indicators import (
     download_requests_stream,
@@ -75,6 +77,12 @@ class Base:
             raise RuntimeError("source must be checked before it's updated")
         self._update()
 
+    def record(self, target: str) -> None:
+        """Record the pulled sources, to later check them against target.
+
+        :param str target: Path to target file, created once pulled.
+        """
+
     def _check(self, target: str):
         """Check if pulled sources have changed since target was created.
 
@@ -104,6 +112,10 @@ class Base:
 
 
 class FileBase(Base):
+    # Sources modifying the downloaded file in place must not hard-link it
+    # to the cached file.
+    _link_cached_files = True
+
     def pull(self):
         source_file = None
         is_source_url = snapcraft_legacy.internal.common.isurl(self.source)
@@ -122,8 +134,9 @@ class FileBase(Base):
             except FileNotFoundError as exc:
                 raise errors.SnapcraftSourceNotFoundError(self.source) from exc
 
-        # Verify before provisioning
-        if self.source_checksum:
+        # Verify before provisioning, downloads are verified as they are
+        # downloaded or stored in the cache.
+        if self.source_checksum and not is_source_url:
             verify_checksum(self.source_checksum, source_file)
 
         # We finally provision, but we don't clean the target so override-pull
@@ -138,18 +151,25 @@ class FileBase(Base):
 
         # First check if we already have the source file cached.
         file_cache = FileCache()
+        hasher = None
         if self.source_checksum:
             algorithm, hash = split_checksum(self.source_checksum)
             cache_file = file_cache.get(algorithm=algorithm, hash=hash)
             if cache_file:
                 # We make this copy as the provisioning logic can delete
-                # this file and we don't want that.
-                shutil.copy2(cache_file, self.file)
+                # this file and we don't want that. Cached files are
+                # read-only, so this does not need to copy their data.
+                file_utils.clone_link_or_copy(
+                    cache_file, self.file, allow_link=self._link_cached_files
+                )
                 return self.file
+            # This will raise an AttributeError if algorithm is unsupported
+            hasher = getattr(hashlib, algorithm)()
 
         # If not we download and store
         if snapcraft_legacy.internal.common.get_url_scheme(self.source) == "ftp":
             download_urllib_source(self.source, self.file)
+            hasher = None
         else:
             try:
                 request = requests.get(self.source, stream=True, allow_redirects=True)
@@ -157,11 +177,22 @@ class FileBase(Base):
             except requests.exceptions.RequestException as e:
                 raise errors.SnapcraftRequestError(message=e)
 
-            download_requests_stream(request, self.file)
+            if hasher is None:
+                download_requests_stream(request, self.file)
+            else:
+                download_requests_stream(request, self.file, hasher=hasher)
 
         # We verify the file if source_checksum is defined
         # and we cache the file for future reuse.
         if self.source_checksum:
-            algorithm, digest = verify_checksum(self.source_checksum, self.file)
-            file_cache.cache(filename=self.file, algorithm=algorithm, hash=hash)
+            calculated_digest = hasher.hexdigest() if hasher else None
+            algorithm, digest = verify_checksum(
+                self.source_checksum, self.file, calculated_digest=calculated_digest
+            )
+            file_cache.cache(
+                filename=self.file,
+                algorithm=algorithm,
+                hash=hash,
+                calculated_hash=digest,
+            )
         return self.file
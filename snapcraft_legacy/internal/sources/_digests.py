@@ -0,0 +1,256 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Content digests of source trees, to tell modified from touched files.
+
+A DigestTree records the sha256 digest of every file of a tree, and of
+every directory as the digest of the names and digests of its entries
+(a Merkle tree). Files are only read when their stat information differs
+from the tree they are compared with, so that recomputing the tree of a
+mostly unchanged source only hashes the modified files.
+"""
+
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+from craft_application.util import strtobool
+
+logger = logging.getLogger(__name__)
+
+# Set to a true value to compare local sources by contents rather than
+# by modification times.
+CONTENT_DIGESTS_ENVIRONMENT_VARIABLE = "SNAPCRAFT_CONTENT_DIGESTS"
+
+_FORMAT = 2
+_READ_SIZE = 1024 * 1024
+
+_StatKey = Tuple[int, int, int, int, int]
+
+
+def content_digests_enabled() -> bool:
+    """Check if sources are to be compared by content digests."""
+    return strtobool(os.getenv(CONTENT_DIGESTS_ENVIRONMENT_VARIABLE, "n")) == 1
+
+
+def get_digests_file(target: str) -> str:
+    """Get the file recording the digests of sources pulled with target."""
+    return target + ".digests"
+
+
+def _get_stat_key(stat_result: os.stat_result) -> _StatKey:
+    # As with git, the change time catches files rewritten in place with
+    # their size and modification time restored.
+    return (
+        stat_result.st_mode,
+        stat_result.st_size,
+        stat_result.st_mtime_ns,
+        stat_result.st_ctime_ns,
+        stat_result.st_ino,
+    )
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _get_depth(relpath: str) -> int:
+    if relpath == os.curdir:
+        return 0
+    return relpath.count(os.sep) + 1
+
+
+def _hash_entries(entries: List[Tuple[str, str]]) -> str:
+    hasher = hashlib.sha256()
+    for name, digest in sorted(entries):
+        hasher.update(name.encode("utf-8", "surrogateescape"))
+        hasher.update(b"\0")
+        hasher.update(digest.encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class DigestTree:
+    """The content digests of the files and directories of a tree.
+
+    :param dict files: the stat key and digest of each file, by path.
+    :param dict directories: the digest of each directory, by path.
+    :param int target_mtime_ns: the modification time of the target the
+                                tree was recorded for.
+    """
+
+    def __init__(
+        self,
+        *,
+        files: Dict[str, Tuple[_StatKey, str]],
+        directories: Dict[str, str],
+        target_mtime_ns: Optional[int] = None,
+    ) -> None:
+        self.files = files
+        self.directories = directories
+        self.target_mtime_ns = target_mtime_ns
+
+    def get_digest(self, path: str) -> Optional[str]:
+        """Get the digest of a file or directory of the tree."""
+        if path in self.files:
+            return self.files[path][1]
+        return self.directories.get(path)
+
+    def save(self, path: str) -> None:
+        """Write the tree to path, atomically replacing it."""
+        data = {
+            "format": _FORMAT,
+            "target-mtime-ns": self.target_mtime_ns,
+            "files": {
+                name: [list(key), digest] for name, (key, digest) in self.files.items()
+            },
+            "directories": self.directories,
+        }
+        temp_fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(path) or os.curdir)
+        try:
+            with os.fdopen(temp_fd, "w") as f:
+                json.dump(data, f)
+            os.replace(temp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["DigestTree"]:
+        """Read a tree saved to path, None if missing or invalid."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("format") != _FORMAT:
+                return None
+            return cls(
+                files={
+                    name: (tuple(key), digest)  # type: ignore
+                    for name, (key, digest) in data["files"].items()
+                },
+                directories=data["directories"],
+                target_mtime_ns=data["target-mtime-ns"],
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            logger.debug("Ignoring source digests {!r}: {}".format(path, error))
+            return None
+
+
+def compute_tree(
+    root: str,
+    *,
+    ignore: Callable[..., List[str]],
+    previous: Optional[DigestTree] = None,
+    max_workers: Optional[int] = None,
+) -> DigestTree:
+    """Compute the digests of the files and directories under root.
+
+    Symlinks are recorded by their target and are not followed. The files
+    with the same stat information as in previous reuse their digest, the
+    others are hashed from a thread pool.
+
+    :param str root: the directory to compute the digests of.
+    :param ignore: the ignore function of the source, called as
+                   ignore(directory, names, check=True).
+    :param DigestTree previous: a tree computed before for root.
+    :param int max_workers: the number of files hashed at once, defaults
+                            to the number of CPUs.
+    """
+    files: Dict[str, Tuple[_StatKey, str]] = {}
+    to_hash: Dict[str, _StatKey] = {}
+    children: Dict[str, List[str]] = {}
+
+    for directory, dirnames, filenames in os.walk(root, topdown=True):
+        ignored = set(ignore(directory, dirnames + filenames, check=True))
+        dirnames[:] = sorted(d for d in dirnames if d not in ignored)
+        reldir = os.path.relpath(directory, root)
+        names = children[reldir] = []
+
+        for name in sorted(set(dirnames + filenames) - ignored):
+            path = os.path.join(directory, name)
+            relpath = os.path.normpath(os.path.join(reldir, name))
+            stat_result = os.lstat(path)
+            names.append(name)
+            if stat.S_ISDIR(stat_result.st_mode):
+                continue
+
+            key = _get_stat_key(stat_result)
+            previous_file = previous.files.get(relpath) if previous else None
+            if previous_file is not None and previous_file[0] == key:
+                files[relpath] = previous_file
+            elif stat.S_ISLNK(stat_result.st_mode):
+                files[relpath] = (key, "symlink:" + os.readlink(path))
+            elif stat.S_ISREG(stat_result.st_mode):
+                to_hash[relpath] = key
+            else:
+                files[relpath] = (key, "special:{:o}".format(stat_result.st_mode))
+
+        # Symlinks to directories are listed as directories by os.walk.
+        dirnames[:] = [
+            d for d in dirnames if not os.path.islink(os.path.join(directory, d))
+        ]
+
+    files.update(_hash_files(root, to_hash, max_workers=max_workers))
+
+    return DigestTree(files=files, directories=_hash_directories(children, files))
+
+
+def _hash_files(
+    root: str, to_hash: Dict[str, _StatKey], *, max_workers: Optional[int]
+) -> Dict[str, Tuple[_StatKey, str]]:
+    if not to_hash:
+        return {}
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(to_hash)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = executor.map(
+            _hash_file, [os.path.join(root, relpath) for relpath in to_hash]
+        )
+        return {
+            relpath: (key, digest)
+            for (relpath, key), digest in zip(to_hash.items(), digests)
+        }
+
+
+def _hash_directories(
+    children: Dict[str, List[str]], files: Dict[str, Tuple[_StatKey, str]]
+) -> Dict[str, str]:
+    # Directories are hashed after their subdirectories.
+    directories: Dict[str, str] = {}
+    for reldir in sorted(children, key=_get_depth, reverse=True):
+        entries = []
+        for name in children[reldir]:
+            relpath = os.path.normpath(os.path.join(reldir, name))
+            if relpath in files:
+                entries.append((name, files[relpath][1]))
+            else:
+                # Directories which could not be listed have no digest.
+                entries.append((name, directories.get(relpath, "")))
+        directories[reldir] = _hash_entries(entries)
+    return directories
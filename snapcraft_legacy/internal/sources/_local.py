@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import contextlib
 import copy
 import functools
 import glob
@@ -22,6 +23,7 @@ import os
 from snapcraft_legacy import file_utils
 from snapcraft_legacy.internal import common
 
+from . import _digests
 from ._base import Base
 
 
@@ -47,6 +49,17 @@ class Local(Base):
         except FileNotFoundError:
             return False
 
+        self._find_updated_paths(target_mtime)
+
+        if (
+            self._updated_files or self._updated_directories
+        ) and _digests.content_digests_enabled():
+            self._discard_unmodified(target)
+
+        return len(self._updated_files) > 0 or len(self._updated_directories) > 0
+
+    def _find_updated_paths(self, target_mtime):
+        """Find the paths modified since target_mtime."""
         self._updated_files = set()
         self._updated_directories = set()
 
@@ -77,7 +90,48 @@ class Local(Base):
                     else:
                         self._updated_directories.add(relpath)
 
-        return len(self._updated_files) > 0 or len(self._updated_directories) > 0
+    def _discard_unmodified(self, target):
+        """Discard the updated paths with the contents recorded at pull time."""
+        digests_file = _digests.get_digests_file(target)
+        recorded = _digests.DigestTree.load(digests_file)
+        if recorded is None or recorded.target_mtime_ns != os.lstat(target).st_mtime_ns:
+            return
+
+        current = _digests.compute_tree(
+            self.source_abspath, ignore=self._ignore, previous=recorded
+        )
+        self._updated_files = {
+            path
+            for path in self._updated_files
+            if current.get_digest(path) != recorded.get_digest(path)
+        }
+        self._updated_directories = {
+            path
+            for path in self._updated_directories
+            if current.get_digest(path) != recorded.get_digest(path)
+        }
+
+        if not self._updated_files and not self._updated_directories:
+            # Keep the stat information of the touched files, so that they
+            # are not hashed again on the next check.
+            current.target_mtime_ns = recorded.target_mtime_ns
+            with contextlib.suppress(OSError):
+                current.save(digests_file)
+
+    def record(self, target):
+        digests_file = _digests.get_digests_file(target)
+        if not _digests.content_digests_enabled():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(digests_file)
+            return
+
+        tree = _digests.compute_tree(
+            self.source_abspath,
+            ignore=self._ignore,
+            previous=_digests.DigestTree.load(digests_file),
+        )
+        tree.target_mtime_ns = os.lstat(target).st_mtime_ns
+        tree.save(digests_file)
 
     def _update(self):
         # First, copy the directories
@@ -43,6 +43,9 @@ class Script(FileBase):
             source_submodules,
         )
 
+    # The downloaded script is made executable in place.
+    _link_cached_files = False
+
     def download(self, filepath: str = None) -> str:
         filepath = super().download(filepath=filepath)
         st = os.stat(self.file)
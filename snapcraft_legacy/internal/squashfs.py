@@ -0,0 +1,422 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Read files from squashfs images, such as snaps, without extracting them."""
+
+import errno
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Tuple, Type, Union
+
+try:
+    # Decompressors for the compression algorithms not supported by the
+    # standard library, images using them are read with unsquashfs otherwise.
+    import lz4.block
+except ImportError:
+    lz4 = None  # type: ignore
+try:
+    import lzo
+except ImportError:
+    lzo = None  # type: ignore
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+_MAGIC = 0x73717368
+
+# magic, inode count, modification time, block size, fragment count,
+# compression, block log, flags, id count, major, minor, root inode,
+# bytes used, id table, xattr table, inode table, directory table,
+# fragment table and export table.
+_SUPERBLOCK = struct.Struct("<IIIIIHHHHHHQQQQQQQQ")
+
+_COMPRESSION_GZIP = 1
+_COMPRESSION_LZMA = 2
+_COMPRESSION_LZO = 3
+_COMPRESSION_XZ = 4
+_COMPRESSION_LZ4 = 5
+_COMPRESSION_ZSTD = 6
+
+_METADATA_SIZE = 8192
+_METADATA_UNCOMPRESSED = 0x8000
+_DATA_UNCOMPRESSED = 1 << 24
+_NO_FRAGMENT = 0xFFFFFFFF
+_FRAGMENTS_PER_BLOCK = 512
+
+_INODE_HEADER = struct.Struct("<HHHHII")
+_BASIC_DIRECTORY = 1
+_BASIC_FILE = 2
+_BASIC_SYMLINK = 3
+_EXTENDED_DIRECTORY = 8
+_EXTENDED_FILE = 9
+_EXTENDED_SYMLINK = 10
+
+_MAX_SYMLINKS = 40
+
+
+class SquashFsError(Exception):
+    """The squashfs image cannot be read."""
+
+
+class UnsupportedSquashFsError(SquashFsError):
+    """The squashfs image uses features this reader does not support."""
+
+
+class _Directory(NamedTuple):
+    start: int
+    offset: int
+    size: int
+
+
+class _File(NamedTuple):
+    blocks_start: int
+    size: int
+    fragment: int
+    fragment_offset: int
+    block_sizes: Tuple[int, ...]
+
+
+class _Symlink(NamedTuple):
+    target: str
+
+
+_Inode = Union[_Directory, _File, _Symlink]
+
+
+def _get_decompressor(compression: int) -> Callable[[bytes, int], bytes]:
+    decompress, errors = _get_library_decompressor(compression)
+
+    def _decompress(data: bytes, size: int) -> bytes:
+        # Corrupt blocks raise the errors of each library, report them all
+        # as an unreadable image.
+        try:
+            return decompress(data, size)
+        except errors as error:
+            raise SquashFsError(f"cannot decompress block: {error}") from error
+
+    return _decompress
+
+
+def _get_library_decompressor(
+    compression: int,
+) -> Tuple[Callable[[bytes, int], bytes], Tuple[Type[Exception], ...]]:
+    if compression == _COMPRESSION_GZIP:
+        return lambda data, _: zlib.decompress(data), (zlib.error,)
+    if compression == _COMPRESSION_LZMA:
+        return (
+            lambda data, _: lzma.decompress(data, format=lzma.FORMAT_ALONE),
+            (lzma.LZMAError,),
+        )
+    if compression == _COMPRESSION_XZ:
+        return (
+            lambda data, _: lzma.decompress(data, format=lzma.FORMAT_XZ),
+            (lzma.LZMAError,),
+        )
+    if compression == _COMPRESSION_LZO and lzo is not None:
+        return lambda data, size: lzo.decompress(data, False, size), (lzo.error,)
+    if compression == _COMPRESSION_LZ4 and lz4 is not None:
+        return (
+            lambda data, size: lz4.block.decompress(data, uncompressed_size=size),
+            (lz4.block.LZ4BlockError,),
+        )
+    if compression == _COMPRESSION_ZSTD and zstandard is not None:
+        return (
+            lambda data, size: zstandard.ZstdDecompressor().decompress(
+                data, max_output_size=size
+            ),
+            (zstandard.ZstdError,),
+        )
+    raise UnsupportedSquashFsError(f"unsupported compression {compression}")
+
+
+class _MetadataReader:
+    """Read consecutive bytes from a chain of metadata blocks."""
+
+    def __init__(self, image: "SquashFsReader", position: int, offset: int) -> None:
+        self._image = image
+        self._position = position
+        self._offset = offset
+
+    def read(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            block, next_position = self._image._get_metadata_block(self._position)
+            if self._offset >= len(block):
+                raise SquashFsError("metadata offset out of bounds")
+            chunk = block[self._offset : self._offset + size - len(data)]
+            data += chunk
+            self._offset += len(chunk)
+            if self._offset == len(block):
+                self._position = next_position
+                self._offset = 0
+        return data
+
+    def unpack(self, fmt: str) -> Tuple:
+        return struct.unpack(fmt, self.read(struct.calcsize(fmt)))
+
+
+class SquashFsReader:
+    """Read only access to the files in a squashfs 4.0 image.
+
+    The image is memory mapped and only the metadata and data blocks of
+    the requested files are decompressed.
+
+    :param path: the path to the squashfs image.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as image_file:
+            try:
+                self._data = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as error:
+                # Empty files cannot be mapped.
+                raise SquashFsError(str(error)) from error
+
+        try:
+            superblock = _SUPERBLOCK.unpack_from(self._data)
+        except struct.error as error:
+            self.close()
+            raise SquashFsError("not a squashfs image") from error
+
+        if superblock[0] != _MAGIC:
+            self.close()
+            raise SquashFsError("not a squashfs image")
+        if superblock[9] != 4:
+            self.close()
+            raise UnsupportedSquashFsError(
+                f"unsupported version {superblock[9]}.{superblock[10]}"
+            )
+
+        self._block_size = superblock[3]
+        self._root_inode = superblock[11]
+        self._inode_table = superblock[15]
+        self._directory_table = superblock[16]
+        self._fragment_table = superblock[17]
+        try:
+            self._decompress = _get_decompressor(superblock[5])
+        except UnsupportedSquashFsError:
+            self.close()
+            raise
+
+        self._metadata_blocks = dict()  # type: Dict[int, Tuple[bytes, int]]
+        self._fragment_blocks = dict()  # type: Dict[int, bytes]
+
+    def __enter__(self) -> "SquashFsReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._data.close()
+
+    def read_file(self, path: str) -> bytes:
+        """Read the contents of the file at path, following symlinks.
+
+        :param path: the path to the file, relative to the root of the image.
+
+        :returns: the contents of the file.
+        """
+        inode = self._lookup(path)
+        if isinstance(inode, _Directory):
+            raise IsADirectoryError(errno.EISDIR, os.strerror(errno.EISDIR), path)
+        try:
+            return self._read_file_data(inode)
+        except struct.error as error:
+            raise SquashFsError(f"cannot read {path!r}: {error}") from error
+
+    def listdir(self, path: str) -> List[str]:
+        """List the names of the entries of the directory at path.
+
+        :param path: the path to the directory, relative to the root of the image.
+
+        :returns: the sorted names in the directory.
+        """
+        inode = self._lookup(path)
+        if not isinstance(inode, _Directory):
+            raise NotADirectoryError(errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+        try:
+            return sorted(self._read_directory(inode))
+        except struct.error as error:
+            raise SquashFsError(f"cannot list {path!r}: {error}") from error
+
+    def _lookup(self, path: str) -> Union[_Directory, _File]:
+        try:
+            return self._resolve(path)
+        except struct.error as error:
+            raise SquashFsError(f"cannot look up {path!r}: {error}") from error
+
+    def _resolve(self, path: str) -> Union[_Directory, _File]:
+        root = self._read_inode(self._root_inode)
+        if not isinstance(root, _Directory):
+            raise SquashFsError("the root inode is not a directory")
+
+        parents = []  # type: List[_Directory]
+        current = root
+        names = _split_path(path)
+        followed = 0
+        while names:
+            name = names.pop(0)
+            if name == "..":
+                current = parents.pop() if parents else root
+                continue
+            if not isinstance(current, _Directory):
+                raise NotADirectoryError(
+                    errno.ENOTDIR, os.strerror(errno.ENOTDIR), path
+                )
+
+            entries = self._read_directory(current)
+            if name not in entries:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), path)
+
+            inode = self._read_inode(entries[name])
+            if isinstance(inode, _Symlink):
+                followed += 1
+                if followed > _MAX_SYMLINKS:
+                    raise SquashFsError(
+                        f"too many levels of symbolic links in {path!r}"
+                    )
+                # Absolute targets are relative to the root of the image.
+                if inode.target.startswith("/"):
+                    parents = []
+                    current = root
+                names = _split_path(inode.target) + names
+                continue
+
+            parents.append(current)
+            current = inode
+
+        return current  # type: ignore
+
+    def _get_metadata_block(self, position: int) -> Tuple[bytes, int]:
+        if position not in self._metadata_blocks:
+            (header,) = struct.unpack_from("<H", self._data, position)
+            start = position + 2
+            end = start + (header & ~_METADATA_UNCOMPRESSED)
+            block = self._data[start:end]
+            if not header & _METADATA_UNCOMPRESSED:
+                block = self._decompress(block, _METADATA_SIZE)
+            self._metadata_blocks[position] = (block, end)
+        return self._metadata_blocks[position]
+
+    def _read_inode(self, reference: int) -> _Inode:
+        reader = _MetadataReader(
+            self, self._inode_table + (reference >> 16), reference & 0xFFFF
+        )
+        inode_type = _INODE_HEADER.unpack(reader.read(_INODE_HEADER.size))[0]
+
+        if inode_type == _BASIC_DIRECTORY:
+            start, _, size, offset, _ = reader.unpack("<IIHHI")
+            return _Directory(start=start, offset=offset, size=size)
+        if inode_type == _EXTENDED_DIRECTORY:
+            _, size, start, _, _, offset, _ = reader.unpack("<IIIIHHI")
+            return _Directory(start=start, offset=offset, size=size)
+        if inode_type == _BASIC_FILE:
+            blocks_start, fragment, fragment_offset, size = reader.unpack("<IIII")
+        elif inode_type == _EXTENDED_FILE:
+            blocks_start, size, _, _, fragment, fragment_offset, _ = reader.unpack(
+                "<QQQIIII"
+            )
+        elif inode_type in (_BASIC_SYMLINK, _EXTENDED_SYMLINK):
+            _, target_size = reader.unpack("<II")
+            return _Symlink(target=os.fsdecode(reader.read(target_size)))
+        else:
+            raise SquashFsError(f"unsupported inode type {inode_type}")
+
+        if fragment == _NO_FRAGMENT:
+            block_count = -(-size // self._block_size)
+        else:
+            block_count = size // self._block_size
+        return _File(
+            blocks_start=blocks_start,
+            size=size,
+            fragment=fragment,
+            fragment_offset=fragment_offset,
+            block_sizes=reader.unpack(f"<{block_count}I"),
+        )
+
+    def _read_directory(self, inode: _Directory) -> Dict[str, int]:
+        reader = _MetadataReader(
+            self, self._directory_table + inode.start, inode.offset
+        )
+        # The size accounts for the "." and ".." entries, which are not stored.
+        remaining = inode.size - 3
+        entries = dict()  # type: Dict[str, int]
+        while remaining > 0:
+            count, start, _ = reader.unpack("<III")
+            remaining -= 12
+            for _ in range(count + 1):
+                offset, _, _, name_size = reader.unpack("<HhHH")
+                name = os.fsdecode(reader.read(name_size + 1))
+                remaining -= 8 + name_size + 1
+                entries[name] = (start << 16) | offset
+        return entries
+
+    def _read_file_data(self, inode: _File) -> bytes:
+        chunks = []
+        position = inode.blocks_start
+        remaining = inode.size
+        for block_size in inode.block_sizes:
+            expected = min(remaining, self._block_size)
+            disk_size = block_size & ~_DATA_UNCOMPRESSED
+            if disk_size == 0:
+                # A sparse block.
+                chunks.append(bytes(expected))
+            else:
+                block = self._data[position : position + disk_size]
+                if not block_size & _DATA_UNCOMPRESSED:
+                    block = self._decompress(block, self._block_size)
+                chunks.append(block[:expected])
+                position += disk_size
+            remaining -= expected
+
+        if inode.fragment != _NO_FRAGMENT:
+            fragment_block = self._get_fragment_block(inode.fragment)
+            chunks.append(
+                fragment_block[
+                    inode.fragment_offset : inode.fragment_offset + remaining
+                ]
+            )
+
+        data = b"".join(chunks)
+        if len(data) != inode.size:
+            raise SquashFsError("file data is truncated")
+        return data
+
+    def _get_fragment_block(self, index: int) -> bytes:
+        if index not in self._fragment_blocks:
+            (table_position,) = struct.unpack_from(
+                "<Q",
+                self._data,
+                self._fragment_table + 8 * (index // _FRAGMENTS_PER_BLOCK),
+            )
+            reader = _MetadataReader(
+                self, table_position, 16 * (index % _FRAGMENTS_PER_BLOCK)
+            )
+            start, size, _ = reader.unpack("<QII")
+            block = self._data[start : start + (size & ~_DATA_UNCOMPRESSED)]
+            if not size & _DATA_UNCOMPRESSED:
+                block = self._decompress(block, self._block_size)
+            self._fragment_blocks[index] = block
+        return self._fragment_blocks[index]
+
+
+def _split_path(path: str) -> List[str]:
+    return [name for name in path.split("/") if name not in ("", ".")]
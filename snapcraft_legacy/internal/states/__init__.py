@@ -22,3 +22,5 @@ from snapcraft_legacy.internal.states._stage_state import StageState  # noqa
 from snapcraft_legacy.internal.states._state import PartState  # noqa
 from snapcraft_legacy.internal.states._state import get_state  # noqa
 from snapcraft_legacy.internal.states._state import get_step_state_file  # noqa
+from snapcraft_legacy.internal.states._store import read_state  # noqa
+from snapcraft_legacy.internal.states._store import write_state  # noqa
@@ -18,11 +18,15 @@ import os
 
 from snapcraft_legacy import yaml_utils
 from snapcraft_legacy.internal import steps
+from snapcraft_legacy.internal.states._store import read_state
+
+
+_LAZY_ATTRIBUTES = "_lazy_attributes"
 
 
 class State(yaml_utils.SnapcraftYAMLObject):
     def __repr__(self):
-        items = sorted(self.__dict__.items())
+        items = sorted(self.__getstate__().items())
         strings = (": ".join((key, repr(value))) for key, value in items)
         representation = ", ".join(strings)
 
@@ -30,10 +34,42 @@ class State(yaml_utils.SnapcraftYAMLObject):
 
     def __eq__(self, other):
         if type(other) is type(self):
-            return self.__dict__ == other.__dict__
+            return self.__getstate__() == other.__getstate__()
 
         return False
 
+    def __getattr__(self, name):
+        # Only called for attributes which are not set, which may be lazy.
+        loaders = self.__dict__.get(_LAZY_ATTRIBUTES)
+        if not loaders or name not in loaders:
+            raise AttributeError(
+                "{!r} object has no attribute {!r}".format(
+                    self.__class__.__name__, name
+                )
+            )
+
+        value = loaders.pop(name)()
+        setattr(self, name, value)
+        return value
+
+    def __getstate__(self):
+        """Return the attributes of the state, loading lazy attributes."""
+        for name in list(self.__dict__.get(_LAZY_ATTRIBUTES, {})):
+            getattr(self, name)
+        return {
+            key: value for key, value in self.__dict__.items() if key != _LAZY_ATTRIBUTES
+        }
+
+    def set_lazy_attributes(self, loaders):
+        """Set attributes to be loaded when first accessed.
+
+        :param dict loaders: the functions returning the value of each
+                             attribute, by attribute name.
+        """
+        for name in loaders:
+            self.__dict__.pop(name, None)
+        self.__dict__.setdefault(_LAZY_ATTRIBUTES, {}).update(loaders)
+
 
 class PartState(State):
     def __init__(self, part_properties, project):
@@ -92,8 +128,7 @@ def get_state(state_dir: str, step: steps.Step):
     state = None
     state_file = get_step_state_file(state_dir, step)
     if os.path.isfile(state_file):
-        with open(state_file, "r") as f:
-            state = yaml_utils.load(f)
+        state = read_state(state_file)
 
     return state
 
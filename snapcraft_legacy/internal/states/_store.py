@@ -0,0 +1,157 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Storage of the state of the steps of parts.
+
+A state file starts with a small YAML document holding the state without
+its sets of paths, followed by a table per set of paths. The tables are
+stored compressed and only decoded when the corresponding attribute of
+the state is first accessed, so that the state of a part with many files
+can be loaded without parsing them all.
+
+State files written as YAML by previous versions are still loaded, and
+converted to this format when the step is next written.
+"""
+
+import contextlib
+import os
+import struct
+import tempfile
+import zlib
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from snapcraft_legacy import yaml_utils
+
+# Starting with a NUL byte, a state file is never mistaken for YAML.
+_MAGIC = b"\x00snapcraft-state\x01"
+_LENGTH = struct.Struct(">I")
+_ENCODING = "utf-8"
+_ERRORS = "surrogateescape"
+
+
+def _is_path_set(value: Any) -> bool:
+    return isinstance(value, set) and all(isinstance(x, str) for x in value)
+
+
+def _encode_paths(paths: Set[str]) -> bytes:
+    return zlib.compress("\0".join(sorted(paths)).encode(_ENCODING, _ERRORS))
+
+
+def _decode_paths(data: bytes) -> Set[str]:
+    paths = zlib.decompress(data)
+    if not paths:
+        return set()
+    return set(paths.decode(_ENCODING, _ERRORS).split("\0"))
+
+
+def _pack(data: bytes) -> bytes:
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack(contents: bytes, offset: int) -> Tuple[bytes, int]:
+    (length,) = _LENGTH.unpack_from(contents, offset)
+    offset += _LENGTH.size
+    if offset + length > len(contents):
+        raise ValueError("truncated state file")
+    return contents[offset : offset + length], offset + length
+
+
+def _split_state(state: Any) -> Tuple[Any, Dict[str, Set[str]]]:
+    """Separate the sets of paths of state from its other attributes."""
+    # Imported here to avoid a circular import.
+    from snapcraft_legacy.internal.states._state import State
+
+    if not isinstance(state, State):
+        return state, {}
+
+    attributes = state.__getstate__()
+    tables = {key: value for key, value in attributes.items() if _is_path_set(value)}
+    header = state.__class__.__new__(state.__class__)
+    header.__dict__.update(
+        {key: value for key, value in attributes.items() if key not in tables}
+    )
+    return header, tables
+
+
+def encode_state(state: Any) -> bytes:
+    """Serialize state in the state file format."""
+    header, tables = _split_state(state)
+
+    chunks: List[bytes] = [
+        _MAGIC,
+        _pack(yaml_utils.dump(header).encode(_ENCODING)),
+        _LENGTH.pack(len(tables)),
+    ]
+    for key, paths in sorted(tables.items()):
+        chunks.append(_pack(key.encode(_ENCODING)))
+        chunks.append(_pack(_encode_paths(paths)))
+    return b"".join(chunks)
+
+
+def decode_state(contents: bytes) -> Any:
+    """Deserialize state from the contents of a state file.
+
+    Contents without the state file format header are loaded as YAML.
+
+    :raises ValueError: if the contents are corrupted.
+    """
+    if not contents.startswith(_MAGIC):
+        return yaml_utils.load(contents.decode(_ENCODING))
+
+    try:
+        header, offset = _unpack(contents, len(_MAGIC))
+        state = yaml_utils.load(header.decode(_ENCODING))
+        (count,) = _LENGTH.unpack_from(contents, offset)
+        offset += _LENGTH.size
+        loaders: Dict[str, Callable[[], Set[str]]] = {}
+        for _ in range(count):
+            key, offset = _unpack(contents, offset)
+            data, offset = _unpack(contents, offset)
+            loaders[key.decode(_ENCODING)] = _make_loader(data)
+    except struct.error as error:
+        raise ValueError("truncated state file") from error
+
+    if loaders:
+        state.set_lazy_attributes(loaders)
+    return state
+
+
+def _make_loader(data: bytes) -> Callable[[], Set[str]]:
+    return lambda: _decode_paths(data)
+
+
+def write_state(state_file: str, state: Any) -> None:
+    """Write state to state_file, atomically replacing it."""
+    contents = encode_state(state)
+    temp_fd, temp_name = tempfile.mkstemp(
+        dir=os.path.dirname(state_file) or os.curdir,
+        prefix=".{}.".format(os.path.basename(state_file)),
+    )
+    try:
+        with os.fdopen(temp_fd, "wb") as temp_file:
+            temp_file.write(contents)
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, state_file)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+def read_state(state_file: str) -> Any:
+    """Read the state stored in state_file, as YAML or the state file format."""
+    with open(state_file, "rb") as f:
+        return decode_state(f.read())
@@ -17,7 +17,10 @@
 import os
 import shutil
 
+import pytest
+
 from snapcraft_legacy.file_utils import calculate_hash
+from snapcraft_legacy.internal.cache import _file
 
 
 class TestFileCache:
@@ -48,6 +51,55 @@ class TestFileCache:
         retrieved_file = file_cache.get(algorithm=algo, hash=calculated_hash)
         assert retrieved_file.endswith(leaf_path)
 
+    def test_cache_read_only(self, random_data_file, file_cache, algo):
+        calculated_hash = calculate_hash(random_data_file, algorithm=algo)
+        cached_file = file_cache.cache(
+            filename=random_data_file, algorithm=algo, hash=calculated_hash
+        )
+
+        assert os.stat(cached_file).st_mode & 0o222 == 0
+
+    def test_get_writable_legacy_entry(self, random_data_file, file_cache, algo):
+        calculated_hash = calculate_hash(random_data_file, algorithm=algo)
+        cached_file = file_cache.cache(
+            filename=random_data_file, algorithm=algo, hash=calculated_hash
+        )
+        os.chmod(cached_file, 0o644)
+
+        retrieved_file = file_cache.get(algorithm=algo, hash=calculated_hash)
+
+        assert retrieved_file == cached_file
+        assert os.stat(cached_file).st_mode & 0o222 == 0
+
+    def test_get_corrupted_writable_entry(self, random_data_file, file_cache, algo):
+        calculated_hash = calculate_hash(random_data_file, algorithm=algo)
+        cached_file = file_cache.cache(
+            filename=random_data_file, algorithm=algo, hash=calculated_hash
+        )
+        os.chmod(cached_file, 0o644)
+        with open(cached_file, "ab") as f:
+            f.write(b"corrupted")
+
+        assert file_cache.get(algorithm=algo, hash=calculated_hash) is None
+        assert not os.path.exists(cached_file)
+
+    def test_cache_with_calculated_hash(
+        self, monkeypatch, random_data_file, file_cache, algo
+    ):
+        calculated_hash = calculate_hash(random_data_file, algorithm=algo)
+        monkeypatch.setattr(
+            _file, "calculate_hash", lambda *args, **kwargs: pytest.fail("hashed")
+        )
+
+        cached_file = file_cache.cache(
+            filename=random_data_file,
+            algorithm=algo,
+            hash=calculated_hash,
+            calculated_hash=calculated_hash,
+        )
+
+        assert cached_file.endswith(os.path.join(algo, calculated_hash))
+
     def test_cache_not_possible(self, random_data_file, file_cache, algo):
         bad_calculated_hash = "1"
 
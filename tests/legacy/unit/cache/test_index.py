@@ -0,0 +1,144 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from snapcraft_legacy.file_utils import calculate_hash
+from snapcraft_legacy.internal import cache
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    def _make_file(name, size):
+        file_path = tmp_path / name
+        file_path.write_bytes(name.encode().ljust(size, b"\0"))
+        return file_path.as_posix()
+
+    return _make_file
+
+
+def _cache_file(file_cache, file_path):
+    return file_cache.cache(
+        filename=file_path,
+        algorithm="sha256",
+        hash=calculate_hash(file_path, algorithm="sha256"),
+    )
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [("10", 10), ("1k", 1024), ("2M", 2 * 1024**2), ("3 GiB", 3 * 1024**3)],
+)
+def test_parse_size(size, expected):
+    assert cache.parse_size(size) == expected
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError):
+        cache.parse_size("lots")
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [(None, cache._index.DEFAULT_MAX_SIZE), ("5M", 5 * 1024**2), ("x", None)],
+)
+def test_get_max_size(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("SNAPCRAFT_CACHE_MAX_SIZE", raising=False)
+    else:
+        monkeypatch.setenv("SNAPCRAFT_CACHE_MAX_SIZE", value)
+
+    assert cache.get_max_size() == (expected or cache._index.DEFAULT_MAX_SIZE)
+
+
+def test_cache_evicts_least_recently_used(monkeypatch, file_cache, make_file):
+    monkeypatch.setenv("SNAPCRAFT_CACHE_MAX_SIZE", "250")
+    first = _cache_file(file_cache, make_file("first", 100))
+    second = _cache_file(file_cache, make_file("second", 100))
+
+    # Using the first file makes the second one the least recently used.
+    assert file_cache.get(algorithm="sha256", hash=os.path.basename(first)) == first
+    third = _cache_file(file_cache, make_file("third", 100))
+
+    assert os.path.exists(first)
+    assert not os.path.exists(second)
+    assert os.path.exists(third)
+    assert file_cache.index.get_stats() == {"files": cache.CacheStats(2, 200)}
+
+
+def test_cache_keeps_file_larger_than_budget(monkeypatch, file_cache, make_file):
+    monkeypatch.setenv("SNAPCRAFT_CACHE_MAX_SIZE", "50")
+    first = _cache_file(file_cache, make_file("first", 100))
+    second = _cache_file(file_cache, make_file("second", 100))
+
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_evict(file_cache, make_file):
+    cached_files = [
+        _cache_file(file_cache, make_file(name, 100)) for name in ("a", "b", "c")
+    ]
+
+    assert file_cache.index.evict(max_size=100) == cached_files[:2]
+    assert file_cache.index.get_stats() == {"files": cache.CacheStats(1, 100)}
+
+
+def test_stats_by_kind(file_cache, make_file, xdg_dirs):
+    _cache_file(file_cache, make_file("a", 10))
+    _cache_file(cache.FileCache(namespace="other"), make_file("b", 20))
+
+    assert file_cache.index.get_stats() == {
+        "files": cache.CacheStats(1, 10),
+        "other": cache.CacheStats(1, 20),
+    }
+
+
+def test_snap_cache_get_latest_adopts_unindexed(monkeypatch, xdg_dirs):
+    snap_cache = cache.SnapCache(project_name="my-snap")
+    snap_cache_dir = os.path.join(snap_cache.snap_cache_root, "amd64")
+    os.makedirs(snap_cache_dir)
+    ctimes = {}
+    for ctime, snap_hash in enumerate(["older", "newer", "old"]):
+        cached_snap = os.path.join(snap_cache_dir, snap_hash)
+        open(cached_snap, "w").close()
+        ctimes[cached_snap] = ctime
+    monkeypatch.setattr(os.path, "getctime", ctimes.get)
+
+    latest = os.path.join(snap_cache_dir, "old")
+    assert snap_cache.get(deb_arch="amd64") == latest
+    assert snap_cache.index.get_stats() == {"snaps": cache.CacheStats(3, 0)}
+
+    # Snaps removed behind the index's back are forgotten.
+    os.remove(latest)
+    assert snap_cache.get(deb_arch="amd64") == os.path.join(snap_cache_dir, "newer")
+    assert snap_cache.index.get_stats() == {"snaps": cache.CacheStats(2, 0)}
+
+
+def test_snap_cache_prune_updates_index(xdg_dirs):
+    snap_cache = cache.SnapCache(project_name="my-snap")
+    snap_cache_dir = os.path.join(snap_cache.snap_cache_root, "amd64")
+    os.makedirs(snap_cache_dir)
+    for snap_hash in ("keep", "prune"):
+        cached_snap = os.path.join(snap_cache_dir, snap_hash)
+        open(cached_snap, "w").close()
+        snap_cache.index.add(cached_snap, kind="snaps")
+
+    snap_cache.prune(deb_arch="amd64", keep_hash="keep")
+
+    assert snap_cache.index.get_stats() == {"snaps": cache.CacheStats(1, 0)}
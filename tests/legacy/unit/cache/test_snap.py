@@ -25,7 +25,7 @@ from testtools.matchers import Contains, Equals, Not
 import snapcraft_legacy
 import tests.legacy
 from snapcraft_legacy import file_utils
-from snapcraft_legacy.internal import cache
+from snapcraft_legacy.internal import cache, errors
 from tests.legacy.unit.commands import CommandBaseTestCase
 
 
@@ -123,6 +123,18 @@ class SnapCacheTestCase(SnapCacheBaseTestCase):
             snap, Equals(os.path.join(snap_cache.snap_cache_root, "amd64", snap_hash))
         )
 
+    def test_snap_cache_corrupt_snap(self):
+        snap_path = os.path.join(
+            os.path.dirname(tests.legacy.__file__), "data", "invalid.snap"
+        )
+        snap_cache = cache.SnapCache(project_name="cache-test")
+
+        self.assertRaises(
+            errors.SnapDataExtractionError,
+            snap_cache.cache,
+            snap_filename=snap_path,
+        )
+
 
 class SnapCachePruneTestCase(SnapCacheBaseTestCase):
     def test_prune_snap_cache(self):
@@ -0,0 +1,82 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from textwrap import dedent
+
+import fixtures
+from testtools.matchers import Contains, Equals
+
+from snapcraft_legacy.internal import cache
+
+from . import CommandBaseTestCase
+
+
+class CacheCommandTestCase(CommandBaseTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.useFixture(fixtures.EnvironmentVariable("SNAPCRAFT_CACHE_MAX_SIZE", "1G"))
+        self.snap_cache = cache.SnapCache(project_name="my-snap")
+        snap_cache_dir = os.path.join(self.snap_cache.snap_cache_root, "amd64")
+        os.makedirs(snap_cache_dir)
+        self.cached_snaps = []
+        for snap_hash in ("first", "second"):
+            cached_snap = os.path.join(snap_cache_dir, snap_hash)
+            with open(cached_snap, "wb") as snap_file:
+                snap_file.write(b"\0" * 1024)
+            self.snap_cache.index.add(cached_snap, kind="snaps")
+            self.cached_snaps.append(cached_snap)
+
+    def test_stats(self):
+        result = self.run_command(["cache", "stats"])
+
+        self.assertThat(result.exit_code, Equals(0))
+        self.assertThat(
+            result.output,
+            Equals(
+                dedent(
+                    """\
+                    Kind    Files    Size
+                    snaps   2        2.0 KiB
+                    Total   2        2.0 KiB
+                    Cache budget: 1.0 GiB
+                    """
+                )
+            ),
+        )
+
+    def test_gc(self):
+        result = self.run_command(["cache", "gc"])
+
+        self.assertThat(result.exit_code, Equals(0))
+        self.assertThat(result.output, Equals("Evicted 0 cached files, freeing 0 B.\n"))
+
+    def test_gc_max_size(self):
+        result = self.run_command(["cache", "gc", "--max-size", "1K"])
+
+        self.assertThat(result.exit_code, Equals(0))
+        self.assertThat(
+            result.output, Equals("Evicted 1 cached files, freeing 1.0 KiB.\n")
+        )
+        self.assertFalse(os.path.exists(self.cached_snaps[0]))
+        self.assertTrue(os.path.exists(self.cached_snaps[1]))
+
+    def test_gc_invalid_max_size(self):
+        result = self.run_command(["cache", "gc", "--max-size", "lots"])
+
+        self.assertThat(result.exit_code, Equals(2))
+        self.assertThat(result.output, Contains("invalid size 'lots'"))
@@ -147,3 +147,24 @@ for now delta_format='invalid-delta-format'"""
             lambda: generator._check_delta_size_constraint(delta_file),
             m.raises(deltas.errors.DeltaGenerationTooBigError),
         )
+
+    def test_predicted_large_delta_raises_error_before_generating(self):
+        with open(self.target_file, "wb") as target:
+            target.seek(1000 - 1)
+            target.write(b"\0")
+
+        generator = deltas.BaseDeltasGenerator(
+            source_path=self.source_file,
+            target_path=self.target_file,
+            delta_format="xdelta3",
+            delta_tool=self.delta_tool_path,
+        )
+        get_delta_cmd = self.useFixture(
+            fixtures.MockPatchObject(generator, "get_delta_cmd")
+        ).mock
+
+        self.assertThat(
+            lambda: generator.make_delta(is_for_test=True),
+            m.raises(deltas.errors.DeltaGenerationTooBigError),
+        )
+        get_delta_cmd.assert_not_called()
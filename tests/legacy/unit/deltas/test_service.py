@@ -0,0 +1,206 @@
+# -*- mode:python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import fixtures
+from testtools import matchers as m
+
+from snapcraft_legacy.internal import deltas
+from tests.legacy import unit
+
+
+class FakeDeltasGenerator(deltas.BaseDeltasGenerator):
+    def __init__(self, *, source_path, target_path):
+        super().__init__(
+            source_path=source_path,
+            target_path=target_path,
+            delta_tool="xdelta3",
+            delta_format="xdelta3",
+        )
+
+    def make_delta(self, output_dir=None, progress_indicator=None, is_for_test=False):
+        self._check_predicted_delta_size_constraint()
+        delta_path = "{}.delta".format(self.target_path)
+        with open(delta_path, "w") as delta_file:
+            delta_file.write("{}\n".format(self.source_path))
+        return delta_path
+
+
+class DeltaSourceCacheTestCase(unit.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = deltas.DeltaSourceCache()
+
+    def _make_snap(self, name, content):
+        with open(name, "wb") as snap_file:
+            snap_file.write(content)
+        return name
+
+    def test_add_and_get(self):
+        snap_path = self._make_snap("foo_1_amd64.snap", b"amd64 revision 1")
+
+        cached_path = self.cache.add(
+            snap_name="foo", deb_arch="amd64", snap_path=snap_path
+        )
+
+        self.assertThat(cached_path, m.FileContains("amd64 revision 1"))
+        self.assertThat(
+            self.cache.get(snap_name="foo", deb_arch="amd64"), m.Equals(cached_path)
+        )
+        self.assertThat(self.cache.get(snap_name="foo", deb_arch="arm64"), m.Is(None))
+        self.assertThat(self.cache.get(snap_name="bar", deb_arch="amd64"), m.Is(None))
+
+    def test_add_is_content_addressed(self):
+        amd64_path = self._make_snap("foo_1_amd64.snap", b"same content")
+        arm64_path = self._make_snap("foo_1_arm64.snap", b"same content")
+
+        cached_amd64 = self.cache.add(
+            snap_name="foo", deb_arch="amd64", snap_path=amd64_path
+        )
+        cached_arm64 = self.cache.add(
+            snap_name="foo", deb_arch="arm64", snap_path=arm64_path
+        )
+
+        self.assertThat(cached_amd64, m.Equals(cached_arm64))
+        self.assertThat(os.path.basename(cached_amd64), m.HasLength(96))
+
+    def test_cached_snap_not_altered_by_rebuild(self):
+        snap_path = self._make_snap("foo_1_amd64.snap", b"revision 1")
+        cached_path = self.cache.add(
+            snap_name="foo", deb_arch="amd64", snap_path=snap_path
+        )
+
+        with open(snap_path, "wb") as snap_file:
+            snap_file.write(b"revision 2")
+
+        self.assertThat(cached_path, m.FileContains("revision 1"))
+
+    def test_prune_unreferenced(self):
+        first_path = self.cache.add(
+            snap_name="foo",
+            deb_arch="amd64",
+            snap_path=self._make_snap("foo_1_amd64.snap", b"revision 1"),
+        )
+        second_path = self.cache.add(
+            snap_name="foo",
+            deb_arch="amd64",
+            snap_path=self._make_snap("foo_2_amd64.snap", b"revision 2"),
+        )
+
+        self.assertThat(self.cache.prune(), m.Equals([first_path]))
+        self.assertThat(first_path, m.Not(m.FileExists()))
+        self.assertThat(second_path, m.FileExists())
+        self.assertThat(
+            self.cache.get(snap_name="foo", deb_arch="amd64"), m.Equals(second_path)
+        )
+
+
+class GenerateDeltasTestCase(unit.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.useFixture(
+            fixtures.MockPatch(
+                "snapcraft_legacy.file_utils.get_snap_tool_path",
+                side_effect=lambda x: os.path.join("/usr", "bin", x),
+            )
+        )
+        self.cache = deltas.DeltaSourceCache()
+
+    def _add_source(self, deb_arch, content):
+        snap_path = "foo_1_{}.snap".format(deb_arch)
+        with open(snap_path, "wb") as snap_file:
+            snap_file.write(content)
+        return self.cache.add(snap_name="foo", deb_arch=deb_arch, snap_path=snap_path)
+
+    def _make_target(self, deb_arch, content):
+        snap_path = "foo_2_{}.snap".format(deb_arch)
+        with open(snap_path, "wb") as snap_file:
+            snap_file.write(content)
+        return snap_path
+
+    def test_generate_deltas(self):
+        amd64_source = self._add_source("amd64", b"amd64 revision 1")
+        arm64_source = self._add_source("arm64", b"arm64 revision 1")
+        targets = {
+            "amd64": self._make_target("amd64", b"amd64 revision 2"),
+            "arm64": self._make_target("arm64", b"arm64 revision 2"),
+            "s390x": self._make_target("s390x", b"s390x revision 2"),
+        }
+
+        result = deltas.generate_deltas(
+            snap_name="foo",
+            target_paths=targets,
+            source_cache=self.cache,
+            generator_class=FakeDeltasGenerator,
+            max_workers=2,
+        )
+
+        self.assertThat(
+            result,
+            m.Equals(
+                {
+                    "amd64": "foo_2_amd64.snap.delta",
+                    "arm64": "foo_2_arm64.snap.delta",
+                    "s390x": None,
+                }
+            ),
+        )
+        self.assertThat(result["amd64"], m.FileContains(amd64_source + "\n"))
+        self.assertThat(result["arm64"], m.FileContains(arm64_source + "\n"))
+
+    def test_generate_deltas_skips_predicted_too_big(self):
+        self._add_source("amd64", b"small")
+        self._add_source("arm64", b"arm64 revision 1")
+        targets = {
+            "amd64": self._make_target("amd64", b"a much larger revision" * 10),
+            "arm64": self._make_target("arm64", b"arm64 revision 2"),
+        }
+
+        result = deltas.generate_deltas(
+            snap_name="foo",
+            target_paths=targets,
+            source_cache=self.cache,
+            generator_class=FakeDeltasGenerator,
+        )
+
+        self.assertThat(
+            result, m.Equals({"amd64": None, "arm64": "foo_2_arm64.snap.delta"})
+        )
+        self.assertThat("foo_2_amd64.snap.delta", m.Not(m.FileExists()))
+
+    def test_generate_deltas_error(self):
+        self._add_source("amd64", b"amd64 revision 1")
+
+        class FailingDeltasGenerator(FakeDeltasGenerator):
+            def make_delta(self, *args, **kwargs):
+                raise deltas.errors.DeltaGenerationError(
+                    delta_format="xdelta3",
+                    stdout_path="out",
+                    stdout="",
+                    stderr_path="err",
+                    stderr="error",
+                    returncode=1,
+                )
+
+        self.assertRaises(
+            deltas.errors.DeltaGenerationError,
+            deltas.generate_deltas,
+            snap_name="foo",
+            target_paths={"amd64": self._make_target("amd64", b"amd64 revision 2")},
+            source_cache=self.cache,
+            generator_class=FailingDeltasGenerator,
+        )
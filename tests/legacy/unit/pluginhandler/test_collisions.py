@@ -0,0 +1,166 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import filecmp
+import os
+
+import pytest
+
+from snapcraft_legacy.internal.pluginhandler import _collisions
+
+
+@pytest.fixture
+def make_part(tmp_path):
+    def _make_part(name, files):
+        install_dir = tmp_path / name
+        install_dir.mkdir()
+        for path, content in files.items():
+            file_path = install_dir / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(content)
+        return str(install_dir)
+
+    return _make_part
+
+
+def test_identical_files_hashed_once(make_part, mocker):
+    get_digest = mocker.spy(_collisions, "_get_digest")
+    cmp = mocker.spy(filecmp, "cmp")
+    index = _collisions.CollisionIndex()
+
+    for name in ("part1", "part2", "part3"):
+        install_dir = make_part(name, {"usr/lib/libfoo.so": "foo"})
+        assert (
+            index.add(name, install_dir, {"usr", "usr/lib", "usr/lib/libfoo.so"})
+            is None
+        )
+
+    assert get_digest.call_count == 3
+    cmp.assert_not_called()
+
+
+def test_hardlinked_files_not_hashed(make_part, mocker):
+    get_digest = mocker.spy(_collisions, "_get_digest")
+    install_dir1 = make_part("part1", {"libfoo.so": "foo"})
+    install_dir2 = make_part("part2", {})
+    os.link(
+        os.path.join(install_dir1, "libfoo.so"),
+        os.path.join(install_dir2, "libfoo.so"),
+    )
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"libfoo.so"})
+    assert index.add("part2", install_dir2, {"libfoo.so"}) is None
+
+    get_digest.assert_not_called()
+
+
+def test_digests_memoized_per_index(make_part, mocker):
+    hash_file = mocker.spy(_collisions, "_hash_file")
+    install_dir1 = make_part("part1", {"libfoo.so": "foo"})
+    install_dir2 = make_part("part2", {"libfoo.so": "foo"})
+    install_dir3 = make_part("part3", {})
+    os.link(
+        os.path.join(install_dir1, "libfoo.so"),
+        os.path.join(install_dir3, "libfoo.so"),
+    )
+
+    for _ in range(2):
+        index = _collisions.CollisionIndex()
+        for name, install_dir in [
+            ("part1", install_dir1),
+            ("part2", install_dir2),
+            ("part3", install_dir3),
+        ]:
+            assert index.add(name, install_dir, {"libfoo.so"}) is None
+
+    # Hard links share their digest within an index, which is not kept
+    # once the index is released.
+    assert hash_file.call_count == 4
+
+
+def test_different_sizes_not_read(make_part, mocker):
+    get_digest = mocker.spy(_collisions, "_get_digest")
+    install_dir1 = make_part("part1", {"libfoo.so": "foo"})
+    install_dir2 = make_part("part2", {"libfoo.so": "foobar"})
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"libfoo.so"})
+
+    assert index.add("part2", install_dir2, {"libfoo.so"}) == (
+        "part1",
+        ["libfoo.so"],
+    )
+    get_digest.assert_not_called()
+
+
+def test_different_contents_compared(make_part, mocker):
+    cmp = mocker.spy(filecmp, "cmp")
+    install_dir1 = make_part("part1", {"libfoo.so": "foo"})
+    install_dir2 = make_part("part2", {"libfoo.so": "bar"})
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"libfoo.so"})
+
+    assert index.add("part2", install_dir2, {"libfoo.so"}) == (
+        "part1",
+        ["libfoo.so"],
+    )
+    assert cmp.call_count == 1
+
+
+def test_pc_files_prefix_ignored(make_part):
+    install_dir1 = make_part("part1", {"foo.pc": "prefix=/part1\nName: foo\n"})
+    install_dir2 = make_part("part2", {"foo.pc": "prefix=/part2/install\nName: foo\n"})
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"foo.pc"})
+
+    assert index.add("part2", install_dir2, {"foo.pc"}) is None
+
+
+def test_first_colliding_part_reported(make_part):
+    install_dir1 = make_part("part1", {"a": "1", "b": "1"})
+    install_dir2 = make_part("part2", {"c": "1"})
+    install_dir3 = make_part("part3", {"a": "2", "b": "1", "c": "2"})
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"a", "b"})
+    index.add("part2", install_dir2, {"c"})
+
+    assert index.add("part3", install_dir3, {"a", "b", "c"}) == ("part1", ["a"])
+
+
+def test_missing_files_do_not_collide(make_part):
+    install_dir1 = make_part("part1", {"a": "1"})
+    install_dir2 = make_part("part2", {})
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"a"})
+
+    assert index.add("part2", install_dir2, {"a"}) is None
+
+
+def test_special_files_collide(make_part):
+    install_dir1 = make_part("part1", {})
+    install_dir2 = make_part("part2", {})
+    for install_dir in (install_dir1, install_dir2):
+        os.mkfifo(os.path.join(install_dir, "fifo"))
+    index = _collisions.CollisionIndex()
+
+    index.add("part1", install_dir1, {"fifo"})
+
+    assert index.add("part2", install_dir2, {"fifo"}) == ("part1", ["fifo"])
@@ -0,0 +1,154 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import glob
+import os
+
+import pytest
+
+from snapcraft_legacy.internal.pluginhandler import _fileset
+
+
+def _reference_filesets(includes, excludes, srcdir):
+    """The fileset matching as implemented with glob and os.walk."""
+    include_files = set()
+    for include in includes:
+        if "*" in include:
+            matches = glob.glob(os.path.join(srcdir, include), recursive=True)
+        else:
+            matches = [os.path.join(srcdir, include)]
+        include_files |= set(matches)
+    include_dirs = [
+        x for x in include_files if os.path.isdir(x) and not os.path.islink(x)
+    ]
+    include_files = {os.path.relpath(x, srcdir) for x in include_files}
+    for include_dir in include_dirs:
+        for root, dirs, files in os.walk(include_dir):
+            include_files |= {
+                os.path.relpath(os.path.join(root, d), srcdir) for d in dirs
+            }
+            include_files |= {
+                os.path.relpath(os.path.join(root, f), srcdir) for f in files
+            }
+
+    exclude_files = set()
+    for exclude in excludes:
+        exclude_files |= set(glob.glob(os.path.join(srcdir, exclude), recursive=True))
+    exclude_dirs = [
+        os.path.relpath(x, srcdir) for x in exclude_files if os.path.isdir(x)
+    ]
+    exclude_files = {os.path.relpath(x, srcdir) for x in exclude_files}
+
+    snap_files = include_files - exclude_files
+    for exclude_dir in exclude_dirs:
+        snap_files = {x for x in snap_files if not x.startswith(exclude_dir + "/")}
+
+    snap_dirs = {
+        x
+        for x in snap_files
+        if os.path.isdir(os.path.join(srcdir, x))
+        and not os.path.islink(os.path.join(srcdir, x))
+    }
+    snap_files = snap_files - snap_dirs
+
+    def resolve(path):
+        parent, name = os.path.split(path)
+        parent = os.path.realpath(os.path.join(srcdir, parent))
+        return os.path.relpath(os.path.join(parent, name), srcdir)
+
+    resolved_snap_files = set()
+    for snap_file in snap_files:
+        resolved_snap_file = resolve(snap_file)
+        resolved_snap_files.add(resolved_snap_file)
+        dirname = os.path.dirname(resolved_snap_file)
+        while dirname:
+            snap_dirs.add(dirname)
+            dirname = os.path.dirname(dirname)
+
+    return resolved_snap_files, {resolve(x) for x in snap_dirs}
+
+
+@pytest.fixture
+def srcdir(tmp_path):
+    for path in [
+        "bin/app",
+        "bin/.hidden",
+        "lib/libfoo.so",
+        "lib/libfoo.a",
+        "lib/python/module.py",
+        "lib/python/.cache/data",
+        "share/doc/foo/README",
+        "share/man/man1/foo.1",
+        ".config/settings",
+    ]:
+        file_path = tmp_path / "install" / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(file_path.name)
+
+    install = tmp_path / "install"
+    (install / "empty").mkdir()
+    (install / "lib64").symlink_to("lib")
+    (install / "bin" / "app-link").symlink_to("app")
+    (install / "share" / "dangling").symlink_to("missing")
+    (install / "usr").mkdir()
+    (install / "usr" / "lib").symlink_to("../lib")
+    return str(install)
+
+
+@pytest.mark.parametrize(
+    "includes,excludes",
+    [
+        (["*"], []),
+        (["*"], ["lib"]),
+        (["*"], ["*/*.so", "share/doc"]),
+        (["**"], []),
+        (["**/*"], ["**/*.a"]),
+        (["lib/**"], ["lib/python/**"]),
+        (["bin", "lib64/*"], []),
+        (["usr/lib/*", "usr/"], []),
+        (["lib64/", "share"], ["share/*/man1"]),
+        (["*/.*", "missing"], []),
+        ([".*", "bin/app"], ["*/*"]),
+        (["lib", "lib/python"], ["lib/*.a"]),
+        (["**/"], ["empty"]),
+        (["s[h]are/*", "?in"], ["bin/app-*"]),
+    ],
+)
+def test_get_migratable_filesets(srcdir, includes, excludes):
+    assert _fileset.get_migratable_filesets(
+        includes, excludes, srcdir
+    ) == _reference_filesets(includes, excludes, srcdir)
+
+
+def test_get_migratable_filesets_relative_srcdir(srcdir, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(srcdir))
+
+    assert _fileset.get_migratable_filesets(
+        ["**"], ["lib64"], "install"
+    ) == _reference_filesets(["**"], ["lib64"], "install")
+
+
+def test_matcher_lists_directories_once(srcdir, mocker):
+    scandir = mocker.spy(os, "scandir")
+    matcher = _fileset.FilesetMatcher(srcdir)
+
+    list(matcher.glob("**"))
+    list(matcher.glob("lib/*"))
+    list(matcher.glob("*/*.so"))
+    list(matcher.walk(os.path.join(srcdir, "lib")))
+
+    listed = [call.args[0] for call in scandir.call_args_list]
+    assert len(listed) == len(set(listed))
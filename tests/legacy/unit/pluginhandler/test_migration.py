@@ -0,0 +1,121 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+
+import pytest
+
+from snapcraft_legacy.internal import errors
+from snapcraft_legacy.internal.pluginhandler import _migration
+
+
+@pytest.fixture
+def srcdir(tmp_path):
+    srcdir = tmp_path / "install"
+    (srcdir / "lib" / "pkgconfig").mkdir(parents=True)
+    for index in range(600):
+        (srcdir / "lib" / "lib{}.so".format(index)).write_text(str(index))
+    (srcdir / "lib" / "pkgconfig" / "foo.pc").write_text("prefix=/usr\n")
+    (srcdir / "lib" / "libfoo.so").symlink_to("lib0.so")
+    return srcdir
+
+
+@pytest.fixture
+def dstdir(tmp_path):
+    dstdir = tmp_path / "stage"
+    dstdir.mkdir()
+    return dstdir
+
+
+def _get_fileset(srcdir):
+    files = {
+        os.path.relpath(os.path.join(root, name), srcdir)
+        for root, _, names in os.walk(srcdir)
+        for name in names
+    }
+    return files, {"lib", "lib/pkgconfig"}
+
+
+def test_migrate_files(srcdir, dstdir):
+    files, dirs = _get_fileset(srcdir)
+
+    counters = _migration.migrate_files(
+        files, dirs, str(srcdir), str(dstdir), max_workers=4
+    )
+
+    assert _get_fileset(dstdir) == (files, dirs)
+    assert os.stat(dstdir / "lib" / "lib1.so").st_ino == (
+        os.stat(srcdir / "lib" / "lib1.so").st_ino
+    )
+    assert os.readlink(dstdir / "lib" / "libfoo.so") == "lib0.so"
+    assert os.stat(dstdir / "lib" / "pkgconfig" / "foo.pc").st_ino != (
+        os.stat(srcdir / "lib" / "pkgconfig" / "foo.pc").st_ino
+    )
+    assert counters.directories == 2
+    assert counters.linked == 600
+    # The pkg-config file and the symlink.
+    assert counters.copied == 2
+    assert counters.skipped == 0
+    assert counters.fixed == 0
+    assert str(counters) == (
+        "2 directories, 600 files linked, 2 copied, 0 skipped, 0 fixed"
+    )
+
+
+def test_migrate_files_skipped(srcdir, dstdir):
+    files, dirs = _get_fileset(srcdir)
+    (dstdir / "lib").mkdir()
+    (dstdir / "lib" / "lib1.so").symlink_to("lib0.so")
+
+    counters = _migration.migrate_files(
+        files | {"lib/missing.so"}, dirs, str(srcdir), str(dstdir), missing_ok=True
+    )
+
+    assert os.readlink(dstdir / "lib" / "lib1.so") == "lib0.so"
+    assert not (dstdir / "lib" / "missing.so").exists()
+    assert counters.skipped == 2
+    assert counters.linked == 599
+
+
+def test_migrate_files_fixups_after_migration(srcdir, dstdir):
+    files, dirs = _get_fileset(srcdir)
+    fixed_files = []
+
+    def fixup_func(file_path):
+        # All files are migrated before the first fixup, in the main thread.
+        assert (dstdir / "lib" / "lib599.so").exists()
+        assert threading.current_thread() is threading.main_thread()
+        if not file_path.endswith(".pc"):
+            return False
+        fixed_files.append(file_path)
+        return True
+
+    counters = _migration.migrate_files(
+        files, dirs, str(srcdir), str(dstdir), fixup_func=fixup_func
+    )
+
+    assert fixed_files == [str(dstdir / "lib" / "pkgconfig" / "foo.pc")]
+    assert counters.fixed == 1
+
+
+def test_migrate_files_error(srcdir, dstdir):
+    files, dirs = _get_fileset(srcdir)
+
+    with pytest.raises(errors.SnapcraftCopyFileNotFoundError):
+        _migration.migrate_files(
+            files | {"lib/missing.so"}, dirs, str(srcdir), str(dstdir)
+        )
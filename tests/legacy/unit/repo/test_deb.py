@@ -15,9 +15,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import contextlib
+import io
+import os
+import tarfile
 import textwrap
 from pathlib import Path
 from subprocess import CalledProcessError
+from typing import Dict, Optional
 from unittest import mock
 from unittest.mock import call
 
@@ -738,3 +742,174 @@ def test_get_filtered_stage_package_empty_ignore_filter(mock_get_packages_in_bas
     )
 
     assert filtered_names == {"some-base-pkg", "some-other-base-pkg"}
+
+
+def _make_deb(
+    deb_path: Path,
+    *,
+    name: str,
+    files: Dict[str, bytes],
+    symlinks: Optional[Dict[str, str]] = None,
+    data_ext: str = ".gz",
+) -> None:
+    """Write a minimal deb archive shipping files and symlinks."""
+
+    def _tarball(
+        entries: Dict[str, bytes], compression: str, links: Dict[str, str]
+    ) -> bytes:
+        fileobj = io.BytesIO()
+        with tarfile.open(fileobj=fileobj, mode=f"w:{compression}") as tar:
+            for entry_name, entry_data in entries.items():
+                tar_info = tarfile.TarInfo(entry_name)
+                tar_info.size = len(entry_data)
+                tar.addfile(tar_info, io.BytesIO(entry_data))
+            for entry_name, link_target in links.items():
+                tar_info = tarfile.TarInfo(entry_name)
+                tar_info.type = tarfile.SYMTYPE
+                tar_info.linkname = link_target
+                tar.addfile(tar_info)
+        return fileobj.getvalue()
+
+    control = f"Package: {name}\nVersion: 1.0-1\nArchitecture: all\n".encode()
+    members = [
+        ("debian-binary", b"2.0\n"),
+        ("control.tar.gz", _tarball({"./control": control}, "gz", {})),
+        (
+            f"data.tar{data_ext}",
+            _tarball(files, "gz" if data_ext == ".gz" else "", symlinks or {}),
+        ),
+    ]
+
+    with deb_path.open("wb") as deb_file:
+        deb_file.write(b"!<arch>\n")
+        for member_name, member_data in members:
+            header = (
+                f"{member_name:<16}{0:<12}{0:<6}{0:<6}{100644:<8}"
+                f"{len(member_data):<10}`\n"
+            )
+            deb_file.write(header.encode())
+            deb_file.write(member_data)
+            if len(member_data) % 2:
+                deb_file.write(b"\n")
+
+
+@pytest.fixture
+def stage_packages_path(tmp_path):
+    packages_path = tmp_path / "pkg"
+    packages_path.mkdir()
+    return packages_path
+
+
+def test_unpack_stage_packages(mocker, tmp_path, stage_packages_path):
+    mark_origin = mocker.spy(repo._deb.Ubuntu, "_mark_origin_stage_package")
+    dpkg_deb = mocker.patch("subprocess.check_call")
+    _make_deb(
+        stage_packages_path / "foo.deb",
+        name="foo",
+        files={"./usr/bin/foo": b"foo", "./usr/share/doc/foo/README": b"foo"},
+    )
+    _make_deb(
+        stage_packages_path / "bar.deb",
+        name="bar",
+        files={"./usr/lib/libbar.so.1": b"bar"},
+    )
+    install_path = tmp_path / "install"
+
+    repo.Ubuntu.unpack_stage_packages(
+        stage_packages_path=stage_packages_path, install_path=install_path
+    )
+
+    assert (install_path / "usr/bin/foo").read_bytes() == b"foo"
+    assert (install_path / "usr/share/doc/foo/README").read_bytes() == b"foo"
+    assert (install_path / "usr/lib/libbar.so.1").read_bytes() == b"bar"
+    assert sorted(c.args[1] for c in mark_origin.mock_calls) == [
+        "bar=1.0-1",
+        "foo=1.0-1",
+    ]
+    dpkg_deb.assert_not_called()
+
+
+def test_unpack_stage_packages_absolute_symlinks(tmp_path, stage_packages_path):
+    """Absolute symlinks are extracted, then made relative to the install path."""
+    _make_deb(
+        stage_packages_path / "foo.deb",
+        name="foo",
+        files={"./usr/lib/libfoo.so.1": b"foo"},
+        symlinks={"./usr/lib/libfoo.so": "/usr/lib/libfoo.so.1"},
+    )
+    install_path = tmp_path / "install"
+
+    repo.Ubuntu.unpack_stage_packages(
+        stage_packages_path=stage_packages_path, install_path=install_path
+    )
+
+    assert os.readlink(install_path / "usr/lib/libfoo.so") == "libfoo.so.1"
+
+
+@pytest.mark.parametrize("tar_filter", [True, False])
+def test_unpack_stage_packages_path_traversal(
+    monkeypatch, tmp_path, stage_packages_path, tar_filter
+):
+    """Members extracted outside of the install path are refused."""
+    if not tar_filter:
+        monkeypatch.delattr(tarfile, "tar_filter", raising=False)
+    _make_deb(
+        stage_packages_path / "foo.deb",
+        name="foo",
+        files={"./usr/share/foo": b"foo", "../evil": b"evil"},
+    )
+    install_path = tmp_path / "install"
+
+    with pytest.raises(errors.UnpackError):
+        repo.Ubuntu.unpack_stage_packages(
+            stage_packages_path=stage_packages_path, install_path=install_path
+        )
+
+    assert not list(tmp_path.rglob("evil"))
+
+
+def test_unpack_stage_packages_conflicts(tmp_path, stage_packages_path):
+    """Files shipped by several packages come from the last one by name."""
+    for name in ["c", "a", "b"]:
+        _make_deb(
+            stage_packages_path / f"{name}.deb",
+            name=name,
+            files={"./usr/share/conflict": name.encode()},
+        )
+    install_path = tmp_path / "install"
+
+    repo.Ubuntu.unpack_stage_packages(
+        stage_packages_path=stage_packages_path, install_path=install_path
+    )
+
+    assert (install_path / "usr/share/conflict").read_bytes() == b"c"
+
+
+def test_unpack_stage_packages_unsupported_compression(
+    mocker, tmp_path, stage_packages_path
+):
+    """Fall back to dpkg-deb for compression formats not supported in-process."""
+    mocker.patch("snapcraft_legacy.internal.repo._deb.zstandard", None)
+    extract_deb = mocker.patch.object(repo._deb.Ubuntu, "_extract_deb")
+    extract_name_version = mocker.patch.object(
+        repo._deb.Ubuntu, "_extract_deb_name_version", return_value="foo=1.0-1"
+    )
+    deb_path = stage_packages_path / "foo.deb"
+    _make_deb(deb_path, name="foo", files={"./foo": b"foo"}, data_ext=".zst")
+
+    repo.Ubuntu.unpack_stage_packages(
+        stage_packages_path=stage_packages_path, install_path=tmp_path / "install"
+    )
+
+    assert extract_deb.mock_calls == [call(deb_path, mock.ANY)]
+    assert extract_name_version.mock_calls == [call(deb_path)]
+
+
+def test_unpack_stage_packages_invalid_deb(tmp_path, stage_packages_path):
+    deb_path = stage_packages_path / "foo.deb"
+    deb_path.write_bytes(b"!<arch>\nnot a deb")
+
+    with pytest.raises(errors.UnpackError):
+        repo.Ubuntu.unpack_stage_packages(
+            stage_packages_path=stage_packages_path, install_path=tmp_path / "install"
+        )
@@ -14,13 +14,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import os
 from unittest import mock
 
 import requests
+from testtools import matchers as m
 from testtools.matchers import Contains, Equals
 
+from snapcraft_legacy.internal.cache import FileCache
 from snapcraft_legacy.internal.sources import _base, errors
+from snapcraft_legacy.internal.sources._script import Script
 from tests.legacy import unit
 
 
@@ -121,3 +125,82 @@ class TestFileBase(unit.TestCase):
         self.assertThat(mock_urlretrieve.call_count, Equals(1))
         self.assertThat(mock_urlretrieve.call_args[0][0], Equals(file_src.source))
         self.assertThat(mock_urlretrieve.call_args[0][1], Equals(file_src.file))
+
+
+class TestFileBaseDownloadCache(unit.FakeFileHTTPServerBasedTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.source = "http://{}:{}/test.tar".format(*self.server.server_address)
+        self.source_checksum = "sha256/{}".format(
+            hashlib.sha256(b"Test fake file").hexdigest()
+        )
+        os.makedirs("src")
+
+        # Make materializing cached files deterministic.
+        patcher = mock.patch("fcntl.ioctl", side_effect=OSError("not supported"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fail_hash(self, *args, **kwargs):
+        self.fail("the downloaded file was hashed again")
+
+    def test_download_hashes_once(self):
+        file_src = _base.FileBase(
+            self.source, "src", source_checksum=self.source_checksum
+        )
+
+        with (
+            mock.patch(
+                "snapcraft_legacy.internal.sources._checksum.calculate_hash",
+                side_effect=self._fail_hash,
+            ),
+            mock.patch(
+                "snapcraft_legacy.internal.cache._file.calculate_hash",
+                side_effect=self._fail_hash,
+            ),
+        ):
+            downloaded_file = file_src.download()
+
+        self.assertThat(downloaded_file, Equals(os.path.join("src", "test.tar")))
+        self.assertThat(
+            FileCache().get(
+                algorithm="sha256", hash=self.source_checksum.split("/")[1]
+            ),
+            m.FileContains("Test fake file"),
+        )
+
+    def test_download_mismatch(self):
+        file_src = _base.FileBase(self.source, "src", source_checksum="sha256/mismatch")
+
+        self.assertRaises(errors.DigestDoesNotMatchError, file_src.download)
+
+    def test_download_cached_is_linked(self):
+        file_src = _base.FileBase(
+            self.source, "src", source_checksum=self.source_checksum
+        )
+        file_src.download()
+        os.remove(file_src.file)
+
+        with mock.patch("requests.get", side_effect=AssertionError("downloaded")):
+            downloaded_file = file_src.download()
+
+        cached_file = FileCache().get(
+            algorithm="sha256", hash=self.source_checksum.split("/")[1]
+        )
+        self.assertTrue(os.path.samefile(downloaded_file, cached_file))
+        self.assertThat(downloaded_file, m.FileContains("Test fake file"))
+
+    def test_download_cached_script_is_copied(self):
+        file_src = Script(self.source, "src", source_checksum=self.source_checksum)
+        file_src.download()
+        os.remove(file_src.file)
+
+        downloaded_file = file_src.download()
+
+        cached_file = FileCache().get(
+            algorithm="sha256", hash=self.source_checksum.split("/")[1]
+        )
+        self.assertFalse(os.path.samefile(downloaded_file, cached_file))
+        self.assertTrue(os.access(downloaded_file, os.X_OK))
+        self.assertFalse(os.access(cached_file, os.X_OK))
@@ -0,0 +1,135 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from snapcraft_legacy.internal.sources import _digests
+
+
+def _no_ignore(directory, files, check=False):
+    return []
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / "source"
+    (source / "dir" / "nested").mkdir(parents=True)
+    (source / "file").write_text("file")
+    (source / "dir" / "nested" / "file").write_text("nested")
+    (source / "link").symlink_to("file")
+    return str(source)
+
+
+def test_compute_tree(source):
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+
+    assert sorted(tree.files) == ["dir/nested/file", "file", "link"]
+    assert sorted(tree.directories) == [".", "dir", "dir/nested"]
+    assert tree.get_digest("link") == "symlink:file"
+    assert tree.get_digest("missing") is None
+
+
+def test_compute_tree_ignore(source):
+    def ignore(directory, files, check=False):
+        assert check
+        return [f for f in files if f == "nested"]
+
+    tree = _digests.compute_tree(source, ignore=ignore)
+
+    assert sorted(tree.files) == ["file", "link"]
+    assert sorted(tree.directories) == [".", "dir"]
+
+
+def test_compute_tree_modified_file(source):
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+    with open(os.path.join(source, "dir", "nested", "file"), "w") as f:
+        f.write("modified")
+
+    modified = _digests.compute_tree(source, ignore=_no_ignore)
+
+    assert modified.get_digest("file") == tree.get_digest("file")
+    for path in ["dir/nested/file", "dir/nested", "dir", "."]:
+        assert modified.get_digest(path) != tree.get_digest(path)
+
+
+def test_compute_tree_touched_file(source):
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+    os.utime(os.path.join(source, "file"), ns=(0, 0))
+
+    touched = _digests.compute_tree(source, ignore=_no_ignore)
+
+    assert touched.files["file"][0] != tree.files["file"][0]
+    assert touched.directories == tree.directories
+
+
+def test_compute_tree_reuses_digests(source, mocker):
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+    os.utime(os.path.join(source, "file"), ns=(0, 0))
+    hash_file = mocker.spy(_digests, "_hash_file")
+
+    _digests.compute_tree(source, ignore=_no_ignore, previous=tree)
+
+    hash_file.assert_called_once_with(os.path.join(source, "file"))
+
+
+def test_compute_tree_rewritten_with_mtime_restored(source):
+    path = os.path.join(source, "file")
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+    stat = os.stat(path)
+    with open(path, "w") as f:
+        f.write("FILE")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    rewritten = _digests.compute_tree(source, ignore=_no_ignore, previous=tree)
+
+    assert rewritten.get_digest("file") != tree.get_digest("file")
+
+
+def test_save_and_load(source, tmp_path):
+    tree = _digests.compute_tree(source, ignore=_no_ignore)
+    tree.target_mtime_ns = 42
+    path = str(tmp_path / "pull.digests")
+
+    tree.save(path)
+    loaded = _digests.DigestTree.load(path)
+
+    assert loaded.files == tree.files
+    assert loaded.directories == tree.directories
+    assert loaded.target_mtime_ns == 42
+
+
+@pytest.mark.parametrize("contents", ["", "{", "[]", '{"format": 0}', '{"format": 1}'])
+def test_load_invalid(tmp_path, contents):
+    path = tmp_path / "pull.digests"
+    path.write_text(contents)
+
+    assert _digests.DigestTree.load(str(path)) is None
+
+
+def test_load_missing(tmp_path):
+    assert _digests.DigestTree.load(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.parametrize("value,enabled", [(None, False), ("n", False), ("y", True)])
+def test_content_digests_enabled(monkeypatch, value, enabled):
+    if value is None:
+        monkeypatch.delenv(_digests.CONTENT_DIGESTS_ENVIRONMENT_VARIABLE, raising=False)
+    else:
+        monkeypatch.setenv(_digests.CONTENT_DIGESTS_ENVIRONMENT_VARIABLE, value)
+
+    assert _digests.content_digests_enabled() is enabled
@@ -19,6 +19,7 @@ import os
 import shutil
 from unittest import mock
 
+import pytest
 from testtools.matchers import DirExists, Equals, FileContains, FileExists, Not
 
 from snapcraft_legacy.internal import common, errors, sources
@@ -385,3 +386,65 @@ class TestLocalUpdateSnapcraftYaml:
         os.utime(snapcraft_source_path, (access_time, modify_time + 1))
 
         assert not local.check("reference")
+
+
+@pytest.fixture
+def local_digests(tmp_work_path, monkeypatch):
+    monkeypatch.setenv("SNAPCRAFT_CONTENT_DIGESTS", "y")
+    os.makedirs(os.path.join("src", "dir"))
+    with open(os.path.join("src", "dir", "file"), "w") as f:
+        f.write("1")
+
+    local = sources.Local("src", "destination")
+    local.pull()
+    with open("reference", "w") as f:
+        f.write("")
+    os.utime("reference", (1000, 1000))
+    local.record("reference")
+    return local
+
+
+def _touch(path):
+    os.utime(path, (2000, 2000))
+
+
+def test_touched_file_is_not_updated(local_digests):
+    _touch(os.path.join("src", "dir", "file"))
+
+    assert not local_digests.check("reference")
+
+
+def test_modified_file_is_updated(local_digests):
+    with open(os.path.join("src", "dir", "file"), "w") as f:
+        f.write("2")
+    _touch(os.path.join("src", "dir", "file"))
+
+    assert local_digests.check("reference")
+
+    local_digests.update()
+    assert open(os.path.join("destination", "dir", "file")).read() == "2"
+
+
+def test_new_file_is_updated(local_digests):
+    with open(os.path.join("src", "dir", "new"), "w") as f:
+        f.write("new")
+    _touch(os.path.join("src", "dir", "new"))
+
+    assert local_digests.check("reference")
+
+
+def test_digests_ignored_if_target_changed(local_digests):
+    _touch(os.path.join("src", "dir", "file"))
+    os.utime("reference", (1500, 1500))
+
+    assert local_digests.check("reference")
+
+
+def test_digests_disabled(local_digests, monkeypatch):
+    monkeypatch.setenv("SNAPCRAFT_CONTENT_DIGESTS", "n")
+    _touch(os.path.join("src", "dir", "file"))
+
+    assert local_digests.check("reference")
+
+    local_digests.record("reference")
+    assert not os.path.exists(sources.get_digests_file("reference"))
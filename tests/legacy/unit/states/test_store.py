@@ -0,0 +1,115 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright (C) 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from snapcraft_legacy import yaml_utils
+from snapcraft_legacy.internal import states
+from snapcraft_legacy.internal.states import _store
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / "prime")
+
+
+@pytest.fixture
+def large_prime_state(prime_state):
+    prime_state.files = {"usr/lib/lib{}.so".format(i) for i in range(10000)}
+    prime_state.files.add("usr/share/\u00fcber")
+    prime_state.directories = {"usr", "usr/lib", "usr/share"}
+    return prime_state
+
+
+def test_write_read_state(state_file, large_prime_state):
+    states.write_state(state_file, large_prime_state)
+
+    state = states.read_state(state_file)
+
+    assert state == large_prime_state
+    assert state.files == large_prime_state.files
+    assert state.primed_stage_packages == set()
+
+
+@pytest.mark.parametrize("state", [{}, "pull", None])
+def test_write_read_other_values(state_file, state):
+    states.write_state(state_file, state)
+
+    assert states.read_state(state_file) == state
+
+
+def test_state_file_is_compact(state_file, large_prime_state):
+    states.write_state(state_file, large_prime_state)
+
+    assert os.path.getsize(state_file) < len(yaml_utils.dump(large_prime_state)) / 4
+
+
+def test_file_lists_loaded_lazily(state_file, large_prime_state, mocker):
+    states.write_state(state_file, large_prime_state)
+    decode_paths = mocker.spy(_store, "_decode_paths")
+
+    state = states.read_state(state_file)
+    state.diff_properties_of_interest({})
+
+    decode_paths.assert_not_called()
+    assert "usr/lib" in state.directories
+    assert decode_paths.call_count == 1
+    assert "usr/lib/lib1.so" in state.files
+    assert decode_paths.call_count == 2
+
+
+def test_lazy_attributes_dumped_as_yaml(state_file, large_prime_state):
+    states.write_state(state_file, large_prime_state)
+
+    state = states.read_state(state_file)
+
+    assert yaml_utils.load(yaml_utils.dump(state)) == large_prime_state
+    assert "_lazy_attributes" not in repr(state)
+
+
+def test_yaml_state_read(state_file, large_prime_state):
+    contents = yaml_utils.dump(large_prime_state)
+    with open(state_file, "w") as f:
+        f.write(contents)
+    os.utime(state_file, ns=(1_000_000_000, 2_000_000_000))
+
+    assert states.read_state(state_file) == large_prime_state
+
+    with open(state_file) as f:
+        assert f.read() == contents
+    assert os.stat(state_file).st_mtime_ns == 2_000_000_000
+
+
+def test_yaml_state_converted_when_written(state_file, large_prime_state):
+    with open(state_file, "w") as f:
+        f.write(yaml_utils.dump(large_prime_state))
+
+    states.write_state(state_file, states.read_state(state_file))
+
+    with open(state_file, "rb") as f:
+        assert f.read().startswith(_store._MAGIC)
+    assert states.read_state(state_file) == large_prime_state
+
+
+def test_truncated_state(state_file, large_prime_state):
+    states.write_state(state_file, large_prime_state)
+    with open(state_file, "rb") as f:
+        contents = f.read()
+
+    with pytest.raises(ValueError):
+        _store.decode_state(contents[:-10])
@@ -154,13 +154,69 @@ class TestLinkOrCopy(unit.TestCase):
 
         with mock.patch("os.link") as mock_link:
             mock_link.side_effect = link_and_ioerror
-            file_utils.link_or_copy("1", "foo/1")
+            self.assertFalse(file_utils.link_or_copy("1", "foo/1"))
+
+    def test_link_file(self):
+        self.assertTrue(file_utils.link_or_copy("1", "foo/1"))
+        self.assertThat(os.stat("foo/1").st_ino, Equals(os.stat("1").st_ino))
+
+    def test_copy_symlink(self):
+        os.symlink("1", "link")
+
+        self.assertFalse(file_utils.link_or_copy("link", "foo/link"))
+        self.assertThat(os.readlink("foo/link"), Equals("1"))
 
     def test_copy_nested_file(self):
         file_utils.link_or_copy("foo/bar/baz/4", "foo2/bar/baz/4")
         self.assertTrue(os.path.isfile("foo2/bar/baz/4"))
 
 
+class TestCloneLinkOrCopy(unit.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        with open("source", "w") as source_file:
+            source_file.write("contents")
+        os.chmod("source", 0o444)
+        with open("destination", "w") as destination_file:
+            destination_file.write("replaced")
+
+    def _assert_materialized(self):
+        with open("destination") as destination_file:
+            self.assertThat(destination_file.read(), Equals("contents"))
+
+    @mock.patch("fcntl.ioctl")
+    def test_clone(self, mock_ioctl):
+        file_utils.clone_link_or_copy("source", "destination")
+
+        self.assertThat(mock_ioctl.call_count, Equals(1))
+        self.assertThat(mock_ioctl.call_args[0][1], Equals(file_utils._FICLONE))
+        self.assertThat(os.stat("destination").st_nlink, Equals(1))
+        self.assertThat(os.stat("destination").st_mode & 0o777, Equals(0o444))
+
+    @mock.patch("fcntl.ioctl", side_effect=OSError("not supported"))
+    def test_link_if_clone_unsupported(self, mock_ioctl):
+        file_utils.clone_link_or_copy("source", "destination")
+
+        self._assert_materialized()
+        self.assertTrue(os.path.samefile("source", "destination"))
+
+    @mock.patch("fcntl.ioctl", side_effect=OSError("not supported"))
+    def test_copy_if_link_not_allowed(self, mock_ioctl):
+        file_utils.clone_link_or_copy("source", "destination", allow_link=False)
+
+        self._assert_materialized()
+        self.assertFalse(os.path.samefile("source", "destination"))
+
+    @mock.patch("os.link", side_effect=OSError("cross-device link"))
+    @mock.patch("fcntl.ioctl", side_effect=OSError("not supported"))
+    def test_copy_if_link_fails(self, mock_ioctl, mock_link):
+        file_utils.clone_link_or_copy("source", "destination")
+
+        self._assert_materialized()
+        self.assertFalse(os.path.samefile("source", "destination"))
+
+
 class RequiresCommandSuccessTestCase(unit.TestCase):
     @mock.patch("subprocess.check_call")
     def test_requires_command_works(self, mock_check_call):
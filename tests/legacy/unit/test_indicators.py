@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import os
 from unittest.mock import patch
 
@@ -99,6 +100,27 @@ class IndicatorsDownloadTests(unit.FakeFileHTTPServerBasedTestCase):
 
         self.assertTrue(os.path.exists(self.dest_file))
 
+    def test_download_request_stream_hasher(self):
+        hasher = hashlib.sha256()
+        request = requests.get(self.source, stream=True, allow_redirects=True)
+        indicators.download_requests_stream(request, self.dest_file, hasher=hasher)
+
+        with open(self.dest_file, "rb") as dest_file:
+            expected = hashlib.sha256(dest_file.read()).hexdigest()
+        self.assertEqual(hasher.hexdigest(), expected)
+
+    def test_download_request_stream_hasher_resumed(self):
+        with open(self.dest_file, "wb") as dest_file:
+            dest_file.write(b"partial")
+        hasher = hashlib.sha256()
+        request = requests.get(self.source, stream=True, allow_redirects=True)
+        indicators.download_requests_stream(request, self.dest_file, hasher=hasher)
+
+        with open(self.dest_file, "rb") as dest_file:
+            contents = dest_file.read()
+        self.assertTrue(contents.startswith(b"partial"))
+        self.assertEqual(hasher.hexdigest(), hashlib.sha256(contents).hexdigest())
+
     def test_download_urllib_source(self):
         indicators.download_urllib_source(self.source, self.dest_file)
 
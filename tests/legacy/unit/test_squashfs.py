@@ -0,0 +1,287 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import struct
+from unittest import mock
+
+import fixtures
+from testtools.matchers import Equals, StartsWith
+
+import tests.legacy
+from snapcraft_legacy.internal import squashfs
+from tests.legacy import unit
+
+_BLOCK_SIZE = 4096
+
+
+class _Symlink(str):
+    pass
+
+
+class _ImageWriter:
+    """Write uncompressed squashfs images for a tree of files."""
+
+    def __init__(self, *, compression=1):
+        self.compression = compression
+        self.data = bytearray(b"\0" * 96)
+        self.inodes = bytearray()
+        self.directories = bytearray()
+        self.inode_count = 0
+
+    @staticmethod
+    def _reference(position):
+        # Metadata is split into uncompressed blocks of 8192 bytes and
+        # a 2 byte header.
+        return (position // 8192) * 8194, position % 8192
+
+    @staticmethod
+    def _pack_metadata(table):
+        packed = bytearray()
+        for start in range(0, len(table), 8192):
+            block = table[start : start + 8192]
+            packed += struct.pack("<H", 0x8000 | len(block)) + block
+        return bytes(packed)
+
+    def _add_inode(self, inode_type, body):
+        self.inode_count += 1
+        block, offset = self._reference(len(self.inodes))
+        self.inodes += struct.pack("<HHHHII", inode_type, 0o755, 0, 0, 0, 0)
+        self.inodes += body
+        return block, offset, self.inode_count
+
+    def _add_file(self, content):
+        blocks_start = len(self.data)
+        block_sizes = []
+        for start in range(0, len(content), _BLOCK_SIZE):
+            block = content[start : start + _BLOCK_SIZE]
+            if block.count(0) == len(block):
+                block_sizes.append(0)
+            else:
+                self.data += block
+                block_sizes.append(len(block) | 1 << 24)
+        body = struct.pack("<IIII", blocks_start, 0xFFFFFFFF, 0, len(content))
+        body += struct.pack("<{}I".format(len(block_sizes)), *block_sizes)
+        return self._add_inode(2, body), 2
+
+    def _add_directory(self, tree):
+        entries = []
+        for name, node in sorted(tree.items()):
+            if isinstance(node, dict):
+                entries.append((name, self._add_directory(node)))
+            elif isinstance(node, _Symlink):
+                body = struct.pack("<II", 1, len(node)) + node.encode()
+                entries.append((name, (self._add_inode(3, body), 3)))
+            else:
+                entries.append((name, self._add_file(node)))
+
+        start, offset = self._reference(len(self.directories))
+        listing = bytearray()
+        for name, ((block, inode_offset, number), inode_type) in entries:
+            listing += struct.pack("<III", 0, block, number)
+            listing += struct.pack("<HhHH", inode_offset, 0, inode_type, len(name) - 1)
+            listing += name.encode()
+        self.directories += listing
+
+        body = struct.pack("<IIHHI", start, 2, len(listing) + 3, offset, 0)
+        return self._add_inode(1, body), 1
+
+    def write(self, path, tree):
+        (block, offset, _), _ = self._add_directory(tree)
+
+        inode_table = len(self.data)
+        self.data += self._pack_metadata(self.inodes)
+        directory_table = len(self.data)
+        self.data += self._pack_metadata(self.directories)
+        end = len(self.data)
+
+        self.data[:96] = struct.pack(
+            "<IIIIIHHHHHHQQQQQQQQ",
+            0x73717368,
+            self.inode_count,
+            0,
+            _BLOCK_SIZE,
+            0,
+            self.compression,
+            12,
+            0,
+            1,
+            4,
+            0,
+            block << 16 | offset,
+            end,
+            end,
+            0xFFFFFFFFFFFFFFFF,
+            inode_table,
+            directory_table,
+            end,
+            0xFFFFFFFFFFFFFFFF,
+        )
+        with open(path, "wb") as image:
+            image.write(self.data)
+        return path
+
+
+class SquashFsReaderSnapTestCase(unit.TestCase):
+    def _get_snap_path(self, name):
+        return os.path.join(os.path.dirname(tests.legacy.__file__), "data", name)
+
+    def test_read_xz_snap(self):
+        with squashfs.SquashFsReader(
+            self._get_snap_path("test-snap-with-started-at.snap")
+        ) as snap_file:
+            self.assertThat(snap_file.listdir(""), Equals(["meta", "snap"]))
+            self.assertThat(
+                snap_file.read_file("meta/snap.yaml"), StartsWith(b"architectures:\n")
+            )
+            self.assertThat(
+                snap_file.read_file("snap/manifest.yaml"),
+                Equals(b"snapcraft-started-at: '2019-05-07T19:25:53.939041Z'\n"),
+            )
+
+    def test_read_gzip_snap(self):
+        with squashfs.SquashFsReader(
+            self._get_snap_path("test-snap.snap")
+        ) as snap_file:
+            self.assertThat(
+                snap_file.listdir("meta"), Equals(["snap.yaml", "snap.yaml~"])
+            )
+            self.assertThat(
+                snap_file.read_file("/meta/snap.yaml"),
+                StartsWith(b"architectures:\n"),
+            )
+
+    def test_read_fragment(self):
+        with squashfs.SquashFsReader(
+            self._get_snap_path("test-snap-with-icon.snap")
+        ) as snap_file:
+            self.assertThat(
+                snap_file.read_file("meta/gui/icon.svg"),
+                Equals(
+                    b'<svg width="256" height="256">\n'
+                    b'<rect width="256" height="256" style="fill:rgb(0,0,255)" />\n'
+                    b"</svg>"
+                ),
+            )
+
+    def test_invalid_snap(self):
+        self.assertRaises(
+            squashfs.SquashFsError,
+            squashfs.SquashFsReader,
+            self._get_snap_path("invalid.snap"),
+        )
+
+    def test_empty_file(self):
+        open("empty.snap", "w").close()
+
+        self.assertRaises(squashfs.SquashFsError, squashfs.SquashFsReader, "empty.snap")
+
+
+class SquashFsReaderTestCase(unit.TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.large_file = os.urandom(_BLOCK_SIZE) + bytes(_BLOCK_SIZE) + b"tail"
+        self.image_path = _ImageWriter().write(
+            "image.squashfs",
+            {
+                "meta": {
+                    "snap.yaml": b"name: foo\n",
+                    "gui": {"icon.png": b"png"},
+                    "link": _Symlink("snap.yaml"),
+                },
+                "large": self.large_file,
+                "empty": b"",
+                "absolute": _Symlink("/meta/gui"),
+                "relative": _Symlink("meta/../meta/gui/icon.png"),
+                "loop": _Symlink("loop"),
+                "many": {"file-{:04}-{}".format(i, "x" * 32): b"" for i in range(300)},
+            },
+        )
+        self.snap_file = squashfs.SquashFsReader(self.image_path)
+        self.addCleanup(self.snap_file.close)
+
+    def test_read_file(self):
+        self.assertThat(
+            self.snap_file.read_file("meta/snap.yaml"), Equals(b"name: foo\n")
+        )
+        self.assertThat(self.snap_file.read_file("meta/gui/icon.png"), Equals(b"png"))
+        self.assertThat(self.snap_file.read_file("empty"), Equals(b""))
+
+    def test_read_file_blocks(self):
+        self.assertThat(self.snap_file.read_file("large"), Equals(self.large_file))
+
+    def test_listdir(self):
+        self.assertThat(
+            self.snap_file.listdir(""),
+            Equals(["absolute", "empty", "large", "loop", "many", "meta", "relative"]),
+        )
+        self.assertThat(
+            self.snap_file.listdir("meta"), Equals(["gui", "link", "snap.yaml"])
+        )
+
+    def test_listdir_across_metadata_blocks(self):
+        names = self.snap_file.listdir("many")
+
+        self.assertThat(len(names), Equals(300))
+        self.assertThat(names[-1], Equals("file-0299-" + "x" * 32))
+
+    def test_symlinks(self):
+        self.assertThat(self.snap_file.read_file("meta/link"), Equals(b"name: foo\n"))
+        self.assertThat(self.snap_file.listdir("absolute"), Equals(["icon.png"]))
+        self.assertThat(self.snap_file.read_file("relative"), Equals(b"png"))
+        self.assertThat(self.snap_file.read_file("absolute/icon.png"), Equals(b"png"))
+
+    def test_symlink_loop(self):
+        self.assertRaises(squashfs.SquashFsError, self.snap_file.read_file, "loop")
+
+    def test_not_found(self):
+        self.assertRaises(
+            FileNotFoundError, self.snap_file.read_file, "meta/missing.yaml"
+        )
+        self.assertRaises(FileNotFoundError, self.snap_file.listdir, "missing")
+
+    def test_wrong_type(self):
+        self.assertRaises(IsADirectoryError, self.snap_file.read_file, "meta")
+        self.assertRaises(NotADirectoryError, self.snap_file.listdir, "large")
+        self.assertRaises(
+            NotADirectoryError, self.snap_file.read_file, "large/snap.yaml"
+        )
+
+    def test_unsupported_compression(self):
+        image_path = _ImageWriter(compression=99).write("unsupported.squashfs", {})
+
+        self.assertRaises(
+            squashfs.UnsupportedSquashFsError, squashfs.SquashFsReader, image_path
+        )
+
+    def test_decompression_error(self):
+        class ZstdError(Exception):
+            pass
+
+        zstandard = mock.Mock(ZstdError=ZstdError)
+        zstandard.ZstdDecompressor.return_value.decompress.side_effect = ZstdError(
+            "corrupt"
+        )
+        self.useFixture(fixtures.MockPatchObject(squashfs, "zstandard", zstandard))
+        decompress = squashfs._get_decompressor(6)
+
+        self.assertRaises(squashfs.SquashFsError, decompress, b"block", 8192)
+
+    def test_gzip_decompression_error(self):
+        decompress = squashfs._get_decompressor(1)
+
+        self.assertRaises(squashfs.SquashFsError, decompress, b"block", 8192)
@@ -49,6 +49,8 @@ def test_default_command(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -80,6 +82,8 @@ def test_default_command_destructive_mode(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -111,6 +115,8 @@ def test_default_command_use_lxd(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -143,6 +149,8 @@ def test_default_command_output(mocker, option):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -174,6 +182,8 @@ def test_default_command_http_proxy(mocker):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -205,6 +215,8 @@ def test_default_command_https_proxy(mocker):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -576,6 +576,8 @@ def test_lifecycle_command_pack(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -611,6 +613,8 @@ def test_lifecycle_command_pack_destructive_mode(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -646,6 +650,8 @@ def test_lifecycle_command_pack_use_lxd(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -681,6 +687,8 @@ def test_lifecycle_command_pack_enable_manifest(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -717,6 +725,8 @@ def test_lifecycle_command_pack_env_enable_manifest(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -752,6 +762,8 @@ def test_lifecycle_command_pack_manifest_image_information(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -788,6 +800,8 @@ def test_lifecycle_command_pack_env_manifest_image_information(mocker):
                 ua_token=None,
                 use_lxd=False,
                 destructive_mode=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -823,6 +837,8 @@ def test_lifecycle_command_pack_bind_ssh(mocker):
                 ua_token=None,
                 use_lxd=False,
                 destructive_mode=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -864,6 +880,8 @@ def test_lifecycle_command_pack_ua_token(mocker):
                 target_arch=None,
                 ua_token="my-ua-token",
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -900,6 +918,8 @@ def test_lifecycle_command_pack_env_ua_token(mocker):
                 target_arch=None,
                 ua_token="my-ua-token",
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -935,6 +955,8 @@ def test_lifecycle_command_pack_build_for(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -971,6 +993,8 @@ def test_lifecycle_command_pack_env_build_for(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1006,6 +1030,8 @@ def test_lifecycle_command_pack_debug(mocker):
                 provider=None,
                 http_proxy=None,
                 https_proxy=None,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1038,6 +1064,8 @@ def test_lifecycle_command_pack_output(mocker, option):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1069,6 +1097,8 @@ def test_lifecycle_command_pack_directory(mocker):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1100,6 +1130,8 @@ def test_lifecycle_command_pack_http_proxy(mocker):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1131,6 +1163,8 @@ def test_lifecycle_command_pack_https_proxy(mocker):
                 target_arch=None,
                 ua_token=None,
                 use_lxd=False,
+                pipelined=False,
+                incremental=False,
             )
         )
     ]
@@ -1,9 +1,11 @@
 import argparse
+import copy
 from textwrap import dedent
 
 import pytest
 
 from snapcraft import commands
+from snapcraft.commands.status import get_tabulated_channel_map
 from snapcraft.store import channel_map
 from snapcraft_legacy.storeapi.v2.releases import Releases
 
@@ -224,7 +226,7 @@ def test_default(emitter):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -265,7 +267,7 @@ def test_following(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -289,7 +291,7 @@ def test_no_releases(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -320,7 +322,7 @@ def test_progressive(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -362,7 +364,7 @@ def test_arch(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=["s390x"],
             track=None,
         )
@@ -413,7 +415,7 @@ def test_multiple_arch(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=["s390x", "arm64"],
             track=None,
         )
@@ -438,7 +440,7 @@ def test_track(emitter, fake_store_get_status_map):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=["2.0"],
         )
@@ -459,7 +461,7 @@ def test_multi_track(emitter, fake_store_get_status_map):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=["2.0", "2.1"],
         )
@@ -514,7 +516,7 @@ def test_arch_and_track(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=["s390x"],
             track=["2.1"],
         )
@@ -560,7 +562,7 @@ def test_branch(emitter, fake_store_get_status_map, channel_map_result):
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -611,7 +613,7 @@ def test_progressive_branch(emitter, fake_store_get_status_map, channel_map_resu
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -641,7 +643,7 @@ def test_progressive_unknown(emitter, fake_store_get_status_map, channel_map_res
 
     cmd.run(
         argparse.Namespace(
-            name="test-snap",
+            name=["test-snap"],
             arch=None,
             track=None,
         )
@@ -661,6 +663,113 @@ def test_progressive_unknown(emitter, fake_store_get_status_map, channel_map_res
     )
 
 
+def test_tabulated_large_channel_map(mocker):
+    """Tabulate a channel map with 10000 mapped channels."""
+    architectures = ["amd64", "arm64", "armhf", "s390x"]
+    channels = []
+    mapped_channels = []
+    revisions = []
+    for track_number in range(50):
+        track = f"{track_number}.0"
+        track_channels = [
+            channel_map.SnapChannel(
+                name=f"{track}/{risk}",
+                track=track,
+                risk=risk,
+                branch=None,
+                fallback=None,
+            )
+            for risk in ["stable", "candidate", "beta", "edge"]
+        ] + [
+            channel_map.SnapChannel(
+                name=f"{track}/stable/fix{branch}",
+                track=track,
+                risk="stable",
+                branch=f"fix{branch}",
+                fallback=f"{track}/stable",
+            )
+            for branch in range(46)
+        ]
+        channels.extend(track_channels)
+        for architecture in architectures:
+            for channel in track_channels:
+                revision = len(revisions) + 1
+                revisions.append(
+                    channel_map.Revision(
+                        revision=revision,
+                        version=f"{revision}",
+                        architectures=[architecture],
+                    )
+                )
+                mapped_channels.append(
+                    channel_map.MappedChannel(
+                        channel=channel.name,
+                        revision=revision,
+                        architecture=architecture,
+                        expiration_date=None,
+                        progressive=channel_map.Progressive(
+                            paused=None, percentage=None, current_percentage=None
+                        ),
+                    )
+                )
+    snap_channel_map = channel_map.ChannelMap(
+        channel_map=mapped_channels,
+        revisions=revisions,
+        snap=channel_map.Snap(name="test-snap", channels=channels, tracks=[]),
+    )
+    build_index = mocker.spy(channel_map, "_build_index")
+
+    lines = get_tabulated_channel_map(
+        snap_channel_map, architectures=architectures, tracks=[]
+    ).splitlines()
+
+    assert len(mapped_channels) == 10000
+    assert len(lines) == 10001
+    assert lines[1].split() == ["0.0", "amd64", "stable", "1", "1", "-"]
+    assert lines[-1].split() == ["edge", "9954", "9954", "-"]
+    # Lookups reuse the indexes built with the channel map.
+    build_index.assert_not_called()
+
+
+@pytest.mark.usefixtures("memory_keyring")
+def test_multiple_snaps(emitter, fake_store_get_status_map, channel_map_result):
+    empty_channel_map_result = copy.deepcopy(channel_map_result)
+    empty_channel_map_result.channel_map = []
+
+    def get_channel_map(self, *, snap_name):
+        if snap_name == "empty-snap":
+            return empty_channel_map_result
+        return channel_map_result
+
+    fake_store_get_status_map.side_effect = get_channel_map
+
+    cmd = commands.StoreStatusCommand(None)
+
+    cmd.run(
+        argparse.Namespace(
+            name=["test-snap", "empty-snap", "test-snap"],
+            arch=None,
+            track=["2.0"],
+        )
+    )
+
+    # Duplicated names are requested once, in any order.
+    assert sorted(
+        c.kwargs["snap_name"] for c in fake_store_get_status_map.mock_calls
+    ) == ["empty-snap", "test-snap"]
+    emitter.assert_message(
+        "test-snap\n"
+        "Track    Arch    Channel    Version    Revision    Progress\n"
+        "2.0      amd64   stable     -          -           -\n"
+        "                 candidate  -          -           -\n"
+        "                 beta       10         18          -\n"
+        "                 edge       ↑          ↑           -\n"
+        "\n"
+        "empty-snap\n"
+        "This snap has no released revisions"
+    )
+
+
 #######################
 # List Tracks Command #
 #######################
@@ -7,6 +7,7 @@ import craft_cli.errors
 import pytest
 
 from snapcraft import cli, commands
+from snapcraft.commands import upload
 from snapcraft.commands.upload import ComponentOption
 from tests import unit
 
@@ -17,14 +18,20 @@ from tests import unit
 
 @pytest.fixture(autouse=True)
 def fake_store_client_upload_file(mocker):
+    # return a different upload_id for each file, as files can be uploaded
+    # concurrently in any order
+    upload_ids = {
+        ".snap": "2ecbfac1-3448-4e7d-85a4-7919b999f120",
+        ".comp": "227a7e65-b29f-4e62-af1c-c1969169d396",
+    }
+
+    def _upload_file(self, *, filepath, monitor_callback):
+        return upload_ids.get(filepath.suffix, f"{filepath.name}-upload-id")
+
     fake_client = mocker.patch(
-        "craft_store.BaseClient.upload_file",
+        "snapcraft.store.StoreClientCLI.upload_file",
         autospec=True,
-        # return a different upload_id for each upload
-        side_effect=[
-            "2ecbfac1-3448-4e7d-85a4-7919b999f120",
-            "227a7e65-b29f-4e62-af1c-c1969169d396",
-        ],
+        side_effect=_upload_file,
     )
     return fake_client
 
@@ -95,7 +102,7 @@ def test_default(
 
     cmd.run(
         argparse.Namespace(
-            snap_file=snap_file,
+            snap_file=[snap_file],
             channels=None,
             component=[],
         )
@@ -132,7 +139,7 @@ def test_built_at(
 
     cmd.run(
         argparse.Namespace(
-            snap_file=snap_file_with_started_at,
+            snap_file=[snap_file_with_started_at],
             channels=None,
             component=[],
         )
@@ -161,7 +168,7 @@ def test_default_channels(
 
     cmd.run(
         argparse.Namespace(
-            snap_file=snap_file,
+            snap_file=[snap_file],
             channels="stable,edge",
             component=[],
         )
@@ -190,7 +197,7 @@ def test_invalid_file():
     with pytest.raises(craft_cli.errors.ArgumentParsingError) as raised:
         cmd.run(
             argparse.Namespace(
-                snap_file="invalid.snap",
+                snap_file=["invalid.snap"],
                 channels=None,
                 component=[],
             )
@@ -324,3 +331,133 @@ def test_components(
         )
     ]
     emitter.assert_message("Revision 10 created for 'test-snap-with-component'")
+
+
+@pytest.mark.usefixtures("memory_keyring")
+def test_components_report_throughput(
+    emitter,
+    fake_store_notify_upload,
+    fake_store_verify_upload,
+    snap_file_with_component,
+    component_file,
+):
+    cmd = commands.StoreUploadCommand(None)
+
+    cmd.run(
+        argparse.Namespace(
+            snap_file=[snap_file_with_component],
+            channels=None,
+            component=[ComponentOption(f"test-component={component_file}")],
+        )
+    )
+
+    emitter.assert_progress(
+        r"Uploaded 'test-snap-with-component.snap': 0.02 MB in .*",
+        permanent=True,
+        regex=True,
+    )
+    emitter.assert_progress(
+        r"Uploaded 'test-snap-with-component\+test-component.comp': .*",
+        permanent=True,
+        regex=True,
+    )
+
+
+###################################
+# Upload command with many snaps #
+###################################
+
+
+@pytest.mark.usefixtures("memory_keyring")
+def test_multiple_snaps(
+    emitter,
+    fake_store_client_upload_file,
+    fake_store_notify_upload,
+    fake_store_verify_upload,
+    snap_file,
+    snap_file_with_started_at,
+):
+    fake_store_client_upload_file.side_effect = (
+        lambda self, *, filepath, monitor_callback: f"{filepath.name}-id"
+    )
+    fake_store_notify_upload.side_effect = lambda self, *, upload_id, **kwargs: (
+        11 if upload_id == "test-snap-with-started-at.snap-id" else 10
+    )
+    cmd = commands.StoreUploadCommand(None)
+
+    cmd.run(
+        argparse.Namespace(
+            snap_file=[snap_file, snap_file_with_started_at],
+            channels="stable",
+            component=[],
+        )
+    )
+
+    assert fake_store_verify_upload.mock_calls == [
+        call(ANY, snap_name="basic"),
+        call(ANY, snap_name="basic"),
+    ]
+    assert sorted(
+        fake_store_notify_upload.mock_calls, key=lambda c: c.kwargs["upload_id"]
+    ) == [
+        call(
+            ANY,
+            snap_name="basic",
+            upload_id="test-snap-with-started-at.snap-id",
+            built_at="2019-05-07T19:25:53.939041Z",
+            channels=["stable"],
+            snap_file_size=4096,
+            components=None,
+        ),
+        call(
+            ANY,
+            snap_name="basic",
+            upload_id="test-snap.snap-id",
+            built_at=None,
+            channels=["stable"],
+            snap_file_size=4096,
+            components=None,
+        ),
+    ]
+    assert [c.args[1] for c in emitter.interactions if c.args[0] == "message"] == [
+        "Revision 10 created for 'basic' and released to 'stable'",
+        "Revision 11 created for 'basic' and released to 'stable'",
+    ]
+
+
+def test_multiple_snaps_with_components(snap_file, snap_file_with_component):
+    cmd = commands.StoreUploadCommand(None)
+
+    with pytest.raises(craft_cli.errors.ArgumentParsingError) as raised:
+        cmd.run(
+            argparse.Namespace(
+                snap_file=[snap_file, snap_file_with_component],
+                channels=None,
+                component=[ComponentOption("test-component=foo.comp")],
+            )
+        )
+
+    assert str(raised.value) == (
+        "`--component` cannot be used when uploading more than one snap"
+    )
+
+
+def test_upload_progress(mocker, tmp_path):
+    progress_bar = mocker.patch("craft_cli.emit.progress_bar")
+    bar = progress_bar.return_value
+    files = [tmp_path / "a.snap", tmp_path / "b.comp"]
+    files[0].write_bytes(b"a" * 100)
+    files[1].write_bytes(b"b" * 50)
+
+    with upload._UploadProgress(files) as progress:
+        callbacks = [
+            progress.get_callback(f)(mocker.Mock(len=len(f.read_bytes()) + 10))
+            for f in files
+        ]
+        callbacks[0](mocker.Mock(bytes_read=60))
+        callbacks[1](mocker.Mock(bytes_read=50))
+        # The multipart overhead is not accounted for.
+        callbacks[0](mocker.Mock(bytes_read=110))
+
+    progress_bar.assert_called_once_with("Uploading...", 150, delta=True)
+    assert bar.advance.mock_calls == [call(60), call(50), call(40)]
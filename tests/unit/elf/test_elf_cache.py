@@ -0,0 +1,178 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from snapcraft.elf import ElfCache, ElfFile, elf_utils
+
+
+@pytest.fixture
+def elf_cache(new_dir):
+    return ElfCache(new_dir / "cache")
+
+
+@pytest.fixture
+def elf_binary(new_dir):
+    path = new_dir / "ls"
+    shutil.copy2("/bin/ls", path)
+    return path
+
+
+def _attributes(elf_file):
+    return {
+        "arch_tuple": elf_file.arch_tuple,
+        "interp": elf_file.interp,
+        "soname": elf_file.soname,
+        "versions": elf_file.versions,
+        "needed": {k: v.versions for k, v in elf_file.needed.items()},
+        "rpath": elf_file.rpath,
+        "runpath": elf_file.runpath,
+        "execstack_set": elf_file.execstack_set,
+        "is_dynamic": elf_file.is_dynamic,
+        "build_id": elf_file.build_id,
+        "has_debug_info": elf_file.has_debug_info,
+        "elf_type": elf_file.elf_type,
+    }
+
+
+def test_cache_miss_then_hit(mocker, elf_cache, elf_binary):
+    uncached = ElfFile(path=elf_binary)
+    first = ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    assert elf_cache.hits == 0
+    assert elf_cache.misses == 1
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    second = ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    assert extract.call_count == 0
+    assert elf_cache.hits == 1
+    assert elf_cache.misses == 1
+    assert _attributes(second) == _attributes(first) == _attributes(uncached)
+
+
+def test_cache_shared_by_new_instance(mocker, new_dir, elf_binary):
+    ElfFile(path=elf_binary, elf_cache=ElfCache(new_dir / "cache"))
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    other_cache = ElfCache(new_dir / "cache")
+    ElfFile(path=elf_binary, elf_cache=other_cache)
+
+    assert extract.call_count == 0
+    assert other_cache.hits == 1
+
+
+def test_cache_invalidated_on_change(mocker, elf_cache, elf_binary):
+    ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    stat = elf_binary.stat()
+    os.utime(elf_binary, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    assert extract.call_count == 1
+    assert elf_cache.misses == 2
+
+
+def test_cache_invalidated_on_edit_in_place(mocker, elf_cache, elf_binary):
+    ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    # Edit the file keeping its size and modification time.
+    stat = elf_binary.stat()
+    with elf_binary.open("r+b") as elf_file:
+        elf_file.seek(stat.st_size - 1)
+        elf_file.write(b"\xff")
+    os.utime(elf_binary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    assert extract.call_count == 1
+    assert elf_cache.misses == 2
+
+
+def test_cache_invalid_entry_is_ignored(mocker, elf_cache, elf_binary):
+    elf_cache.put(elf_binary, {"interp": "/foo"})
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    elf_file = ElfFile(path=elf_binary, elf_cache=elf_cache)
+
+    assert extract.call_count == 1
+    assert elf_file.interp != "/foo"
+
+
+def test_cache_corrupted_entry_is_a_miss(elf_cache, elf_binary):
+    elf_cache.put(elf_binary, {})
+    for entry in (elf_cache.cache_dir).glob("*/*.json"):
+        entry.write_text("{not json")
+
+    assert elf_cache.get(elf_binary) is None
+    assert elf_cache.misses == 1
+
+
+def test_prune_evicts_least_recently_used(new_dir):
+    elf_cache = ElfCache(new_dir / "cache")
+    files = []
+    for i in range(3):
+        path = new_dir / f"file{i}"
+        path.write_text(str(i))
+        elf_cache.put(path, {"index": i})
+        files.append(path)
+
+    # Mark the entries as used in order.
+    for i, path in enumerate(files):
+        os.utime(elf_cache._get_entry_path(path), (i, i))
+
+    # Only leave room for one entry.
+    elf_cache.max_size = elf_cache._get_entry_path(files[2]).stat().st_size
+
+    assert elf_cache.prune() == 2
+    assert elf_cache.get(files[0]) is None
+    assert elf_cache.get(files[1]) is None
+    assert elf_cache.get(files[2]) == {"index": 2}
+
+
+def test_prune_without_new_entries_does_nothing(mocker, new_dir):
+    elf_cache = ElfCache(new_dir / "cache", max_size=1)
+    path = new_dir / "file"
+    path.write_text("data")
+    elf_cache.put(path, {"data": 1})
+
+    assert elf_cache.prune() == 1
+    assert elf_cache.get(path) is None
+
+    # Nothing was stored since, so the cache is not scanned again.
+    scandir = mocker.spy(os, "scandir")
+    assert elf_cache.prune() == 0
+    assert scandir.call_count == 0
+
+
+def test_get_elf_files_uses_cache(mocker, elf_cache, elf_binary):
+    elf_utils.get_elf_files_from_list(Path(), [elf_binary.name], elf_cache=elf_cache)
+
+    extract = mocker.spy(ElfFile, "_extract_attributes")
+    elf_files = elf_utils.get_elf_files_from_list(
+        Path(), [elf_binary.name], elf_cache=elf_cache
+    )
+
+    assert extract.call_count == 0
+    assert [e.path for e in elf_files] == [Path(elf_binary.name)]
+    assert elf_cache.hits == 1
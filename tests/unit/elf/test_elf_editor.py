@@ -0,0 +1,112 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from snapcraft.elf import ElfFile, _elf_editor
+
+requires_patchelf = pytest.mark.skipif(
+    shutil.which("patchelf") is None, reason="patchelf is not installed"
+)
+
+
+@pytest.fixture
+def elf_path(new_dir):
+    path = Path(new_dir, "elf")
+    shutil.copy2("/bin/true", path)
+    return path
+
+
+@pytest.fixture
+def rpath_elf_path(elf_path):
+    subprocess.check_call(
+        ["patchelf", "--set-rpath", "/a/long/runpath:/another/runpath", elf_path]
+    )
+    return elf_path
+
+
+def test_set_interpreter(elf_path):
+    assert _elf_editor.edit_elf_file(elf_path, interpreter="/lib/ld.so") is True
+
+    elf_file = ElfFile(path=elf_path)
+    assert elf_file.interp == "/lib/ld.so"
+    # The rest of the file is untouched.
+    assert elf_path.stat().st_size == Path("/bin/true").stat().st_size
+
+
+def test_set_interpreter_too_long(elf_path):
+    original = elf_path.read_bytes()
+
+    assert _elf_editor.edit_elf_file(elf_path, interpreter="/" + "x" * 256) is False
+    assert elf_path.read_bytes() == original
+
+
+def test_set_rpath_without_rpath(elf_path):
+    original = elf_path.read_bytes()
+
+    assert _elf_editor.edit_elf_file(elf_path, rpath="/foo") is False
+    assert elf_path.read_bytes() == original
+
+
+@requires_patchelf
+def test_set_rpath(rpath_elf_path):
+    assert _elf_editor.edit_elf_file(rpath_elf_path, rpath="/lib/x") is True
+
+    elf_file = ElfFile(path=rpath_elf_path)
+    assert elf_file.rpath == "/lib/x"
+    # As with --force-rpath, DT_RUNPATH is turned into DT_RPATH.
+    assert elf_file.runpath == ""
+
+
+@requires_patchelf
+def test_set_rpath_too_long(rpath_elf_path):
+    original = rpath_elf_path.read_bytes()
+
+    assert _elf_editor.edit_elf_file(rpath_elf_path, rpath="/" + "x" * 256) is False
+    assert rpath_elf_path.read_bytes() == original
+
+
+def test_set_no_default_lib(elf_path):
+    assert ElfFile(path=elf_path).no_default_lib is False
+
+    assert _elf_editor.edit_elf_file(elf_path, no_default_lib=True) is True
+
+    assert ElfFile(path=elf_path).no_default_lib is True
+
+
+def test_not_an_elf_file(new_dir):
+    path = Path(new_dir, "not-elf")
+    path.write_bytes(b"\x7fELF")
+
+    assert _elf_editor.edit_elf_file(path, interpreter="/lib/ld.so") is False
+
+
+def test_hard_link_is_broken(new_dir, elf_path):
+    link_path = Path(new_dir, "link")
+    os.link(elf_path, link_path)
+
+    assert _elf_editor.edit_elf_file(elf_path, interpreter="/lib/ld.so") is True
+
+    assert elf_path.stat().st_nlink == 1
+    assert elf_path.stat().st_mode == link_path.stat().st_mode
+    assert ElfFile(path=elf_path).interp == "/lib/ld.so"
+    assert ElfFile(path=link_path).interp != "/lib/ld.so"
+    assert sorted(os.listdir(new_dir)) == ["elf", "link"]
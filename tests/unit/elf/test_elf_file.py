@@ -14,12 +14,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import shutil
 from pathlib import Path
 
 import pytest
 
 from snapcraft import elf
-from snapcraft.elf import elf_utils, errors
+from snapcraft.elf import _elf_file, elf_utils, errors
 from snapcraft.elf._elf_file import _Library
 
 
@@ -81,6 +83,8 @@ class TestGetLibraries:
     @pytest.fixture(autouse=True)
     def setup_fixture(self, mocker, fake_tools):
         mocker.patch("os.path.exists", return_value=True)
+        # Exercise the ldd code path.
+        mocker.patch("snapcraft.elf._elf_file._resolve_libraries", return_value=None)
 
     def test_get_libraries(self, new_dir, fake_elf, fake_libs):
         elf_file = fake_elf("fake_elf-2.23")
@@ -201,6 +205,141 @@ class TestGetLibraries:
         assert libs == {fake_libs["moo.so.2"]}
 
 
+class TestResolveLibraries:
+    """In-process library dependency resolution."""
+
+    @pytest.fixture
+    def ls_elf(self, new_dir):
+        shutil.copy2("/bin/ls", new_dir / "ls")
+        return elf.ElfFile(path=new_dir / "ls")
+
+    def test_matches_ldd(self, ls_elf):
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries
+        assert libraries == _elf_file._ldd(ls_elf.path, [])
+
+    def test_ld_library_path_is_preferred(self, new_dir, ls_elf):
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+        soname, host_path = next(iter(libraries.items()))
+        lib_dir = new_dir / "lib"
+        lib_dir.mkdir()
+        shutil.copy2(host_path, lib_dir / soname)
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf,
+            ld_library_paths=[str(lib_dir)],
+            arch_triplet=elf_utils.get_arch_triplet(),
+        )
+
+        assert libraries[soname] == str(lib_dir / soname)
+        assert libraries == _elf_file._ldd(ls_elf.path, [str(lib_dir)])
+
+    def test_incompatible_library_is_skipped(self, new_dir, ls_elf):
+        soname = next(iter(ls_elf.needed))
+        lib_dir = new_dir / "lib"
+        lib_dir.mkdir()
+        (lib_dir / soname).write_bytes(b"\x7fELF\x00")
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf,
+            ld_library_paths=[str(lib_dir)],
+            arch_triplet=elf_utils.get_arch_triplet(),
+        )
+
+        assert libraries[soname] != str(lib_dir / soname)
+
+    def test_missing_library(self, ls_elf):
+        ls_elf.needed["libmissing.so.9"] = _elf_file._NeededLibrary(
+            name="libmissing.so.9"
+        )
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries["libmissing.so.9"] == "libmissing.so.9"
+
+    def test_rpath_origin(self, new_dir, ls_elf):
+        soname = next(iter(ls_elf.needed))
+        host_path = _elf_file._ldd(ls_elf.path, [])[soname]
+        lib_dir = new_dir / "lib"
+        lib_dir.mkdir()
+        shutil.copy2(host_path, lib_dir / soname)
+        ls_elf.rpath = "$ORIGIN/lib"
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries[soname] == str(lib_dir / soname)
+
+    def test_runpath_overrides_rpath(self, new_dir, ls_elf):
+        soname = next(iter(ls_elf.needed))
+        host_path = _elf_file._ldd(ls_elf.path, [])[soname]
+        lib_dir = new_dir / "lib"
+        lib_dir.mkdir()
+        shutil.copy2(host_path, lib_dir / soname)
+        ls_elf.rpath = "$ORIGIN/lib"
+        ls_elf.runpath = "/nonexistent"
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries[soname] == host_path
+
+    def test_no_default_lib(self, ls_elf):
+        ls_elf.no_default_lib = True
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf,
+            ld_library_paths=[],
+            arch_triplet=elf_utils.get_arch_triplet(),
+        )
+
+        assert libraries == {soname: soname for soname in ls_elf.needed}
+
+    @pytest.mark.parametrize("rpath", ["$LIB/foo", "${PLATFORM}"])
+    def test_unsupported_tokens_fall_back(self, ls_elf, rpath):
+        ls_elf.rpath = rpath
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries is None
+
+    def test_foreign_arch_falls_back(self, ls_elf):
+        ls_elf.arch_tuple = ("ELFCLASS64", "ELFDATA2MSB", "EM_S390")
+
+        libraries = _elf_file._resolve_libraries(
+            ls_elf, ld_library_paths=[], arch_triplet=elf_utils.get_arch_triplet()
+        )
+
+        assert libraries is None
+
+    def test_ld_so_conf(self, new_dir):
+        conf_dir = new_dir / "ld.so.conf.d"
+        conf_dir.mkdir()
+        (conf_dir / "b.conf").write_text("/opt/b\n")
+        (conf_dir / "a.conf").write_text("# comment\n/opt/a1:/opt/a2 /opt/a3\n")
+        conf = new_dir / "ld.so.conf"
+        conf.write_text("/opt/first\ninclude ld.so.conf.d/*.conf\nhwcap 0 foo\n")
+
+        assert _elf_file._get_ld_so_conf_paths.__wrapped__(conf) == [
+            "/opt/first",
+            "/opt/a1",
+            "/opt/a2",
+            "/opt/a3",
+            "/opt/b",
+        ]
+
+
 class TestLibrary:
     """Verify the _Library class."""
 
@@ -333,3 +472,69 @@ class TestSonameCache:
         with pytest.raises(EnvironmentError) as raised:
             soname_cache[key] = Path("/soname.so")
             assert str(raised.value).startswith(partial_message)
+
+    @pytest.fixture
+    def library_tree(self, new_dir):
+        root = new_dir / "root"
+        for library in ["lib/libfoo.so.1", "usr/lib/libfoo.so.1", "lib/libbar.so.2"]:
+            (root / library).parent.mkdir(parents=True, exist_ok=True)
+            (root / library).touch()
+        # Make the tree old enough to be persisted.
+        for directory in [root, root / "lib", root / "usr", root / "usr/lib"]:
+            os.utime(directory, (0, 0))
+        return root
+
+    def test_find(self, library_tree):
+        soname_cache = elf.SonameCache()
+
+        assert sorted(soname_cache.find(library_tree, "libfoo.so.1")) == [
+            library_tree / "lib/libfoo.so.1",
+            library_tree / "usr/lib/libfoo.so.1",
+        ]
+        assert soname_cache.find(library_tree, "libbaz.so.1") == []
+
+    def test_find_walks_once(self, mocker, library_tree):
+        soname_cache = elf.SonameCache()
+        walk = mocker.spy(os, "walk")
+
+        soname_cache.find(library_tree, "libfoo.so.1")
+        soname_cache.find(library_tree, "libbar.so.2")
+
+        assert walk.call_count == 1
+
+    def test_find_not_indexed(self, new_dir):
+        Path("libfoo").touch()
+        soname_cache = elf.SonameCache()
+
+        assert soname_cache.find(new_dir, "libfoo") == [new_dir / "libfoo"]
+
+    def test_find_persisted(self, mocker, new_dir, library_tree):
+        index_dir = new_dir / "index"
+        elf.SonameCache(index_dir=index_dir).find(library_tree, "libfoo.so.1")
+
+        walk = mocker.spy(os, "walk")
+        soname_cache = elf.SonameCache(index_dir=index_dir)
+
+        assert soname_cache.find(library_tree, "libbar.so.2") == [
+            library_tree / "lib/libbar.so.2"
+        ]
+        assert walk.call_count == 0
+
+    def test_find_persisted_outdated(self, new_dir, library_tree):
+        index_dir = new_dir / "index"
+        elf.SonameCache(index_dir=index_dir).find(library_tree, "libfoo.so.1")
+
+        (library_tree / "usr/lib/libbaz.so.3").touch()
+        soname_cache = elf.SonameCache(index_dir=index_dir)
+
+        assert soname_cache.find(library_tree, "libbaz.so.3") == [
+            library_tree / "usr/lib/libbaz.so.3"
+        ]
+
+    def test_find_recently_modified_not_persisted(self, new_dir):
+        Path("libfoo.so.1").touch()
+        index_dir = new_dir / "index"
+
+        elf.SonameCache(index_dir=index_dir).find(new_dir, "libfoo.so.1")
+
+        assert not index_dir.exists()
@@ -15,11 +15,12 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import shutil
 from pathlib import Path
 
 import pytest
 
-from snapcraft.elf import elf_utils
+from snapcraft.elf import ElfCache, elf_utils
 from snapcraft.errors import SnapcraftError
 
 
@@ -95,6 +96,65 @@ class TestGetElfFiles:
         elf_files = elf_utils.get_elf_files_from_list(new_dir, {"fifo"})
         assert elf_files == []
 
+    def test_get_elf_files_skips_symlinked_dirs(self, new_dir, fake_elf):
+        Path("subdir").mkdir()
+        fake_elf("subdir/fake_elf-2.23")
+        Path("linkdir").symlink_to("subdir")
+
+        elf_files = elf_utils.get_elf_files(new_dir)
+        assert [e.path for e in elf_files] == [new_dir / "subdir/fake_elf-2.23"]
+
+
+class TestGetElfFilesParallel:
+    """get_elf_files with worker processes."""
+
+    @pytest.fixture
+    def elf_tree(self, new_dir):
+        for subdir in ["bin", "lib"]:
+            Path(subdir).mkdir()
+        for i in range(8):
+            shutil.copy2("/bin/ls", f"bin/ls{i}")
+            Path(f"lib/data{i}").write_text("not an elf file")
+        Path("lib/corrupt").write_bytes(b"\x7fELF\x00")
+        return new_dir
+
+    def test_parallel_matches_serial(self, monkeypatch, elf_tree):
+        monkeypatch.setattr(elf_utils, "_PARALLEL_THRESHOLD", 2)
+        monkeypatch.setattr(elf_utils, "_PARALLEL_CHUNK_SIZE", 3)
+
+        serial = elf_utils.get_elf_files(elf_tree)
+        elf_utils.get_elf_files.cache_clear()
+        parallel = elf_utils.get_elf_files(elf_tree, workers=2)
+
+        assert [e.path for e in parallel] == sorted(
+            elf_tree / f"bin/ls{i}" for i in range(8)
+        )
+        assert [e.path for e in parallel] == [e.path for e in serial]
+        assert [e.build_id for e in parallel] == [e.build_id for e in serial]
+        assert [set(e.needed) for e in parallel] == [set(e.needed) for e in serial]
+
+    def test_parallel_with_cache(self, monkeypatch, elf_tree):
+        monkeypatch.setattr(elf_utils, "_PARALLEL_THRESHOLD", 2)
+        elf_cache = ElfCache(elf_tree / "cache")
+
+        elf_utils.get_elf_files_from_list(
+            elf_tree, [f"bin/ls{i}" for i in range(8)], elf_cache=elf_cache, workers=2
+        )
+        assert (elf_cache.hits, elf_cache.misses) == (0, 8)
+
+        elf_utils.get_elf_files_from_list(
+            elf_tree, [f"bin/ls{i}" for i in range(8)], elf_cache=elf_cache, workers=2
+        )
+        assert (elf_cache.hits, elf_cache.misses) == (8, 8)
+
+    def test_small_lists_are_parsed_serially(self, mocker, elf_tree):
+        parallel = mocker.patch("snapcraft.elf.elf_utils._load_elf_files_parallel")
+
+        elf_files = elf_utils.get_elf_files(elf_tree, workers=4)
+
+        assert len(elf_files) == 8
+        parallel.assert_not_called()
+
 
 class TestGetDynamicLinker:
     """find_linker functionality."""
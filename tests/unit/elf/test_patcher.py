@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 import shutil
+import subprocess
 from pathlib import Path
 from unittest.mock import ANY, call
 
@@ -189,13 +190,30 @@ def test_patcher_patch_rpath_already_set(mocker, patcher, elf_file):
         return_value=["$ORIGIN/current/rpath", str(expected_proposed_rpath)],
     )
 
+    patcher.patch(elf_file=elf_file)
+
+    # The interpreter fits in PT_INTERP, so the file is edited in place.
+    run_mock.assert_not_called()
+    assert elf.ElfFile(path=elf_file.path).interp == "/my/dynamic/linker"
+
+
+def test_patcher_patch_interpreter_too_long(mocker, patcher, elf_file):
+    run_mock = mocker.patch("subprocess.check_call")
+    patcher._dynamic_linker = "/snap/foo/current" + "/lib" * 16 + "/ld.so"
+
+    expected_proposed_rpath = list(elf_file.dependencies)[0].path.parent
+    mocker.patch(
+        "snapcraft.elf._patcher.Patcher.get_current_rpath",
+        return_value=[str(expected_proposed_rpath)],
+    )
+
     patcher.patch(elf_file=elf_file)
     assert run_mock.mock_calls == [
         call(
             [
                 PATCHELF_PATH,
                 "--set-interpreter",
-                "/my/dynamic/linker",
+                patcher._dynamic_linker,
                 ANY,
             ]
         )
@@ -228,3 +246,91 @@ def test_patcher_patch_use_system_libs(mocker, patcher, elf_file, use_system_lib
         expected_calls.append(call([PATCHELF_PATH, "--no-default-lib", ANY]))
 
     assert run_mock.mock_calls == expected_calls
+
+
+def test_patcher_patch_up_to_date(mocker, patcher, elf_file):
+    run_mock = mocker.patch("subprocess.check_call")
+    patcher._dynamic_linker = elf_file.interp
+    mocker.patch(
+        "snapcraft.elf._patcher.Patcher.get_current_rpath",
+        return_value=[str(list(elf_file.dependencies)[0].path.parent)],
+    )
+
+    assert patcher.get_patch_plan(elf_file=elf_file, use_system_libs=False) == []
+
+    patcher.patch(elf_file=elf_file, use_system_libs=False)
+    run_mock.assert_not_called()
+
+
+def test_patcher_patch_plan_uses_single_copy(mocker, patcher, elf_file):
+    run_mock = mocker.patch("subprocess.check_call")
+    copy_mock = mocker.spy(shutil, "copy2")
+
+    patcher.patch(elf_file=elf_file, use_system_libs=False)
+
+    assert len(run_mock.mock_calls) == 2
+    # Both invocations operate on the same temporary copy.
+    assert run_mock.mock_calls[0].args[0][-1] == run_mock.mock_calls[1].args[0][-1]
+    assert copy_mock.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "rpath,runpath,expected",
+    [
+        ("", "", []),
+        ("/a:/b", "", ["/a", "/b"]),
+        ("/a", "$ORIGIN/../lib", ["$ORIGIN/../lib"]),
+    ],
+)
+def test_patcher_get_current_rpath(patcher, elf_file, rpath, runpath, expected):
+    elf_file.rpath = rpath
+    elf_file.runpath = runpath
+
+    assert patcher.get_current_rpath(elf_file) == expected
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_patcher_patch_files(mocker, new_dir, patcher, workers):
+    run_mock = mocker.patch("subprocess.check_call")
+    elf_files = []
+    for i in range(6):
+        elf_path = new_dir / f"elf{i}"
+        shutil.copy("/bin/true", elf_path)
+        elf_files.append(elf.ElfFile(path=elf_path))
+
+    patcher.patch_files(elf_files=elf_files, workers=workers)
+
+    run_mock.assert_not_called()
+    for elf_file in elf_files:
+        assert elf.ElfFile(path=elf_file.path).interp == "/my/dynamic/linker"
+
+
+def test_patcher_patch_files_skips_up_to_date(mocker, new_dir, patcher):
+    run_mock = mocker.patch("subprocess.check_call")
+    elf_path = new_dir / "elf"
+    shutil.copy("/bin/true", elf_path)
+    elf_file = elf.ElfFile(path=elf_path)
+    patcher._dynamic_linker = elf_file.interp
+
+    patcher.patch_files(elf_files=[elf_file], workers=2)
+
+    run_mock.assert_not_called()
+
+
+def test_patcher_patch_files_error(mocker, new_dir, patcher):
+    mocker.patch(
+        "subprocess.check_call",
+        side_effect=subprocess.CalledProcessError(1, ["patchelf"]),
+    )
+    # Too long to be set in place.
+    patcher._dynamic_linker = "/snap/foo/current" + "/lib" * 16 + "/ld.so"
+    elf_files = []
+    for i in range(3):
+        elf_path = new_dir / f"elf{i}"
+        shutil.copy("/bin/true", elf_path)
+        elf_files.append(elf.ElfFile(path=elf_path))
+
+    with pytest.raises(errors.PatcherError) as raised:
+        patcher.patch_files(elf_files=elf_files, workers=2)
+
+    assert raised.value.path == new_dir / "elf0"
@@ -22,6 +22,7 @@ import pytest
 
 from snapcraft import linters, models
 from snapcraft.elf import _elf_file, elf_utils
+from snapcraft.linters import library_linter
 from snapcraft.linters.base import LinterIssue, LinterResult
 from snapcraft.linters.library_linter import LibraryLinter
 from snapcraft.meta import snap_yaml
@@ -29,6 +30,24 @@ from snapcraft.meta import snap_yaml
 
 def setup_function():
     elf_utils.get_elf_files.cache_clear()
+    library_linter._get_ld_config_cache.cache_clear()
+    library_linter._get_deb_file_owners.cache_clear()
+
+
+@pytest.fixture
+def dpkg_info_dir(new_dir, monkeypatch):
+    info_dir = new_dir / "dpkg-info"
+    info_dir.mkdir()
+    (info_dir / "libcurl4:amd64.list").write_text(
+        "/.\n/usr\n/usr/lib\n/usr/lib/x86_64-linux-gnu\n"
+        "/usr/lib/x86_64-linux-gnu/libcurl.so.4\n"
+    )
+    (info_dir / "libcrypt1:amd64.list").write_text(
+        "/.\n/lib\n/lib/x86_64-linux-gnu\n/lib/x86_64-linux-gnu/libcrypt.so.1\n"
+    )
+    (info_dir / "libcurl4:amd64.md5sums").write_text("")
+    monkeypatch.setattr(library_linter, "_DPKG_INFO_DIR", info_dir)
+    return info_dir
 
 
 def test_library_linter_missing_library(mocker, new_dir):
@@ -318,17 +337,22 @@ def test_ld_config_cache(fake_process):
     }
 
 
-def test_find_deb_package(mocker, fake_process):
-    """Sarching a system package that includes a library file"""
-    mocker.patch(
-        "snapcraft.linters.library_linter.LibraryLinter._generate_ld_config_cache"
-    )
-
+def test_ld_config_cache_is_memoized(fake_process):
+    """Check that ldconfig runs once for all linter instances."""
     fake_process.register_subprocess(
-        ["dpkg", "-S", "/usr/lib/x86_64-linux-gnu/libcurl.so.4"],
-        stdout=b"libcurl4:amd64: /usr/lib/x86_64-linux-gnu/libcurl.so.4",
+        ["ldconfig", "-N", "-p"],
+        stdout=b"libcurl.so.4 (libc6,x86-64) => /lib/x86_64-linux-gnu/libcurl.so.4",
     )
 
+    for _ in range(2):
+        linter = LibraryLinter(name="library", snap_metadata=Mock(), lint=None)
+        linter._generate_ld_config_cache()
+
+    assert fake_process.call_count(["ldconfig", "-N", "-p"]) == 1
+
+
+def test_find_deb_package(mocker, dpkg_info_dir):
+    """Sarching a system package that includes a library file"""
     linter = LibraryLinter(name="library", snap_metadata=Mock(), lint=None)
     linter._ld_config_cache = {
         "libcurl.so.4": Path("/lib/x86_64-linux-gnu/libcurl.so.4"),
@@ -346,18 +370,22 @@ def test_find_deb_package(mocker, fake_process):
     assert result == "libcurl4"
 
 
-def test_find_deb_package_no_available(mocker, fake_process):
-    """Sarching a system package that includes a library file but not found"""
-    mocker.patch(
-        "snapcraft.linters.library_linter.LibraryLinter._generate_ld_config_cache"
-    )
+def test_find_deb_package_unresolved_path(mocker, dpkg_info_dir):
+    """Packages listing the library through a usrmerge symlink are found."""
+    linter = LibraryLinter(name="library", snap_metadata=Mock(), lint=None)
+    linter._ld_config_cache = {
+        "libcrypt.so.1": Path("/lib/x86_64-linux-gnu/libcrypt.so.1"),
+    }
 
-    fake_process.register_subprocess(
-        ["dpkg", "-S", "/usr/lib/x86_64-linux-gnu/libcurl.so.4"],
-        stdout=b"dpkg-query: no path found matching pattern /usr/lib/x86_64-linux-gnu/libcurl.so.4",
-        returncode=1,
+    mocker.patch("pathlib.Path.resolve").return_value = Path(
+        "/usr/lib/x86_64-linux-gnu/libcrypt.so.1"
     )
+    result = linter._find_deb_package("libcrypt.so.1")
+    assert result == "libcrypt1"
+
 
+def test_find_deb_package_no_available(mocker, dpkg_info_dir):
+    """Sarching a system package that includes a library file but not found"""
     linter = LibraryLinter(name="library", snap_metadata=Mock(), lint=None)
     linter._ld_config_cache = {
         "libcurl.so.4": Path("/lib/x86_64-linux-gnu/libcurl.so.4"),
@@ -369,9 +397,29 @@ def test_find_deb_package_no_available(mocker, fake_process):
     }
 
     mocker.patch("pathlib.Path.resolve").return_value = Path(
-        "/usr/lib/x86_64-linux-gnu/libcurl.so.4"
+        "/usr/lib/x86_64-linux-gnu/libcrypto.so.3"
     )
 
-    result = linter._find_deb_package("libcurl.so.4")
+    result = linter._find_deb_package("libcrypto.so.3")
 
     assert not result
+
+
+def test_find_deb_package_not_in_ld_config_cache(dpkg_info_dir):
+    linter = LibraryLinter(name="library", snap_metadata=Mock(), lint=None)
+
+    assert linter._find_deb_package("libcurl.so.4") is None
+
+
+def test_deb_file_owners_no_dpkg(new_dir, monkeypatch):
+    monkeypatch.setattr(library_linter, "_DPKG_INFO_DIR", new_dir / "missing")
+
+    assert library_linter._get_deb_file_owners() == {}
+
+
+def test_deb_file_owners_is_memoized(mocker, dpkg_info_dir):
+    owners = library_linter._get_deb_file_owners()
+    glob = mocker.spy(Path, "glob")
+
+    assert library_linter._get_deb_file_owners() is owners
+    assert glob.call_count == 0
@@ -14,6 +14,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import threading
 from pathlib import Path
 from typing import List
 from unittest.mock import MagicMock, call
@@ -22,7 +23,7 @@ import pytest
 from overrides import overrides
 
 from snapcraft import linters, models
-from snapcraft.linters.base import Linter, LinterResult
+from snapcraft.linters.base import Linter, LinterPayload, LinterResult
 from snapcraft.linters.linters import _ignore_matching_filenames
 from snapcraft.meta import snap_yaml
 
@@ -225,6 +226,87 @@ class TestLinterRun:
         issues = linters.run_linters(new_dir, lint=lint)
         assert issues == []
 
+    @pytest.fixture
+    def snap_metadata_file(self, new_dir):
+        yaml_data = {
+            "name": "mytest",
+            "version": "1.29.3",
+            "base": "core22",
+            "summary": "Single-line elevator pitch for your amazing snap",
+            "description": "test-description",
+            "confinement": "strict",
+            "parts": {},
+        }
+
+        project = models.Project.unmarshal(yaml_data)
+        snap_yaml.write(project, prime_dir=Path(new_dir), arch="amd64")
+
+    @pytest.mark.usefixtures("snap_metadata_file")
+    def test_run_linters_keeps_order(self, mocker, new_dir):
+        """Issues are reported in linter order, regardless of completion order."""
+        second_done = threading.Event()
+
+        class _SlowLinter(_TestLinter):
+            @overrides
+            def run(self) -> List[linters.LinterIssue]:
+                assert second_done.wait(timeout=10)
+                return [
+                    linters.LinterIssue(
+                        name="slow", result=LinterResult.WARNING, text="slow"
+                    )
+                ]
+
+        class _FastLinter(_TestLinter):
+            @overrides
+            def run(self) -> List[linters.LinterIssue]:
+                second_done.set()
+                return [
+                    linters.LinterIssue(
+                        name="fast", result=LinterResult.WARNING, text="fast"
+                    )
+                ]
+
+        mocker.patch(
+            "snapcraft.linters.linters.LINTERS",
+            {"slow": _SlowLinter, "fast": _FastLinter},
+        )
+
+        issues = linters.run_linters(new_dir, lint=None)
+        assert [issue.name for issue in issues] == ["slow", "fast"]
+
+    @pytest.mark.usefixtures("snap_metadata_file")
+    def test_run_linters_timing(self, mocker, new_dir, emitter):
+        mocker.patch("snapcraft.linters.linters.LINTERS", {"test": _TestLinter})
+
+        linters.run_linters(new_dir, lint=None)
+
+        emitter.assert_debug(r"Linter 'test' finished in \d+\.\d+s", regex=True)
+
+    @pytest.mark.usefixtures("snap_metadata_file")
+    def test_run_linters_shared_payload(self, mocker, new_dir):
+        payloads = []
+
+        class _ElfLinter(_TestLinter):
+            @overrides
+            def run(self) -> List[linters.LinterIssue]:
+                payloads.append(self._payload)
+                self._payload.get_elf_files()
+                return []
+
+        get_elf_files = mocker.patch(
+            "snapcraft.elf.elf_utils.get_elf_files", return_value=[]
+        )
+        mocker.patch(
+            "snapcraft.linters.linters.LINTERS",
+            {"elf-1": _ElfLinter, "elf-2": _ElfLinter},
+        )
+
+        linters.run_linters(new_dir, lint=None)
+
+        assert len(payloads) == 2
+        assert payloads[0] is payloads[1]
+        assert get_elf_files.call_count == 1
+
     def test_ignore_matching_filenames(self, linter_issue):
         lint = models.Lint(ignore=[{"test": ["foo*", "some/dir/*"]}])
         issues = [
@@ -268,3 +350,17 @@ def test_base_linter_is_file_ignored():
     assert not linter.is_file_ignored(Path("test-2-path"))
     assert not linter.is_file_ignored(Path("test-2-path"), category="test-1")
     assert linter.is_file_ignored(Path("test-2-path"), category="test-2")
+
+
+def test_payload_loads_dependencies_once():
+    payload = LinterPayload(snap_metadata=MagicMock(base="core22"))
+    elf_file = MagicMock(path=Path("elf.bin"))
+    elf_file.load_dependencies.return_value = {Path("/lib/libfoo.so.1")}
+
+    assert payload.load_dependencies(elf_file) == {Path("/lib/libfoo.so.1")}
+    assert payload.load_dependencies(elf_file) == {Path("/lib/libfoo.so.1")}
+
+    elf_file.load_dependencies.assert_called_once()
+    assert elf_file.load_dependencies.call_args.kwargs["base_path"] == Path(
+        "/snap/core22/current"
+    )
@@ -26,8 +26,9 @@ from craft_cli import EmitterMode, emit
 from craft_parts import Action, Features, ProjectInfo, Step, callbacks
 from craft_providers.bases.ubuntu import BuilddBaseAlias
 
-from snapcraft import errors
+from snapcraft import errors, pack
 from snapcraft.elf import ElfFile
+from snapcraft.linters import LinterStatus
 from snapcraft.models import MANDATORY_ADOPTABLE_FIELDS, Project
 from snapcraft.parts import lifecycle as parts_lifecycle
 from snapcraft.parts import set_global_environment
@@ -515,6 +516,115 @@ def test_lifecycle_run_local_destructive_mode(
     ]
 
 
+@pytest.fixture
+def pipelined_args():
+    return argparse.Namespace(
+        directory=None,
+        output=None,
+        debug=False,
+        destructive_mode=True,
+        enable_manifest=False,
+        shell=False,
+        shell_after=False,
+        use_lxd=False,
+        ua_token=None,
+        parts=[],
+        pipelined=True,
+    )
+
+
+@pytest.mark.usefixtures("project_vars")
+def test_lifecycle_run_pipelined(snapcraft_yaml, new_dir, mocker, pipelined_args):
+    """Start packing the snap before running the linters."""
+    project = Project.unmarshal(snapcraft_yaml(base="core22"))
+    mocker.patch("snapcraft.parts.PartsLifecycle.run")
+    pack_mock = mocker.patch("snapcraft.pack.pack_snap")
+    start_pack_mock = mocker.patch("snapcraft.pack.start_pack_snap")
+    start_pack_mock.return_value.wait.return_value = "mytest_0.1_amd64.snap"
+    mocker.patch("snapcraft.utils.is_managed_mode", return_value=False)
+    linters_mock = mocker.patch("snapcraft.linters.run_linters", return_value=[])
+    manager = mocker.Mock()
+    manager.attach_mock(start_pack_mock, "start_pack_snap")
+    manager.attach_mock(linters_mock, "run_linters")
+
+    parts_lifecycle._run_command(
+        "pack",
+        project=project,
+        parse_info={},
+        assets_dir=Path(),
+        start_time=datetime.now(),
+        parallel_build_count=8,
+        parsed_args=pipelined_args,
+    )
+
+    assert pack_mock.mock_calls == []
+    assert manager.mock_calls[:2] == [
+        call.start_pack_snap(
+            new_dir / "prime",
+            output=None,
+            compression="xz",
+            name="mytest",
+            version="0.1",
+            target_arch=get_host_architecture(),
+        ),
+        call.run_linters(new_dir / "prime", lint=None),
+    ]
+    assert start_pack_mock.return_value.mock_calls == [call.wait()]
+
+
+@pytest.mark.usefixtures("project_vars")
+def test_lifecycle_run_pipelined_linter_error(snapcraft_yaml, mocker, pipelined_args):
+    """Linter errors cancel packing the snap."""
+    project = Project.unmarshal(snapcraft_yaml(base="core22"))
+    mocker.patch("snapcraft.parts.PartsLifecycle.run")
+    start_pack_mock = mocker.patch("snapcraft.pack.start_pack_snap")
+    mocker.patch("snapcraft.utils.is_managed_mode", return_value=False)
+    mocker.patch("snapcraft.linters.run_linters", return_value=[])
+    mocker.patch("snapcraft.linters.report", return_value=LinterStatus.ERRORS)
+
+    with pytest.raises(errors.LinterError):
+        parts_lifecycle._run_command(
+            "pack",
+            project=project,
+            parse_info={},
+            assets_dir=Path(),
+            start_time=datetime.now(),
+            parallel_build_count=8,
+            parsed_args=pipelined_args,
+        )
+
+    assert start_pack_mock.return_value.mock_calls == [call.cancel()]
+
+
+@pytest.mark.usefixtures("project_vars")
+def test_lifecycle_run_incremental(snapcraft_yaml, new_dir, mocker, pipelined_args):
+    """Incremental packs reuse the cache of the prime directory."""
+    project = Project.unmarshal(snapcraft_yaml(base="core22"))
+    mocker.patch("snapcraft.parts.PartsLifecycle.run")
+    pack_mock = mocker.patch("snapcraft.pack.pack_snap")
+    start_pack_mock = mocker.patch("snapcraft.pack.start_pack_snap")
+    mocker.patch("snapcraft.utils.is_managed_mode", return_value=False)
+    mocker.patch("snapcraft.linters.run_linters", return_value=[])
+    pipelined_args.incremental = True
+
+    parts_lifecycle._run_command(
+        "pack",
+        project=project,
+        parse_info={},
+        assets_dir=Path(),
+        start_time=datetime.now(),
+        parallel_build_count=8,
+        parsed_args=pipelined_args,
+    )
+
+    # The cache takes precedence over pipelining.
+    assert start_pack_mock.mock_calls == []
+    cache = pack_mock.call_args.kwargs["cache"]
+    assert isinstance(cache, pack.PackCache)
+    assert cache.path == parts_lifecycle._get_pack_cache(new_dir / "prime").path
+    assert cache.path.parent.name == "pack"
+
+
 @pytest.mark.parametrize("destructive_mode", [True, False])
 @pytest.mark.parametrize("build_env", [None, "host", "multipass", "lxd", "other"])
 @pytest.mark.parametrize("cmd", ["pack", "snap"])
@@ -1649,6 +1759,8 @@ def test_lifecycle_run_in_provider_all_options(
             "--debug",
             "--shell",
             "--shell-after",
+            "--pipelined",
+            "--incremental",
             "--enable-manifest",
             "--manifest-image-information",
             manifest_image_information,
@@ -1682,6 +1794,8 @@ def test_lifecycle_run_in_provider_all_options(
             debug=True,
             shell=True,
             shell_after=True,
+            pipelined=True,
+            incremental=True,
             http_proxy=http_proxy,
             https_proxy=https_proxy,
         ),
@@ -2042,9 +2156,11 @@ def test_patch_elf(snapcraft_yaml, mocker, new_dir):
 
     assert run_patchelf_mock.mock_calls == [
         call(
-            patchelf_args=[
-                "--set-interpreter",
-                "/snap/core22/current/lib64/ld-linux-x86-64.so.2",
+            patch_plan=[
+                [
+                    "--set-interpreter",
+                    "/snap/core22/current/lib64/ld-linux-x86-64.so.2",
+                ]
             ],
             elf_file_path=new_dir / "prime/elf.bin",
         )
@@ -107,6 +107,8 @@ def test_post_prime_patchelf(
         f"/snap/core24/current/lib64/ld-linux-{linux_arch}.so.2",
         fp.any(),  # Temporary file containing the file to patch.
     ]
+    # Resolve dependencies with the (faked) ldd rather than in-process.
+    mocker.patch("snapcraft.elf._elf_file._resolve_libraries", return_value=None)
     fp.register(["/usr/bin/ldd", str(tmp_path / "prime" / "usr/bin/ls")])
     fp.register(patchelf_command)  # type: ignore[arg-type]
 
@@ -93,24 +93,25 @@ def test_pack(package_service, lifecycle_service, mocker):
         target_arch="amd64",
     )
 
+    # Components are packed concurrently.
     mock_pack_component.assert_has_calls(
         [
             call(
-                lifecycle_service._work_dir
+                directory=lifecycle_service._work_dir
                 / "partitions/component/firstcomponent/prime",
                 compression="xz",
                 output_dir=Path("."),
             ),
-            call().__fspath__(),
             call(
-                lifecycle_service._work_dir
+                directory=lifecycle_service._work_dir
                 / "partitions/component/secondcomponent/prime",
                 compression="xz",
                 output_dir=Path("."),
             ),
-            call().__fspath__(),
-        ]
+        ],
+        any_order=True,
     )
+    assert mock_pack_component.call_count == 2
 
 
 @pytest.mark.usefixtures("enable_partitions_feature")
@@ -389,6 +389,67 @@ def test_channel_map():
     assert cm.get_existing_architectures() == set(["arm64", "amd64", "i386"])
 
 
+def test_channel_map_lookups_follow_changes():
+    def mapped_channel(revision, architecture, percentage=None):
+        return channel_map.MappedChannel(
+            channel="latest/stable",
+            revision=revision,
+            architecture=architecture,
+            expiration_date=None,
+            progressive=channel_map.Progressive(
+                paused=None, percentage=percentage, current_percentage=None
+            ),
+        )
+
+    cm = channel_map.ChannelMap(
+        channel_map=[mapped_channel(1, "amd64")],
+        revisions=[
+            channel_map.Revision(revision=1, version="1.0", architectures=["amd64"])
+        ],
+        snap=channel_map.Snap(name="my-snap", channels=[], tracks=[]),
+    )
+    assert cm.has_mapped_channels(channel_name="latest/stable", architecture="amd64")
+    assert not cm.has_mapped_channels(
+        channel_name="latest/stable", architecture="arm64"
+    )
+
+    # Entries added in place.
+    cm.channel_map.append(mapped_channel(2, "arm64"))
+    cm.revisions.append(
+        channel_map.Revision(revision=2, version="2.0", architectures=["arm64"])
+    )
+    assert (
+        cm.get_mapped_channel(
+            channel_name="latest/stable", architecture="arm64", progressive=False
+        )
+        == cm.channel_map[1]
+    )
+    assert cm.get_revision(2) == cm.revisions[1]
+
+    # Entries replaced in place.
+    cm.channel_map[1] = mapped_channel(3, "riscv64")
+    assert not cm.has_mapped_channels(
+        channel_name="latest/stable", architecture="arm64"
+    )
+    assert cm.has_mapped_channels(channel_name="latest/stable", architecture="riscv64")
+
+    # Progressive releases changed in place.
+    cm.channel_map[0].progressive.percentage = 50.0
+    assert (
+        cm.get_mapped_channel(
+            channel_name="latest/stable", architecture="amd64", progressive=True
+        )
+        == cm.channel_map[0]
+    )
+
+    # Lists replaced.
+    cm.channel_map = [mapped_channel(1, "s390x")]
+    assert not cm.has_mapped_channels(
+        channel_name="latest/stable", architecture="amd64"
+    )
+    assert cm.has_mapped_channels(channel_name="latest/stable", architecture="s390x")
+
+
 def test_channel_map_from_list_releases_model():
     list_releases = SnapListReleasesModel.unmarshal(
         {
@@ -765,6 +765,135 @@ def test_get_channel_map(fake_client, channel_map_payload):
     ]
 
 
+def test_get_channel_map_cached(monkeypatch, fake_client, channel_map_payload):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "60")
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+    store_client = client.StoreClientCLI()
+
+    first = store_client.get_channel_map(snap_name="test-snap")
+    second = client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    assert second.marshal() == first.marshal()
+    assert fake_client.request.call_count == 1
+
+
+def test_get_channel_map_revalidated(monkeypatch, fake_client, channel_map_payload):
+    fake_client.request.side_effect = [
+        FakeResponse(
+            status_code=200,
+            content=json.dumps(channel_map_payload).encode(),
+            headers={"ETag": '"1234"'},
+        ),
+        FakeResponse(status_code=304, content=b"", headers={"ETag": '"1234"'}),
+    ]
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + constants.DEFAULT_STORE_CACHE_TTL)
+    channel_map = client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    assert isinstance(channel_map, ChannelMap)
+    assert fake_client.request.mock_calls[1] == call(
+        "GET",
+        "https://dashboard.snapcraft.io/api/v2/snaps/test-snap/channel-map",
+        headers={"Accept": "application/json", "If-None-Match": '"1234"'},
+    )
+
+
+def test_get_channel_map_cache_disabled(monkeypatch, fake_client, channel_map_payload):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "0")
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    assert fake_client.request.call_count == 2
+
+
+def test_get_channel_map_cache_revalidated_by_default(fake_client, channel_map_payload):
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    assert fake_client.request.call_count == 2
+
+
+def test_get_channel_map_cache_per_credentials(
+    monkeypatch, fake_client, channel_map_payload
+):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "60")
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+
+    monkeypatch.setenv("SNAPCRAFT_STORE_CREDENTIALS", "first-account")
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+    monkeypatch.setenv("SNAPCRAFT_STORE_CREDENTIALS", "second-account")
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+    monkeypatch.delenv("SNAPCRAFT_STORE_CREDENTIALS")
+    client.StoreClientCLI().get_channel_map(snap_name="test-snap")
+
+    assert fake_client.request.call_count == 3
+
+
+def test_get_channel_map_cache_invalidated_by_logout(
+    monkeypatch, fake_client, channel_map_payload
+):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "60")
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+    store_client = client.StoreClientCLI()
+    store_client.get_channel_map(snap_name="test-snap")
+
+    store_client.logout()
+    store_client.get_channel_map(snap_name="test-snap")
+
+    assert fake_client.logout.mock_calls == [call()]
+    assert fake_client.request.call_count == 2
+
+
+def test_get_channel_map_cache_invalid_ttl(monkeypatch, fake_client):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "soon")
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        client.StoreClientCLI()
+
+    assert str(raised.value) == (
+        "Invalid value 'soon' for 'SNAPCRAFT_STORE_CACHE_TTL'."
+    )
+
+
+def test_get_channel_map_cache_invalidated_by_release(
+    monkeypatch, fake_client, channel_map_payload
+):
+    monkeypatch.setenv("SNAPCRAFT_STORE_CACHE_TTL", "60")
+    fake_client.request.return_value = FakeResponse(
+        status_code=200, content=json.dumps(channel_map_payload).encode()
+    )
+    store_client = client.StoreClientCLI()
+    store_client.get_channel_map(snap_name="test-snap")
+    store_client.get_channel_map(snap_name="other-snap")
+
+    store_client.release(snap_name="test-snap", revision=10, channels=["edge"])
+    store_client.get_channel_map(snap_name="test-snap")
+    store_client.get_channel_map(snap_name="other-snap")
+
+    assert [c.args[1] for c in fake_client.request.mock_calls] == [
+        "https://dashboard.snapcraft.io/api/v2/snaps/test-snap/channel-map",
+        "https://dashboard.snapcraft.io/api/v2/snaps/other-snap/channel-map",
+        "https://dashboard.snapcraft.io/dev/api/snap-release/",
+        "https://dashboard.snapcraft.io/api/v2/snaps/test-snap/channel-map",
+    ]
+
+
 #################
 # Verify Upload #
 #################
@@ -1029,6 +1158,43 @@ def test_notify_upload_error(fake_client):
     ]
 
 
+def test_notify_upload_backoff(monkeypatch, fake_client):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    statuses = ["being_processed"] * 4 + ["ready_to_release"] * 2
+    fake_client.request.side_effect = [
+        FakeResponse(
+            status_code=200,
+            content=json.dumps({"status_details_url": "https://track"}).encode(),
+        ),
+        *[
+            FakeResponse(
+                status_code=200,
+                content=json.dumps({"code": code, "processed": False}).encode(),
+            )
+            for code in statuses
+        ],
+        FakeResponse(
+            status_code=200,
+            content=json.dumps(
+                {"code": "done", "processed": True, "revision": 42}
+            ).encode(),
+        ),
+    ]
+
+    client.StoreClientCLI().notify_upload(
+        snap_name="foo",
+        upload_id="some-id",
+        channels=None,
+        built_at=None,
+        snap_file_size=999,
+        components=None,
+    )
+
+    # The delay grows while the status does not change, and is reset when it does.
+    assert delays == [1, 1.5, 2.25, 3.375, 1, 1.5]
+
+
 ##################
 # List Revisions #
 ##################
@@ -0,0 +1,272 @@
+# -*- Mode:Python; indent-tabs-mode:nil; tab-width:4 -*-
+#
+# Copyright 2024 Canonical Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 3 as
+# published by the Free Software Foundation.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import functools
+import json
+import os
+import pathlib
+import time
+
+import craft_store
+import pytest
+
+from snapcraft import errors
+from snapcraft.store import _upload
+
+from .utils import FakeResponse
+
+#############
+# Fixtures #
+#############
+
+
+@pytest.fixture
+def no_wait(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda x: None)
+
+
+@pytest.fixture
+def snap_file(tmp_path):
+    path = tmp_path / "foo.snap"
+    path.write_bytes(os.urandom(3 * 1024 * 1024))
+    return path
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return _upload.UploadJournal(tmp_path / "cache" / "uploads.json")
+
+
+@pytest.fixture
+def store_client(mocker):
+    """A store client receiving the uploaded data."""
+    client = mocker.Mock()
+    client._storage_base_url = "https://storage.test"
+    client._endpoints = craft_store.endpoints.SNAP_STORE
+    client.received = []
+
+    def _request(method, url, *, headers, data):
+        client.received.append(data.read())
+        return FakeResponse(
+            content=json.dumps(
+                {"successful": True, "upload_id": f"upload-{len(client.received)}"}
+            ).encode(),
+            status_code=200,
+        )
+
+    client.http_client.request.side_effect = _request
+    # Upload through the craft-store implementation, posting to the fake.
+    client.upload_file.side_effect = functools.partial(
+        craft_store.BaseClient.upload_file, client
+    )
+    return client
+
+
+###############
+# Upload file #
+###############
+
+
+def test_upload_file(store_client, journal, snap_file):
+    upload_id = _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    assert upload_id == "upload-1"
+    assert snap_file.read_bytes() in store_client.received[0]
+    request = store_client.http_client.request
+    assert request.call_args.args == (
+        "POST",
+        "https://storage.test/unscanned-upload/",
+    )
+
+    # The journal records the stat of the uploaded file.
+    journal_data = json.loads(journal.path.read_text())
+    entry = journal_data["uploads"][str(snap_file.resolve())]
+    assert entry["upload-id"] == "upload-1"
+    stat = snap_file.stat()
+    assert entry["stat"] == [
+        stat.st_size,
+        stat.st_mtime_ns,
+        stat.st_ctime_ns,
+        stat.st_ino,
+    ]
+
+
+def test_upload_file_monitor_callback(mocker, store_client, snap_file):
+    progress = mocker.Mock()
+
+    def monitor_callback(encoder):
+        assert encoder.len > snap_file.stat().st_size
+        return progress
+
+    _upload.upload_file(
+        store_client, filepath=snap_file, monitor_callback=monitor_callback
+    )
+
+    assert progress.call_count > 0
+    assert progress.call_args.args[0].bytes_read >= snap_file.stat().st_size
+
+
+@pytest.mark.usefixtures("no_wait")
+@pytest.mark.parametrize(
+    "error",
+    [
+        craft_store.errors.NetworkError(ConnectionResetError()),
+        craft_store.errors.StoreServerError(
+            FakeResponse(content=b"{}", status_code=503)
+        ),
+    ],
+)
+def test_upload_file_retries(store_client, journal, snap_file, error):
+    request = store_client.http_client.request
+    upload = request.side_effect
+    errors = [error]
+
+    def _request(*args, **kwargs):
+        if errors:
+            raise errors.pop()
+        return upload(*args, **kwargs)
+
+    request.side_effect = _request
+
+    upload_id = _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    assert upload_id == "upload-1"
+    assert request.call_count == 2
+
+
+@pytest.mark.usefixtures("no_wait")
+def test_upload_file_retries_exhausted(store_client, snap_file):
+    request = store_client.http_client.request
+    request.side_effect = craft_store.errors.NetworkError(ConnectionResetError())
+
+    with pytest.raises(craft_store.errors.NetworkError):
+        _upload.upload_file(store_client, filepath=snap_file)
+
+    assert request.call_count == _upload._UPLOAD_ATTEMPTS
+
+
+def test_upload_file_client_error_not_retried(store_client, snap_file):
+    request = store_client.http_client.request
+    request.side_effect = craft_store.errors.StoreServerError(
+        FakeResponse(content=b"{}", status_code=400)
+    )
+
+    with pytest.raises(craft_store.errors.StoreServerError):
+        _upload.upload_file(store_client, filepath=snap_file)
+
+    assert request.call_count == 1
+
+
+def test_upload_file_unsuccessful(store_client, snap_file):
+    store_client.http_client.request.side_effect = None
+    store_client.http_client.request.return_value = FakeResponse(
+        content=json.dumps({"successful": False}).encode(), status_code=200
+    )
+
+    with pytest.raises(craft_store.errors.CraftStoreError) as raised:
+        _upload.upload_file(store_client, filepath=snap_file)
+
+    assert str(raised.value) == (
+        "Server error while pushing file: {'successful': False}"
+    )
+
+
+def test_upload_file_changed_while_uploading(store_client, journal, snap_file):
+    upload = store_client.upload_file.side_effect
+
+    def _upload_file(**kwargs):
+        upload_id = upload(**kwargs)
+        snap_file.write_bytes(b"changed")
+        return upload_id
+
+    store_client.upload_file.side_effect = _upload_file
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    assert str(raised.value) == f"{str(snap_file)!r} changed while being uploaded"
+    assert journal.get(snap_file) is None
+
+
+##################
+# Upload journal #
+##################
+
+
+def test_upload_file_reuses_journaled_upload(store_client, journal, snap_file):
+    _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    upload_id = _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    assert upload_id == "upload-1"
+    assert store_client.http_client.request.call_count == 1
+
+
+def test_upload_file_read_once(mocker, store_client, journal, snap_file):
+    open_spy = mocker.spy(pathlib.Path, "open")
+
+    _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+    _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    # The file is only read to be uploaded, neither hashed nor verified.
+    assert [c.args[0] for c in open_spy.mock_calls if c.args[0] == snap_file] == [
+        snap_file
+    ]
+
+
+def test_upload_file_changed_file_is_uploaded(store_client, journal, snap_file):
+    _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    stat = snap_file.stat()
+    snap_file.write_bytes(os.urandom(stat.st_size))
+    # Keep the same size and modification time, only the change time differs.
+    os.utime(snap_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    upload_id = _upload.upload_file(store_client, filepath=snap_file, journal=journal)
+
+    assert upload_id == "upload-2"
+
+
+def test_journal_expired_entry(monkeypatch, journal, snap_file):
+    journal.record(snap_file, upload_id="some-id", stat=snap_file.stat())
+    assert journal.get(snap_file) == "some-id"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + _upload._JOURNAL_TTL)
+
+    assert journal.get(snap_file) is None
+
+
+def test_journal_discard(tmp_path, journal, snap_file):
+    other_file = tmp_path / "other.comp"
+    other_file.write_bytes(b"component")
+    journal.record(snap_file, upload_id="snap-id", stat=snap_file.stat())
+    journal.record(other_file, upload_id="comp-id", stat=other_file.stat())
+
+    journal.discard(["snap-id"])
+
+    assert journal.get(snap_file) is None
+    assert journal.get(other_file) == "comp-id"
+
+
+def test_journal_corrupted(journal, snap_file):
+    journal.path.parent.mkdir(parents=True)
+    journal.path.write_text("{not json")
+
+    assert journal.get(snap_file) is None
+
+    journal.record(snap_file, upload_id="some-id", stat=snap_file.stat())
+    assert journal.get(snap_file) == "some-id"
@@ -22,9 +22,10 @@ import requests
 class FakeResponse(requests.Response):
     """A fake requests.Response."""
 
-    def __init__(self, content, status_code):
+    def __init__(self, content, status_code, headers=None):
         self._content = content
         self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
 
     @property
     def content(self):
@@ -14,6 +14,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import shutil
+import subprocess
+from pathlib import Path
 from unittest.mock import call
 
 import pytest
@@ -303,6 +307,174 @@ def test_pack_snap_error(mocker, new_dir, fake_process):
     )
 
 
+@pytest.fixture
+def snap_yaml(new_dir):
+    def _snap_yaml(content):
+        meta_dir = new_dir / "meta"
+        meta_dir.mkdir(exist_ok=True)
+        (meta_dir / "snap.yaml").write_text(content)
+
+    return _snap_yaml
+
+
+def test_verify_snap_yaml(new_dir, snap_yaml):
+    snap_yaml(
+        "name: pack-snap\n"
+        "version: '1.0+git3~x'\n"
+        "apps:\n  pack-snap: {command: bin/foo}\n  Other2: {command: bin/bar}\n"
+        "hooks:\n  configure: {}\n"
+    )
+
+    pack.verify_snap_yaml(new_dir)
+
+
+@pytest.mark.parametrize(
+    "content,message",
+    [
+        ("[]", "snap.yaml must be a mapping"),
+        ("version: '1.0'", "invalid snap name: None"),
+        ("name: a\nversion: '1.0'", "invalid snap name: 'a'"),
+        ("name: Pack-Snap\nversion: '1.0'", "invalid snap name: 'Pack-Snap'"),
+        ("name: pack--snap\nversion: '1.0'", "invalid snap name: 'pack--snap'"),
+        ("name: 1234\nversion: '1.0'", "invalid snap name: 1234"),
+        ("name: pack-snap", "snap version cannot be empty"),
+        ("name: pack-snap\nversion: ''", "snap version cannot be empty"),
+        ("name: pack-snap\nversion: 1.0-", "invalid snap version: '1.0-'"),
+        (
+            "name: pack-snap\nversion: '1234567890123456789012345678901234'",
+            "invalid snap version: '1234567890123456789012345678901234'",
+        ),
+        (
+            "name: pack-snap\nversion: '1'\napps: {pack_snap: {}}",
+            "invalid app name: 'pack_snap'",
+        ),
+        (
+            "name: pack-snap\nversion: '1'\nhooks: {Configure: {}}",
+            "invalid hook name: 'Configure'",
+        ),
+        ("name: pack-snap\nversion: '1'\napps: [foo]", "'apps' must be a mapping"),
+    ],
+)
+def test_verify_snap_yaml_invalid(new_dir, snap_yaml, content, message):
+    snap_yaml(content)
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack.verify_snap_yaml(new_dir)
+
+    assert str(raised.value) == f"Cannot pack snap: {message}"
+
+
+def test_verify_snap_yaml_missing(new_dir):
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack.verify_snap_yaml(new_dir)
+
+    assert str(raised.value) == (
+        f"Cannot pack snap: cannot read {str(new_dir / 'meta' / 'snap.yaml')!r}: "
+        "No such file or directory"
+    )
+
+
+def test_start_pack_snap(fake_process, new_dir, snap_yaml):
+    snap_yaml("name: pack-snap\nversion: '1.0'")
+    fake_process.register_subprocess(
+        [
+            "snap",
+            "pack",
+            "--filename",
+            "pack-snap_1.0_amd64.snap",
+            "--compression",
+            "xz",
+            str(new_dir),
+            str(new_dir),
+        ],
+        stdout="built: pack-snap_1.0_amd64.snap",
+    )
+
+    pack_process = pack.start_pack_snap(
+        new_dir,
+        output=None,
+        compression="xz",
+        name="pack-snap",
+        version="1.0",
+        target_arch="amd64",
+    )
+
+    assert pack_process.wait() == "pack-snap_1.0_amd64.snap"
+
+
+def test_start_pack_snap_invalid_snap_yaml(fake_process, new_dir, snap_yaml):
+    snap_yaml("name: Pack-Snap\nversion: '1.0'")
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack.start_pack_snap(new_dir, output=None)
+
+    assert str(raised.value) == "Cannot pack snap: invalid snap name: 'Pack-Snap'"
+    # No subprocess was started.
+    assert len(fake_process.calls) == 0
+
+
+def test_start_pack_snap_error(fake_process, new_dir, snap_yaml):
+    snap_yaml("name: pack-snap\nversion: '1.0'")
+    fake_process.register_subprocess(
+        [
+            "snap",
+            "pack",
+            "--filename",
+            "pack-snap_1.0_all.snap",
+            str(new_dir),
+            str(new_dir),
+        ],
+        stderr="error: cannot pack",
+        returncode=1,
+    )
+
+    pack_process = pack.start_pack_snap(new_dir, output=None)
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack_process.wait()
+
+    assert raised.value.details == "error: cannot pack"
+
+
+def test_start_pack_snap_cancel(mocker, new_dir, snap_yaml):
+    snap_yaml("name: pack-snap\nversion: '1.0'")
+    output_path = new_dir / "out.snap"
+    mock_popen = mocker.patch("subprocess.Popen")
+    mock_popen.return_value.poll.return_value = None
+    mock_popen.return_value.communicate.return_value = ("", "")
+
+    pack_process = pack.start_pack_snap(new_dir, output=str(output_path))
+    output_path.write_bytes(b"partial")
+    pack_process.cancel()
+
+    assert mock_popen.return_value.terminate.mock_calls == [call()]
+    assert not output_path.exists()
+
+
+@pytest.mark.parametrize(
+    "architectures,filename",
+    [
+        ("", "pack-snap_1.0_all.snap"),
+        ("architectures: [arm64]\n", "pack-snap_1.0_arm64.snap"),
+        ("architectures: [amd64, arm64]\n", "pack-snap_1.0_multi.snap"),
+    ],
+)
+def test_start_pack_snap_cancel_default_filename(
+    mocker, new_dir, snap_yaml, architectures, filename
+):
+    snap_yaml(f"name: pack-snap\nversion: '1.0'\n{architectures}")
+    mock_popen = mocker.patch("subprocess.Popen")
+    mock_popen.return_value.poll.return_value = None
+    mock_popen.return_value.communicate.return_value = ("", "")
+
+    pack_process = pack.start_pack_snap(new_dir, output=None)
+    (new_dir / filename).write_bytes(b"partial")
+    pack_process.cancel()
+
+    assert mock_popen.call_args.args[0][2:4] == ["--filename", filename]
+    assert not (new_dir / filename).exists()
+
+
 def test_pack_component(fake_process, new_dir):
     fake_process.register_subprocess(
         ["snap", "pack", str(new_dir / "in"), str(new_dir / "out")],
@@ -358,3 +530,237 @@ def test_pack_component_error(fake_process, new_dir):
     )
 
     assert name == "my-snap+component_1.0.comp"
+
+
+def test_pack_components(mocker, new_dir):
+    mock_pack_component = mocker.patch(
+        "snapcraft.pack.pack_component",
+        side_effect=lambda directory, **kwargs: f"{directory.name}.comp",
+    )
+
+    names = pack.pack_components(
+        {"first": new_dir / "first", "second": new_dir / "second"},
+        output_dir=new_dir / "out",
+        compression="xz",
+        max_workers=2,
+    )
+
+    # Filenames are returned in the order of components.
+    assert names == ["first.comp", "second.comp"]
+    mock_pack_component.assert_has_calls(
+        [
+            call(
+                directory=new_dir / "first",
+                compression="xz",
+                output_dir=new_dir / "out",
+            ),
+            call(
+                directory=new_dir / "second",
+                compression="xz",
+                output_dir=new_dir / "out",
+            ),
+        ],
+        any_order=True,
+    )
+
+
+def test_pack_components_error(mocker, new_dir):
+    error = errors.SnapcraftError("cannot pack", resolution="try again")
+
+    def _pack_component(directory, **kwargs):
+        if directory.name == "second":
+            raise error
+        return f"{directory.name}.comp"
+
+    mocker.patch("snapcraft.pack.pack_component", side_effect=_pack_component)
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack.pack_components(
+            {"first": new_dir / "first", "second": new_dir / "second"},
+            output_dir=new_dir / "out",
+        )
+
+    assert raised.value is error
+
+
+def test_pack_components_multiple_errors(mocker, new_dir):
+    def _pack_component(directory, **kwargs):
+        raise errors.SnapcraftError(
+            f"cannot pack {directory.name}", resolution="try again"
+        )
+
+    mock_pack_component = mocker.patch(
+        "snapcraft.pack.pack_component", side_effect=_pack_component
+    )
+
+    with pytest.raises(errors.SnapcraftError) as raised:
+        pack.pack_components(
+            {"first": new_dir / "first", "second": new_dir / "second"},
+            output_dir=new_dir / "out",
+            max_workers=2,
+        )
+
+    # All components are attempted before failing.
+    assert mock_pack_component.call_count == 2
+    assert str(raised.value) == "Cannot pack components 'first' and 'second'"
+    assert raised.value.details == (
+        "first: cannot pack first\nsecond: cannot pack second"
+    )
+    assert raised.value.resolution == "try again"
+
+
+@pytest.fixture
+def fake_snap_pack(mocker, new_dir):
+    """Pack snaps writing the packed directory's files to the snap."""
+
+    def _run(command, **kwargs):
+        if "--check-skeleton" not in command:
+            directory, output_dir = Path(command[-2]), Path(command[-1])
+            contents = b"".join(
+                path.read_bytes()
+                for path in sorted(directory.rglob("*"))
+                if path.is_file() and not path.is_symlink()
+            )
+            (output_dir / "my-snap_1.0_amd64.snap").write_bytes(contents)
+        return subprocess.CompletedProcess(
+            command, 0, stdout="built: my-snap_1.0_amd64.snap"
+        )
+
+    return mocker.patch("subprocess.run", side_effect=_run)
+
+
+@pytest.fixture
+def prime_dir(new_dir):
+    prime_dir = new_dir / "prime"
+    (prime_dir / "bin").mkdir(parents=True)
+    (prime_dir / "bin" / "foo").write_text("foo")
+    (prime_dir / "bar").symlink_to("bin/foo")
+    return prime_dir
+
+
+def _pack_commands(mock_run):
+    return [
+        mock_call
+        for mock_call in mock_run.mock_calls
+        if "--check-skeleton" not in mock_call.args[0]
+    ]
+
+
+def test_pack_snap_cache_reused(new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    output_dir = new_dir / "out"
+    output_dir.mkdir()
+
+    assert pack.pack_snap(prime_dir, output=str(output_dir), cache=cache) == (
+        "my-snap_1.0_amd64.snap"
+    )
+    (output_dir / "my-snap_1.0_amd64.snap").unlink()
+
+    # The cache is persistent.
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    assert pack.pack_snap(prime_dir, output=str(output_dir), cache=cache) == (
+        "my-snap_1.0_amd64.snap"
+    )
+
+    assert len(_pack_commands(fake_snap_pack)) == 1
+    assert (output_dir / "my-snap_1.0_amd64.snap").read_bytes() == b"foo"
+
+
+def test_pack_snap_cache_reused_with_output_file(new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    assert pack.pack_snap(prime_dir, output="other.snap", cache=cache) == "other.snap"
+
+    assert len(_pack_commands(fake_snap_pack)) == 1
+    assert (new_dir / "other.snap").read_bytes() == b"foo"
+
+
+def test_pack_snap_cache_unchanged_contents(mocker, new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+    calculate_sha256 = mocker.spy(pack, "_calculate_sha256")
+
+    # Unchanged files are not hashed again.
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+    assert calculate_sha256.mock_calls == []
+
+    # Touched files are hashed again, but have the same contents.
+    os.utime(prime_dir / "bin" / "foo", ns=(0, 0))
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+    assert calculate_sha256.mock_calls == [call(prime_dir / "bin" / "foo")]
+
+    assert len(_pack_commands(fake_snap_pack)) == 1
+
+
+def test_pack_snap_cache_reprimed(mocker, new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+    calculate_sha256 = mocker.spy(pack, "_calculate_sha256")
+
+    # Re-priming recreates the files, keeping their modification times.
+    shutil.copytree(prime_dir, new_dir / "reprimed", symlinks=True)
+    shutil.rmtree(prime_dir)
+    (new_dir / "reprimed").rename(prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    assert calculate_sha256.mock_calls == []
+    assert len(_pack_commands(fake_snap_pack)) == 1
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda prime_dir: (prime_dir / "bin" / "foo").write_text("changed"),
+        lambda prime_dir: (prime_dir / "bin" / "foo").chmod(0o755),
+        lambda prime_dir: (prime_dir / "new").write_text("new"),
+        lambda prime_dir: (prime_dir / "bar").unlink(),
+        lambda prime_dir: (prime_dir / "bin" / "baz").mkdir(),
+    ],
+)
+def test_pack_snap_cache_changed(new_dir, fake_snap_pack, prime_dir, change):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    change(prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    assert len(_pack_commands(fake_snap_pack)) == 2
+
+
+def test_pack_snap_cache_changed_compression(new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    pack.pack_snap(prime_dir, output=None, compression="lzo", cache=cache)
+
+    assert len(_pack_commands(fake_snap_pack)) == 2
+
+
+def test_pack_snap_cache_missing_image(new_dir, fake_snap_pack, prime_dir):
+    cache = pack.PackCache(new_dir / "cache", prime_dir)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+    (cache.path / "last.snap").unlink()
+
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    assert len(_pack_commands(fake_snap_pack)) == 2
+    assert (cache.path / "last.snap").read_bytes() == b"foo"
+
+
+def test_pack_snap_cache_pruned(new_dir, fake_snap_pack, prime_dir):
+    other_dirs = [new_dir / "other-1", new_dir / "other-2"]
+    other_caches = [pack.PackCache(new_dir / "cache", d) for d in other_dirs]
+    for used, (other_dir, other_cache) in enumerate(zip(other_dirs, other_caches)):
+        shutil.copytree(prime_dir, other_dir, symlinks=True)
+        pack.pack_snap(other_dir, output=None, cache=other_cache)
+        os.utime(other_cache.path / "state.json", (used, used))
+
+    # Room for the snap being saved and one other.
+    size = sum(f.stat().st_size for f in other_caches[0].path.iterdir())
+    cache = pack.PackCache(new_dir / "cache", prime_dir, max_size=2 * size + size // 2)
+    pack.pack_snap(prime_dir, output=None, cache=cache)
+
+    assert not other_caches[0].path.exists()
+    assert other_caches[1].path.exists()
+    assert cache.path.exists()